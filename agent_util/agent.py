@@ -1,20 +1,46 @@
 # agent.py
-import json, requests
-import scrape_utils as su
+import json, os, time, requests
+from concurrent.futures import ThreadPoolExecutor
+import handles
+import memo
 from tools import TOOLS
 
 VLLM_URL = "http://localhost:7545/v1/chat/completions"
 MODEL    = "nvidia/Llama-3_3-Nemotron-Super-49B-v1_5"
-SYSTEM_PROMPT = open('agent_system.txt').read()
+SYSTEM_PROMPT = open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'agent_system.txt')).read()
+
+# Tool calls from one model turn run concurrently (they are mostly network waits)
+TOOL_WORKERS = int(os.environ.get("TOOL_WORKERS", "4"))
+_TOOL_POOL = ThreadPoolExecutor(max_workers=TOOL_WORKERS, thread_name_prefix="tool")
+
+def set_tool_workers(n):
+  # batch.py runs many conversations at once; their tool calls share this pool
+  global _TOOL_POOL
+  old, _TOOL_POOL = _TOOL_POOL, ThreadPoolExecutor(max_workers=n, thread_name_prefix="tool")
+  old.shutdown(wait=False)
+
+# Identical tool calls (same tool, same canonical args) within TTL reuse the result (see memo.py)
+MEMO = memo.default_memo()
 
 def call_tool(name, arguments):
-  fn = getattr(su, name, None)
-  if fn is None:
-    raise ValueError(f"Unknown tool: {name}")
+  # documents stay server-side; tools exchange "doc:..." handles (see handles.py)
+  return MEMO.call(name, arguments, handles.call, valid=handles.alive)
+
+def run_tool_call(tc):
+  # one failing tool shouldn't sink the others: hand the error to the model instead
+  try:
+    args = json.loads(tc["function"]["arguments"] or "{}")
+    return call_tool(tc["function"]["name"], args)
+  except Exception as e:
+    return {"error": str(e), "type": type(e).__name__}
 
-  return fn(**(arguments or {}))
+def run_tool_calls(tool_calls):
+  # results come back in tool_calls order, whatever order they finish in
+  if len(tool_calls) == 1:
+    return [run_tool_call(tool_calls[0])]
+  return list(_TOOL_POOL.map(run_tool_call, tool_calls))
 
-def chat(messages):
+def chat(messages, session=None):
   payload = {
     "model": MODEL,
     "messages": messages,
@@ -22,31 +48,47 @@ def chat(messages):
     "tool_choice": "auto",     # let the model decide
     "max_tokens": 512
   }
-  r = requests.post(VLLM_URL, json=payload, timeout=120)
+  r = (session or requests).post(VLLM_URL, json=payload, timeout=120)
   r.raise_for_status()
   return r.json()
 
-def run(query):
+def report_memo(before):
+  st = MEMO.since(before)
+  if st["calls"]:
+    print(f"tool memo: {st['hits']}/{st['calls']} hits ({st['hit_ratio']:.0%})", json.dumps(st["tools"]))
+
+def converse(query, session=None, max_steps=4):
+  """
+  One agent conversation. Returns {answer, stopped, steps: [{llm_s, tools_s, tool_calls}],
+  usage: {prompt_tokens, completion_tokens}}; answer is None if it ran out of steps.
+  """
   messages = [
     {"role":"system","content":SYSTEM_PROMPT},
     {"role":"user","content":query}
   ]
+  steps, usage = [], {"prompt_tokens": 0, "completion_tokens": 0}
 
-  for _ in range(4):  # small loop to allow multi-step tool use
-    resp = chat(messages)
+  for _ in range(max_steps):  # small loop to allow multi-step tool use
+    t0 = time.monotonic()
+    resp = chat(messages, session)
+    step = {"llm_s": round(time.monotonic() - t0, 3), "tools_s": 0.0, "tool_calls": []}
+    steps.append(step)
+    for k in usage:
+      usage[k] += (resp.get("usage") or {}).get(k) or 0
     msg  = resp["choices"][0]["message"]
     tool_calls = msg.get("tool_calls", [])
 
     if not tool_calls:
       # model answered directly
-      print(msg.get("content",""))
-      return
+      return {"answer": msg.get("content",""), "stopped": False, "steps": steps, "usage": usage}
 
-    # dispatch each tool call, then feed results back
-    for tc in tool_calls:
+    # dispatch all tool calls concurrently, then feed results back in order
+    t0 = time.monotonic()
+    results = run_tool_calls(tool_calls)
+    step["tools_s"] = round(time.monotonic() - t0, 3)
+    for tc, result in zip(tool_calls, results):
       name = tc["function"]["name"]
-      args = json.loads(tc["function"]["arguments"] or "{}")
-      result = call_tool(name, args)
+      step["tool_calls"].append(name)
 
       messages.append({
         "role": "assistant",
@@ -59,7 +101,15 @@ def run(query):
         "content": json.dumps(result)   # text—model will read this and continue
       })
 
-  print("Stopped after max tool steps.")
+  return {"answer": None, "stopped": True, "steps": steps, "usage": usage}
+
+def run(query):
+  before = MEMO.snapshot()
+  try:
+    out = converse(query)
+    print(out["answer"] if not out["stopped"] else "Stopped after max tool steps.")
+  finally:
+    report_memo(before)
 
 if __name__ == "__main__":
   run("Given https://austinstreet.org/ find ‘shelter’ mentions and relevant links.")
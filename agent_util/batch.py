@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+batch.py — run many agent conversations against vLLM at once.
+
+agent.run() drives one conversation with blocking calls, so vLLM sees a
+single sequence at a time and its continuous batching sits idle. Here up to
+--concurrency conversations run side by side over one pooled HTTP session
+(keep-alive connections to VLLM_URL), so the server always has a batch to
+work on.
+
+Input: one query per line, or JSON lines with a "query" field (other fields
+are copied to the output) or a "url" field (turned into a query with
+--template). Output: one JSON line per conversation, in completion order,
+with its index, answer, per-step latencies and token usage.
+
+Usage:
+  python3 batch.py sites.txt -o results.jsonl
+  python3 batch.py sites.jsonl -o results.jsonl --concurrency 32
+"""
+
+from __future__ import annotations
+import argparse, json, sys, threading, time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# local imports
+import agent
+
+DEFAULT_TEMPLATE = "Given {url} find shelter, meal, contact and hours information and relevant links."
+
+
+def read_queries(path: str, template: str = DEFAULT_TEMPLATE) -> List[Dict[str, Any]]:
+    items = []
+    with (sys.stdin if path == "-" else open(path, encoding="utf-8")) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("{"):
+                item = json.loads(line)
+                if "query" not in item:
+                    item["query"] = template.format(**item)
+            elif line.startswith(("http://", "https://")):
+                item = {"url": line, "query": template.format(url=line)}
+            else:
+                item = {"query": line}
+            items.append(item)
+    return items
+
+
+def llm_session(pool_size: int) -> requests.Session:
+    """One keep-alive connection per concurrent conversation; no retries (a retried POST re-runs generation)."""
+    s = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
+    return s
+
+
+def _pct(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    v = sorted(values)
+    return round(v[min(len(v) - 1, int(len(v) * q))], 3)
+
+
+def run_batch(
+    items: List[Dict[str, Any]],
+    out,
+    concurrency: int = 16,
+    max_steps: int = 4,
+) -> Dict[str, Any]:
+    """
+    Run every item's query through agent.converse with `concurrency`
+    conversations in flight; write a JSON line per finished conversation to
+    `out` and return the throughput / latency report.
+    """
+    session = llm_session(concurrency)
+    # Tool calls from all conversations share the agent's pool; give it room
+    agent.set_tool_workers(max(agent.TOOL_WORKERS, concurrency))
+    write_lock = threading.Lock()
+    memo_before = agent.MEMO.snapshot()
+
+    def _one(index: int, item: Dict[str, Any]) -> Dict[str, Any]:
+        t0 = time.monotonic()
+        rec: Dict[str, Any] = dict(item, index=index)
+        try:
+            rec.update(agent.converse(item["query"], session=session, max_steps=max_steps))
+        except Exception as e:
+            rec.update(error=str(e), type=type(e).__name__, steps=[], usage={})
+        rec["elapsed"] = round(time.monotonic() - t0, 3)
+        with write_lock:
+            out.write(json.dumps(rec, ensure_ascii=False) + "\n")
+            out.flush()
+        return rec
+
+    t0 = time.monotonic()
+    done = []
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="conv") as pool:
+        futures = [pool.submit(_one, i, item) for i, item in enumerate(items)]
+        for fut in as_completed(futures):
+            done.append(fut.result())
+    wall = time.monotonic() - t0
+    session.close()
+
+    llm = [st["llm_s"] for r in done for st in r.get("steps", [])]
+    tools = [st["tools_s"] for r in done for st in r.get("steps", []) if st["tool_calls"]]
+    prompt = sum((r.get("usage") or {}).get("prompt_tokens", 0) for r in done)
+    completion = sum((r.get("usage") or {}).get("completion_tokens", 0) for r in done)
+    return {
+        "conversations": len(done),
+        "errors": sum(1 for r in done if "error" in r),
+        "stopped": sum(1 for r in done if r.get("stopped")),
+        "concurrency": concurrency,
+        "wall_seconds": round(wall, 2),
+        "conversations_per_min": round(len(done) / wall * 60, 2) if wall else 0.0,
+        "prompt_tokens": prompt,
+        "completion_tokens": completion,
+        "completion_tokens_per_s": round(completion / wall, 1) if wall else 0.0,
+        "total_tokens_per_s": round((prompt + completion) / wall, 1) if wall else 0.0,
+        "llm_step_s": {"n": len(llm), "p50": _pct(llm, 0.5), "p90": _pct(llm, 0.9), "max": _pct(llm, 1.0)},
+        "tool_step_s": {"n": len(tools), "p50": _pct(tools, 0.5), "p90": _pct(tools, 0.9), "max": _pct(tools, 1.0)},
+        "conversation_s": {
+            "p50": _pct([r["elapsed"] for r in done], 0.5),
+            "p90": _pct([r["elapsed"] for r in done], 0.9),
+        },
+        "tool_memo": agent.MEMO.since(memo_before),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("queries", help="file with one query / URL / JSON object per line ('-' for stdin)")
+    ap.add_argument("-o", "--out", default="-", help="JSONL output file (default: stdout)")
+    ap.add_argument("--concurrency", type=int, default=16)
+    ap.add_argument("--max-steps", type=int, default=4)
+    ap.add_argument("--template", default=DEFAULT_TEMPLATE, help="query template for URL lines, e.g. 'Given {url} ...'")
+    args = ap.parse_args()
+
+    items = read_queries(args.queries, args.template)
+    out = sys.stdout if args.out == "-" else open(args.out, "w", encoding="utf-8")
+    try:
+        report = run_batch(items, out, concurrency=args.concurrency, max_steps=args.max_steps)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(json.dumps(report, indent=2), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
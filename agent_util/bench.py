@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+bench.py — offline micro-benchmarks for scrape_utils hot paths.
+
+No network: pages are synthesized so runs are repeatable.
+
+Usage:
+  python3 bench.py                  # all benchmarks
+  python3 bench.py charset          # just one
+  python3 bench.py charset --repeat 5
+  python3 bench.py parse
+  python3 bench.py contacts
+  python3 bench.py terms
+  python3 bench.py pool             # parse_page throughput, threads vs 1..N processes
+"""
+
+from __future__ import annotations
+import argparse, html, multiprocessing, os, random, re, time, tracemalloc
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# local imports
+import scrape_utils as su
+
+WORDS = (
+    "shelter meal food pantry free lunch dinner church community services hours "
+    "volunteer donate contact intake clothing outreach open closed tuesday"
+).split()
+
+
+def synth_page(size: int, seed: int = 0, charset_meta: bool = True, non_ascii: bool = True,
+               encoding: str = "utf-8") -> bytes:
+    """Roughly `size` bytes of nav-heavy HTML with some text, links and non-ASCII chars."""
+    rnd = random.Random(seed)
+    head = '<html><head><meta charset="utf-8"><title>Community Pantry</title>' if charset_meta \
+        else "<html><head><title>Community Pantry</title>"
+    head += "<style>body{font:14px sans-serif}.nav a{color:#333}</style></head><body>"
+    parts = [head]
+    n = len(head)
+    i = 0
+    while n < size:
+        i += 1
+        words = " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(8, 30)))
+        if non_ascii and i % 7 == 0:
+            words += " café niño – “quoted”"
+        chunk = (
+            f'<div class="nav"><a href="/page-{i}">{rnd.choice(WORDS)}</a></div>'
+            f"<p>{words}. Call (214) 555-{i % 10000:04d} or mail info{i}@example.org. "
+            f"Mon-Fri 9am - 5pm.</p>\n"
+        )
+        if i % 50 == 0:
+            chunk += "<script>var x = {a: 1, b: [1,2,3]}; function f(){return x;}</script>\n"
+        parts.append(chunk)
+        n += len(chunk)
+    parts.append("</body></html>")
+    return "".join(parts).encode(encoding, errors="replace")
+
+
+def timed(fn, repeat: int):
+    """Best-of-`repeat` CPU seconds for fn()."""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.process_time()
+        fn()
+        best = min(best, time.process_time() - t0)
+    return best
+
+
+def _old_decode(headers, body: bytes) -> str:
+    # What get_html used to do: statistical detection over the whole payload
+    r = requests.Response()
+    r._content = body
+    r.headers = CaseInsensitiveDict(headers)
+    r.encoding = r.apparent_encoding or "utf-8"
+    return r.text
+
+
+def bench_charset(repeat: int):
+    print("\n=== charset detection + decode (CPU ms per page) ===")
+    print(f"{'page':>28} {'apparent_encoding':>18} {'detect_encoding':>16} {'speedup':>8}")
+    cases = [
+        ("100 KB, <meta charset>", synth_page(100_000), {"Content-Type": "text/html"}),
+        ("1 MB, <meta charset>", synth_page(1_000_000), {"Content-Type": "text/html"}),
+        ("1 MB, no charset hints", synth_page(1_000_000, charset_meta=False), {"Content-Type": "text/html"}),
+        ("1 MB cp1252, no hints", synth_page(1_000_000, charset_meta=False, encoding="cp1252"),
+         {"Content-Type": "text/html"}),
+        ("5 MB, header charset", synth_page(5_000_000), {"Content-Type": "text/html; charset=utf-8"}),
+    ]
+    for label, body, headers in cases:
+        old = timed(lambda: _old_decode(headers, body), repeat)
+        new = timed(lambda: su.decode_body(headers, body), repeat)
+        print(f"{label:>28} {old * 1000:>16.1f}ms {new * 1000:>14.1f}ms {old / max(new, 1e-9):>7.0f}x")
+
+
+# What html_to_text / extract_title / extract_links used to do: three
+# independent regex passes (plus a full-document unescape) over the page.
+_OLD_SCRIPT_STYLE = re.compile(r"<(script|style)[^>]*>.*?</\1>", re.I | re.S)
+_OLD_TAG = re.compile(r"<[^>]+>")
+_OLD_TITLE = re.compile(r"<title[^>]*>(.*?)</title>", re.I | re.S)
+_OLD_HREF = re.compile(r'href=["\']([^"\']+)["\']', re.I)
+
+
+def _old_parse(page: str):
+    m = _OLD_TITLE.search(page)
+    title = html.unescape(m.group(1).strip()) if m else ""
+    text = _OLD_TAG.sub(" ", _OLD_SCRIPT_STYLE.sub(" ", page))
+    text = " ".join(html.unescape(text).split())
+    links = [h.strip() for h in _OLD_HREF.findall(page)]
+    return title, text, links
+
+
+def _with_scripts(page: str, every: int = 150) -> str:
+    # Real pages carry big inline JSON/JS blobs; splice one in every `every` lines
+    blob = "<script>window.__DATA__=" + '{"k":"v","n":[1,2,3],"s":"<b>x</b>"},' * 600 + "</script>\n"
+    return "\n".join(line + (blob if i % every == 0 else "") for i, line in enumerate(page.split("\n")))
+
+
+def _peak_mb(fn) -> float:
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 1e6
+    finally:
+        tracemalloc.stop()
+
+
+def _stream_parse(page: str, chunk: int = 65536):
+    ex = su.HTMLExtractor()
+    for i in range(0, len(page), chunk):
+        ex.feed(page[i:i + chunk])
+    return ex.close()
+
+
+def bench_parse(repeat: int):
+    print("\n=== title + text + links (MB/s CPU; peak MB allocated) ===")
+    print(f"{'page':>22} {'3 regex passes':>15} {'parse_html':>11} {'speedup':>8} "
+          f"{'peak old':>9} {'peak new':>9} {'streamed':>9}")
+    cases = [
+        ("100 KB", synth_page(100_000).decode("utf-8")),
+        ("1 MB", synth_page(1_000_000).decode("utf-8")),
+        ("5 MB", synth_page(5_000_000).decode("utf-8")),
+        ("1.5 MB, inline scripts", _with_scripts(synth_page(1_000_000).decode("utf-8"))),
+    ]
+    for label, page in cases:
+        mb = len(page) / 1e6
+        old = timed(lambda: _old_parse(page), repeat)
+        new = timed(lambda: su.parse_html(page), repeat)
+        print(f"{label:>22} {mb / old:>15.1f} {mb / new:>11.1f} {old / max(new, 1e-9):>7.1f}x "
+              f"{_peak_mb(lambda: _old_parse(page)):>9.1f} {_peak_mb(lambda: su.parse_html(page)):>9.1f} "
+              f"{_peak_mb(lambda: _stream_parse(page)):>9.1f}")
+
+    # Streaming in 64 KB chunks must give the same result as one feed
+    page = _with_scripts(synth_page(300_000, seed=1).decode("utf-8"), every=40)
+    assert _stream_parse(page) == su.parse_html(page), "chunked feed differs from one-shot parse"
+    # Empty comments (<!-->, <!--->) and mixed-case <a>/<area>, fed in small chunks
+    page = "<p>a<!--->b</p><Area href='/q'>c<!-->d<aRea href=/r>e --> f\n" * 200
+    assert _stream_parse(page, chunk=7) == su.parse_html(page), "chunked feed differs from one-shot parse"
+    assert su.parse_html(page)["links"] == ["/q", "/r"]
+
+
+# What extract_contacts used to do: three independent scans of the text.
+_OLD_EMAIL = re.compile(r"[A-Za-z0-9._%+\-]+@[A-Za-z0-9.\-]+\.[A-Za-z]{2,}")
+_OLD_PHONE = re.compile(r"(?:\+1\s*)?(?:\(\d{3}\)|\d{3})[.\-\s]?\d{3}[.\-\s]?\d{4}")
+_OLD_HOURS = re.compile(
+    r"(Mon|Tue|Wed|Thu|Fri|Sat|Sun)[^\n]{0,30}"
+    r"(\d{1,2}(:\d{2})?\s?(am|pm|AM|PM)?\s?[-–]\s?\d{1,2}(:\d{2})?\s?(am|pm|AM|PM)?)"
+)
+
+
+def _old_contacts(text: str):
+    return {
+        "emails": sorted(set(_OLD_EMAIL.findall(text))),
+        "phones": sorted(set(p.strip() for p in _OLD_PHONE.findall(text))),
+        "hours": sorted(set(m.group(0).strip() for m in _OLD_HOURS.finditer(text))),
+    }
+
+
+def _prose(size: int, seed: int = 0) -> str:
+    # Long article text: few digits, the odd contact line
+    rnd = random.Random(seed)
+    lines, n, i = [], 0, 0
+    while n < size:
+        i += 1
+        line = " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(40, 120))).capitalize() + "."
+        if i % 40 == 0:
+            line += f" Questions? Write help{i}@example.org or call 972-555-{i % 10000:04d}, Tue 10am - 2pm."
+        elif i % 40 == 20:
+            # hours first: the hours match must not hide the phone after it
+            line += f" Open Mon-Fri 11am - 1pm. Call (214) 555-{i % 10000:04d}"
+        lines.append(line)
+        n += len(line) + 1
+    return "\n".join(lines)
+
+
+def bench_contacts(repeat: int):
+    print("\n=== emails + phones + hours (CPU ms per text) ===")
+    print(f"{'text':>26} {'3 scans':>9} {'2 scans':>9} {'speedup':>8}")
+    cases = [
+        ("100 KB contact-heavy", su.html_to_text(synth_page(100_000).decode("utf-8"))),
+        ("1 MB contact-heavy", su.html_to_text(synth_page(1_000_000).decode("utf-8"))),
+        ("5 MB contact-heavy", su.html_to_text(synth_page(5_000_000).decode("utf-8"))),
+        ("1 MB prose", _prose(1_000_000)),
+        ("5 MB prose", _prose(5_000_000)),
+    ]
+    for label, text in cases:
+        old = timed(lambda: _old_contacts(text), repeat)
+        new = timed(lambda: su.extract_contacts(text), repeat)
+        print(f"{label:>26} {old * 1000:>8.1f}ms {new * 1000:>7.1f}ms {old / max(new, 1e-9):>7.1f}x")
+        # Same emails; phones now come back in E.164
+        assert _old_contacts(text)["emails"] == su.extract_contacts(text)["emails"]
+        assert sorted({su.phone_e164(p) for p in _old_contacts(text)["phones"]}) == su.extract_contacts(text)["phones"]
+        assert _old_contacts(text)["hours"] == su.extract_contacts(text)["hours"]
+
+
+AGENT_TERMS = [
+    "shelter", "emergency", "intake", "meal", "food", "harm reduction", "needle", "encampment",
+    "tent", "contact", "hours", "pantry", "free lunch", "dinner", "clothing", "volunteer",
+    "donate", "outreach", "services", "community", "church", "open", "closed", "tuesday",
+    "case management", "showers", "laundry", "id card", "bus pass", "housing",
+]
+
+
+def _filler_text(size: int, seed: int = 0, term_rate: float = 0.03) -> str:
+    # Page-like prose: made-up filler words with the odd agent term mixed in
+    rnd = random.Random(seed)
+    vocab = ["".join(rnd.choice("etaoinshrdlucmfwypvbgk") for _ in range(rnd.randint(2, 9)))
+             for _ in range(3000)]
+    out, n = [], 0
+    while n < size:
+        w = rnd.choice(WORDS) if rnd.random() < term_rate else rnd.choice(vocab)
+        out.append(w)
+        n += len(w) + 1
+    return " ".join(out)
+
+
+def _trie_regex(terms) -> "re.Pattern":
+    # Single-pass alternative: the term set compiled into a prefix-trie regex,
+    # the closest thing to an Aho-Corasick automaton that runs in C here.
+    trie: dict = {}
+    for t in terms:
+        d = trie
+        for ch in t.lower():
+            d = d.setdefault(ch, {})
+        d[""] = True
+
+    def build(d):
+        alts = [re.escape(ch) + build(sub) for ch, sub in sorted(d.items()) if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        return "(?:" + body + ")?" if "" in d else body
+
+    return re.compile(build(trie))
+
+
+def bench_terms(repeat: int):
+    print("\n=== find_terms_in_text, 30 terms (CPU ms per page) ===")
+    # all hits: per-term find loops + sort; with max_hits: the cached trie scan, stopping early
+    print(f"{'text':>22} {'first hits':>11} {'all hits':>9} {'all, words':>11} {'all, max 20':>12} "
+          f"{'trie, scan only':>15} {'hits':>6}")
+    for label, text in (
+        ("50 KB", _filler_text(50_000)),
+        ("500 KB", _filler_text(500_000)),
+        ("50 KB, term-dense", _prose(50_000, seed=2)),
+    ):
+        first = timed(lambda: su.find_terms_in_text(text, AGENT_TERMS), repeat)
+        allh = timed(lambda: su.find_terms_in_text(text, AGENT_TERMS, all_hits=True), repeat)
+        words = timed(lambda: su.find_terms_in_text(text, AGENT_TERMS, all_hits=True, word_boundary=True), repeat)
+        capped = timed(lambda: su.find_terms_in_text(text, AGENT_TERMS, all_hits=True, max_hits=20), repeat)
+        trie = _trie_regex(AGENT_TERMS)
+        single = timed(lambda: [(m.start(), m.group()) for m in trie.finditer(text.lower())], repeat)
+        hits = len(su.find_terms_in_text(text, AGENT_TERMS, all_hits=True))
+        print(f"{label:>22} {first * 1000:>9.2f}ms {allh * 1000:>7.2f}ms {words * 1000:>9.2f}ms "
+              f"{capped * 1000:>10.2f}ms {single * 1000:>13.2f}ms {hits:>6}")
+        assert su.find_terms_in_text(text, AGENT_TERMS, all_hits=True, max_hits=20) == \
+            su.find_terms_in_text(text, AGENT_TERMS, all_hits=True)[:20]
+
+
+def _parse_all(pool, bodies) -> float:
+    t0 = time.perf_counter()
+    list(pool.map(su.parse_page, bodies, ["text/html; charset=utf-8"] * len(bodies)))
+    return time.perf_counter() - t0
+
+
+def bench_pool(repeat: int):
+    # Wall-clock throughput, so it only means something on an otherwise idle machine
+    bodies = [synth_page(300_000, seed=i) for i in range(48)]
+    mb = sum(map(len, bodies)) / 1e6
+    cores = os.cpu_count() or 1
+    print(f"\n=== parse_page over {len(bodies)} pages / {mb:.0f} MB (wall MB/s; {cores} cores) ===")
+    print(f"{'pool':>14} {'MB/s':>8} {'vs 1 proc':>10}")
+    base = None
+    for kind, n in [("processes", n) for n in sorted({1, 2, 4, cores})] + [("threads", max(cores, 4))]:
+        if kind == "threads":
+            pool = ThreadPoolExecutor(max_workers=n)
+        else:
+            pool = ProcessPoolExecutor(max_workers=n, mp_context=multiprocessing.get_context("spawn"))
+        with pool:
+            _parse_all(pool, bodies[:n])          # warm up workers (spawn + imports)
+            rate = mb / min(_parse_all(pool, bodies) for _ in range(repeat))
+        base = base or rate
+        print(f"{f'{n} {kind}':>14} {rate:>8.1f} {rate / base:>9.2f}x")
+
+
+BENCHMARKS = {
+    "charset": bench_charset,
+    "parse": bench_parse,
+    "contacts": bench_contacts,
+    "terms": bench_terms,
+    "pool": bench_pool,
+}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("which", nargs="*", help=f"any of: {', '.join(BENCHMARKS)} (default: all)")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+    unknown = [w for w in args.which if w not in BENCHMARKS]
+    if unknown:
+        ap.error(f"unknown benchmark(s): {', '.join(unknown)}")
+    for name in (args.which or list(BENCHMARKS)):
+        BENCHMARKS[name](args.repeat)
+
+
+if __name__ == "__main__":
+    main()
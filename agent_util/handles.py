@@ -0,0 +1,182 @@
+"""
+handles.py — document handles for the agent's tools
+
+get_html used to hand the model the raw page, which it then pasted back into
+html_to_text / extract_links as a string argument: the whole document went
+through the chat twice. Here get_html keeps the page server-side and returns
+a compact summary with a handle ("doc:<hash>"); every tool that takes `html`
+or `text` accepts that handle instead and only the (bounded) result goes back
+into the transcript.
+
+Handles are content-addressed (SHA-1 of the HTML), so fetching the same page
+twice yields the same handle. The store is in memory and LRU-bounded.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+import scrape_utils as su
+
+# Keep this many documents / characters of HTML; least recently used go first.
+MAX_DOCS = 64
+MAX_CHARS = 64 * 1024 * 1024
+# Default slice of text a single html_to_text call returns to the model.
+TEXT_WINDOW = 4000
+PREVIEW_CHARS = 300
+
+_RE_HANDLE = re.compile(r"^doc:[0-9a-f]{12}$")
+
+
+class UnknownHandle(KeyError):
+    """The handle was never issued or has been evicted."""
+
+
+class DocStore:
+    """Thread-safe LRU of parsed documents keyed by handle."""
+
+    def __init__(self, max_docs: int = MAX_DOCS, max_chars: int = MAX_CHARS):
+        self.max_docs = max_docs
+        self.max_chars = max_chars
+        self._docs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._chars = 0
+        self._lock = threading.Lock()
+
+    def put(self, html: str, url: Optional[str] = None) -> Dict[str, Any]:
+        handle = "doc:" + hashlib.sha1(html.encode("utf-8", "surrogatepass")).hexdigest()[:12]
+        with self._lock:
+            doc = self._docs.get(handle)
+            if doc is not None:
+                self._docs.move_to_end(handle)
+                if url and not doc["url"]:
+                    doc["url"] = url
+                return doc
+        # Parse outside the lock; a concurrent put of the same page just parses twice
+        parsed = su.parse_html(html)
+        doc = {
+            "handle": handle, "url": url, "html": html,
+            "title": parsed["title"], "text": parsed["text"], "links": parsed["links"],
+        }
+        with self._lock:
+            if handle not in self._docs:
+                self._docs[handle] = doc
+                self._chars += len(html) + len(doc["text"])
+                while len(self._docs) > self.max_docs or (self._chars > self.max_chars and len(self._docs) > 1):
+                    _, old = self._docs.popitem(last=False)
+                    self._chars -= len(old["html"]) + len(old["text"])
+            return self._docs[handle]
+
+    def get(self, handle: str) -> Dict[str, Any]:
+        with self._lock:
+            doc = self._docs.get(handle)
+            if doc is None:
+                raise UnknownHandle(f"{handle} is unknown or expired; call get_html again")
+            self._docs.move_to_end(handle)
+            return doc
+
+    def __contains__(self, handle: object) -> bool:
+        with self._lock:
+            return handle in self._docs
+
+    def clear(self) -> None:
+        with self._lock:
+            self._docs.clear()
+            self._chars = 0
+
+
+DOCS = DocStore()
+
+
+def is_handle(value: Any) -> bool:
+    return isinstance(value, str) and bool(_RE_HANDLE.match(value))
+
+
+def alive(value: Any) -> bool:
+    """False for a tool result whose document handle has been evicted."""
+    if isinstance(value, dict) and is_handle(value.get("handle")):
+        return value["handle"] in DOCS
+    return True
+
+
+def summarize(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """What the model sees instead of the document."""
+    text = doc["text"]
+    return {
+        "handle": doc["handle"],
+        "url": doc["url"],
+        "title": doc["title"],
+        "html_chars": len(doc["html"]),
+        "text_chars": len(text),
+        "links": len(doc["links"]),
+        "preview": text[:PREVIEW_CHARS] + ("..." if len(text) > PREVIEW_CHARS else ""),
+    }
+
+
+def resolve_args(arguments: Dict[str, Any]) -> Dict[str, Any]:
+    """Swap handles in `html` / `text` arguments for the stored content."""
+    out = dict(arguments)
+    for key in ("html", "text"):
+        if is_handle(out.get(key)):
+            out[key] = DOCS.get(out[key])[key]
+    return out
+
+
+# ------------------------------
+# Handle-aware tools (same names as the scrape_utils functions they replace)
+# ------------------------------
+
+def get_html(url: str, timeout: int = 15) -> Dict[str, Any]:
+    """Fetch a page and keep it server-side; returns a summary with its handle."""
+    return summarize(DOCS.put(su.get_html(url, timeout=timeout), url=url))
+
+
+def html_to_text(html: str, start: int = 0, max_chars: int = TEXT_WINDOW) -> Dict[str, Any]:
+    """Visible text of a handle (or raw HTML), one window at a time."""
+    text = DOCS.get(html)["text"] if is_handle(html) else su.html_to_text(html)
+    start = max(0, start)
+    window = text[start:start + max(0, max_chars)]
+    return {
+        "text": window,
+        "start": start,
+        "end": start + len(window),
+        "total_chars": len(text),
+        "truncated": start + len(window) < len(text),
+    }
+
+
+def extract_links(html: str, base: Optional[str] = None, allow_external: bool = True) -> Any:
+    """Links of a handle (resolved against its URL unless `base` is given) or of raw HTML."""
+    if is_handle(html):
+        doc = DOCS.get(html)
+        return su._resolve_links(doc["links"], base or doc["url"], allow_external)
+    return su.extract_links(html, base=base, allow_external=allow_external)
+
+
+def extract_title(html: str) -> str:
+    return DOCS.get(html)["title"] if is_handle(html) else su.extract_title(html)
+
+
+TOOL_FUNCTIONS: Dict[str, Callable[..., Any]] = {
+    "get_html": get_html,
+    "html_to_text": html_to_text,
+    "extract_links": extract_links,
+    "extract_title": extract_title,
+}
+
+
+def call(name: str, arguments: Optional[Dict[str, Any]] = None) -> Any:
+    """
+    Run tool `name`: the handle-aware version above if there is one, else the
+    scrape_utils function with any handle arguments resolved.
+    """
+    fn = TOOL_FUNCTIONS.get(name)
+    if fn is not None:
+        return fn(**(arguments or {}))
+    fn = getattr(su, name, None)
+    if fn is None or name.startswith("_"):
+        raise ValueError(f"Unknown tool: {name}")
+    return fn(**resolve_args(arguments or {}))
@@ -0,0 +1,218 @@
+"""
+memo.py — memoized tool execution for the agent
+
+A model re-fetching the same URL within a run, or a batch of runs over
+overlapping sites, used to repeat the same network and parse work. ToolMemo
+sits in front of call_tool:
+
+- key = tool name + canonicalized arguments (URLs via canonicalize_url,
+  dict keys sorted), hashed;
+- per-tool TTLs (TOOL_TTLS); tools without one are not memoized;
+- in-memory LRU bounded by entry count; concurrent identical calls wait for
+  the first one instead of running twice;
+- optional persistent tier in SQLite (TOOL_MEMO_DIR or persist_path) for
+  JSON results, shared across runs and processes;
+- hit/miss counters overall and per tool, snapshot()/since() for per-run rates.
+Exceptions are never cached.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from scrape_utils import canonicalize_url
+
+# Seconds a result stays valid, per tool. Fetches go stale; pure functions of
+# their arguments (text in, data out) don't.
+TOOL_TTLS: Dict[str, float] = {
+    "get_html": 600,
+    "crawl_once": 3600,
+    "crawl_site": 3600,
+    "wp_search_pages": 3600,
+    "wp_search_bulk": 3600,
+    "html_to_text": 24 * 3600,
+    "extract_links": 24 * 3600,
+    "extract_title": 24 * 3600,
+    "filter_links": 24 * 3600,
+    "find_terms_in_text": 24 * 3600,
+    "extract_contacts": 24 * 3600,
+}
+# Results that only mean something inside this process (document handles)
+# are kept in memory but never written to the persistent tier.
+MEMORY_ONLY = frozenset({"get_html"})
+
+_URL_KEYS = frozenset({"url", "base_url", "base"})
+
+
+def _canonical(key: str, value: Any) -> Any:
+    if isinstance(value, str) and key in _URL_KEYS:
+        return canonicalize_url(value.strip())
+    if isinstance(value, list) and key == "base_urls":
+        return [canonicalize_url(v.strip()) if isinstance(v, str) else v for v in value]
+    return value
+
+
+def memo_key(name: str, arguments: Optional[Dict[str, Any]]) -> str:
+    args = {k: _canonical(k, v) for k, v in (arguments or {}).items() if v is not None}
+    raw = name + "\0" + json.dumps(args, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class ToolMemo:
+    """Thread-safe LRU + TTL memo for tool calls, with an optional SQLite tier."""
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        ttls: Optional[Dict[str, float]] = None,
+        persist_path: Optional[str] = None,
+    ):
+        self.max_entries = max_entries
+        self.ttls = dict(TOOL_TTLS if ttls is None else ttls)
+        self._mem: "OrderedDict[str, tuple]" = OrderedDict()      # key -> (expires, value)
+        self._inflight: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._db: Optional[sqlite3.Connection] = None
+        if persist_path:
+            os.makedirs(os.path.dirname(os.path.abspath(persist_path)), exist_ok=True)
+            self._db = sqlite3.connect(persist_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS memo ("
+                " key TEXT PRIMARY KEY,"
+                " tool TEXT,"
+                " value TEXT,"        # JSON
+                " expires REAL)"
+            )
+            self._db.commit()
+
+    # -- counters --
+
+    def _count(self, name: str, outcome: str) -> None:
+        st = self._stats.setdefault(name, {"hits": 0, "disk_hits": 0, "misses": 0})
+        st[outcome] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {k: dict(v) for k, v in self._stats.items()}
+
+    def since(self, before: Dict[str, Dict[str, int]]) -> Dict[str, Any]:
+        """Counters accumulated since `before` (a snapshot()), with hit ratios."""
+        now = self.snapshot()
+        tools = {}
+        for name, st in now.items():
+            prev = before.get(name, {})
+            d = {k: v - prev.get(k, 0) for k, v in st.items()}
+            if any(d.values()):
+                tools[name] = d
+        hits = sum(d["hits"] + d["disk_hits"] for d in tools.values())
+        total = hits + sum(d["misses"] for d in tools.values())
+        return {
+            "calls": total,
+            "hits": hits,
+            "hit_ratio": round(hits / total, 3) if total else 0.0,
+            "tools": tools,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        out = self.since({})
+        with self._lock:
+            out["entries"] = len(self._mem)
+        out["persistent"] = self._db is not None
+        return out
+
+    # -- lookup --
+
+    def _lookup(self, name: str, key: str, now: float) -> tuple:
+        """(found, value, from_disk); caller holds the lock."""
+        hit = self._mem.get(key)
+        if hit is not None:
+            if hit[0] > now:
+                self._mem.move_to_end(key)
+                return True, hit[1], False
+            del self._mem[key]
+        if self._db is not None and name not in MEMORY_ONLY:
+            row = self._db.execute("SELECT value, expires FROM memo WHERE key = ?", (key,)).fetchone()
+            if row is not None and row[1] > now:
+                value = json.loads(row[0])
+                self._remember(key, row[1], value)
+                return True, value, True
+        return False, None, False
+
+    def _remember(self, key: str, expires: float, value: Any) -> None:
+        self._mem[key] = (expires, value)
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_entries:
+            self._mem.popitem(last=False)
+
+    def invalidate(self, name: str, arguments: Optional[Dict[str, Any]] = None) -> None:
+        key = memo_key(name, arguments)
+        with self._lock:
+            self._mem.pop(key, None)
+            if self._db is not None:
+                self._db.execute("DELETE FROM memo WHERE key = ?", (key,))
+                self._db.commit()
+
+    def call(
+        self,
+        name: str,
+        arguments: Optional[Dict[str, Any]],
+        fn: Callable[[str, Optional[Dict[str, Any]]], Any],
+        valid: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        """
+        fn(name, arguments), memoized. `valid(value)` can reject a cached value
+        that is no longer usable (e.g. a document handle that was evicted).
+        """
+        ttl = self.ttls.get(name, 0)
+        if ttl <= 0:
+            return fn(name, arguments)
+        key = memo_key(name, arguments)
+        while True:
+            with self._lock:
+                found, value, from_disk = self._lookup(name, key, time.time())
+                if found and (valid is None or valid(value)):
+                    self._count(name, "disk_hits" if from_disk else "hits")
+                    return value
+                waiter = self._inflight.get(key)
+                if waiter is None:
+                    self._inflight[key] = threading.Event()
+                    self._count(name, "misses")
+                    break
+            # Same call already running in another thread: wait for its result
+            waiter.wait()
+
+        try:
+            value = fn(name, arguments)
+            expires = time.time() + ttl
+            with self._lock:
+                self._remember(key, expires, value)
+                if self._db is not None and name not in MEMORY_ONLY:
+                    try:
+                        self._db.execute(
+                            "INSERT OR REPLACE INTO memo (key, tool, value, expires) VALUES (?, ?, ?, ?)",
+                            (key, name, json.dumps(value), expires),
+                        )
+                        self._db.commit()
+                    except (TypeError, ValueError):
+                        pass    # not JSON-serializable: memory tier only
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key).set()
+
+
+def default_memo() -> ToolMemo:
+    """Memo configured from the environment: TOOL_MEMO_ENTRIES, TOOL_MEMO_DIR (enables the disk tier)."""
+    directory = os.environ.get("TOOL_MEMO_DIR")
+    return ToolMemo(
+        max_entries=int(os.environ.get("TOOL_MEMO_ENTRIES", "512")),
+        persist_path=os.path.join(directory, "tool_memo.sqlite3") if directory else None,
+    )
@@ -7,13 +7,31 @@ No BeautifulSoup required. Works with plain regex + stdlib.
 
 from __future__ import annotations
 
+import asyncio
+import codecs
+import email.utils
+import hashlib
+import heapq
 import html as _html
+import itertools
+import json
+import os
 import re
-from typing import Any, Dict, Iterable, List, Optional, Sequence
+import sqlite3
+import threading
+import time
+import weakref
+from collections import OrderedDict, deque
+import zlib
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Sequence, Tuple
 from urllib.parse import urljoin, urlparse, urlunparse
+from urllib.robotparser import RobotFileParser
 
 import requests
 from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
 from urllib3.util.retry import Retry
 
 # ------------------------------
@@ -23,15 +41,23 @@ from urllib3.util.retry import Retry
 UA = "Mozilla/5.0 (X11; Linux x86_64) agentic-bot/0.1 (+nocrawl; contact=none)"
 
 
+# Connection pool sizing for shared sessions: number of per-host pools kept,
+# and connections kept alive per host.
+POOL_CONNECTIONS = int(os.environ.get("SCRAPE_POOL_CONNECTIONS", "32"))
+POOL_MAXSIZE = int(os.environ.get("SCRAPE_POOL_MAXSIZE", "8"))
+
+
 def make_session(
     retries: int = 3,
     backoff: float = 0.5,
     status_forcelist: Sequence[int] = (429, 500, 502, 503, 504),
     user_agent: str = UA,
     proxies: Optional[Dict[str, str]] = None,
+    pool_connections: int = POOL_CONNECTIONS,
+    pool_maxsize: int = POOL_MAXSIZE,
 ) -> requests.Session:
     """
-    Create a requests Session with retry + UA header.
+    Create a requests Session with retry + UA header and a keep-alive connection pool.
     """
     s = requests.Session()
     retry = Retry(
@@ -41,37 +67,883 @@ def make_session(
         allowed_methods=frozenset(["HEAD", "GET", "OPTIONS", "POST"]),
         raise_on_status=False,
     )
-    adapter = HTTPAdapter(max_retries=retry)
+    adapter = HTTPAdapter(
+        max_retries=retry,
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+    )
     s.mount("http://", adapter)
     s.mount("https://", adapter)
-    s.headers.update({"User-Agent": user_agent})
+    s.headers.update({"User-Agent": user_agent, "Connection": "keep-alive"})
     if proxies:
         s.proxies.update(proxies)
     return s
 
 
+# Shared sessions, one per distinct configuration. Reusing them keeps TCP/TLS
+# connections alive across calls instead of paying a handshake per fetch.
+# requests.Session is safe for concurrent GETs from several threads as long as
+# nobody mutates its headers/adapters after creation.
+_SHARED_SESSIONS: Dict[tuple, requests.Session] = {}
+_SHARED_SESSIONS_LOCK = threading.Lock()
+
+
+def get_shared_session(
+    retries: int = 3,
+    backoff: float = 0.5,
+    user_agent: str = UA,
+    pool_connections: int = POOL_CONNECTIONS,
+    pool_maxsize: int = POOL_MAXSIZE,
+) -> requests.Session:
+    """
+    Process-wide pooled Session for this configuration (created on first use).
+    """
+    key = (retries, backoff, user_agent, pool_connections, pool_maxsize)
+    s = _SHARED_SESSIONS.get(key)
+    if s is None:
+        with _SHARED_SESSIONS_LOCK:
+            s = _SHARED_SESSIONS.get(key)
+            if s is None:
+                s = make_session(
+                    retries=retries,
+                    backoff=backoff,
+                    user_agent=user_agent,
+                    pool_connections=pool_connections,
+                    pool_maxsize=pool_maxsize,
+                )
+                _SHARED_SESSIONS[key] = s
+    return s
+
+
+def close_shared_sessions() -> None:
+    """Close and forget all shared sessions (e.g. on shutdown or after fork)."""
+    with _SHARED_SESSIONS_LOCK:
+        for s in _SHARED_SESSIONS.values():
+            s.close()
+        _SHARED_SESSIONS.clear()
+
+
 def _ensure_session(session: Optional[requests.Session] = None) -> requests.Session:
-    return session or make_session()
+    return session or get_shared_session()
+
+
+# ------------------------------
+# Host health (circuit breaker + adaptive timeouts)
+# ------------------------------
+
+# Consecutive failures (connect errors, timeouts, 5xx) before a host is skipped.
+HOST_FAILURE_THRESHOLD = int(os.environ.get("HOST_FAILURE_THRESHOLD", "3"))
+# Cooldown after the breaker trips; doubles on every re-trip, up to HOST_COOLDOWN_MAX.
+HOST_COOLDOWN = float(os.environ.get("HOST_COOLDOWN", "60"))
+HOST_COOLDOWN_MAX = float(os.environ.get("HOST_COOLDOWN_MAX", "900"))
+# Once a host has HOST_MIN_SAMPLES latencies, its timeout becomes
+# HOST_TIMEOUT_FACTOR x its p90, never below HOST_TIMEOUT_MIN nor above the caller's.
+HOST_MIN_SAMPLES = 5
+HOST_TIMEOUT_FACTOR = 4.0
+HOST_TIMEOUT_MIN = 3.0
+# Dead hosts usually fail at connect; don't give them the whole read timeout.
+CONNECT_TIMEOUT = float(os.environ.get("CONNECT_TIMEOUT", "5"))
+# Hosts tracked at once; the least recently used are forgotten past this.
+HOST_HEALTH_MAX_HOSTS = int(os.environ.get("HOST_HEALTH_MAX_HOSTS", "4096"))
+
+
+class HostUnavailable(requests.ConnectionError):
+    """Raised instead of sending a request to a host whose breaker is open."""
+
+
+class HostHealth:
+    """
+    Per-host failure and latency tracking, thread-safe.
+
+    closed → (HOST_FAILURE_THRESHOLD consecutive failures) → open for the
+    cooldown → half-open: one probe request goes through; success closes the
+    breaker, failure re-opens it with a doubled cooldown.
+    Latency is time to response headers for requests that got an answer.
+    Only hosts with a recorded outcome get an entry, and at most `max_hosts`
+    are kept: least recently used healthy hosts are forgotten first.
+    """
+
+    def __init__(
+        self,
+        threshold: int = HOST_FAILURE_THRESHOLD,
+        cooldown: float = HOST_COOLDOWN,
+        max_cooldown: float = HOST_COOLDOWN_MAX,
+        window: int = 50,
+        max_hosts: int = HOST_HEALTH_MAX_HOSTS,
+    ):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.window = window
+        self.max_hosts = max_hosts
+        self._hosts: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, url: str) -> Optional[Dict[str, Any]]:
+        h = urlparse(url).netloc.lower()
+        st = self._hosts.get(h)
+        if st is not None:
+            self._hosts.move_to_end(h)
+        return st
+
+    def _host(self, url: str) -> Dict[str, Any]:
+        st = self._get(url)
+        if st is None:
+            st = self._hosts[urlparse(url).netloc.lower()] = {
+                "failures": 0, "trips": 0, "open_until": 0.0, "probing": False,
+                "latencies": deque(maxlen=self.window), "skipped": 0,
+            }
+            if len(self._hosts) > self.max_hosts:
+                self._forget_one()
+        return st
+
+    def _forget_one(self) -> None:
+        # Least recently used host with no recent failures; any LRU host if all are failing
+        for h, st in self._hosts.items():
+            if st["failures"] == 0:
+                del self._hosts[h]
+                return
+        self._hosts.popitem(last=False)
+
+    def allow(self, url: str) -> bool:
+        """False while the host's breaker is open (or a half-open probe is in flight)."""
+        now = time.monotonic()
+        with self._lock:
+            st = self._get(url)
+            if st is None or st["failures"] < self.threshold:
+                return True
+            if now < st["open_until"] or st["probing"]:
+                st["skipped"] += 1
+                return False
+            st["probing"] = True
+            return True
+
+    def is_open(self, url: str) -> bool:
+        """True while requests to this host would be refused (no side effects)."""
+        with self._lock:
+            st = self._get(url)
+            return st is not None and st["failures"] >= self.threshold and (
+                time.monotonic() < st["open_until"] or st["probing"]
+            )
+
+    def timeout_for(self, url: str, timeout: float) -> float:
+        """The caller's timeout, tightened to what this host normally needs."""
+        with self._lock:
+            st = self._get(url)
+            lat = sorted(st["latencies"]) if st is not None else []
+        if len(lat) < HOST_MIN_SAMPLES:
+            return timeout
+        p90 = lat[min(len(lat) - 1, int(len(lat) * 0.9))]
+        return min(timeout, max(HOST_TIMEOUT_MIN, HOST_TIMEOUT_FACTOR * p90))
+
+    def success(self, url: str, latency: float) -> None:
+        with self._lock:
+            st = self._host(url)
+            st["latencies"].append(latency)
+            st["failures"] = 0
+            st["trips"] = 0
+            st["probing"] = False
+
+    def failure(self, url: str) -> None:
+        with self._lock:
+            st = self._host(url)
+            st["failures"] += 1
+            st["probing"] = False
+            if st["failures"] >= self.threshold:
+                st["trips"] += 1
+                cool = min(self.max_cooldown, self.cooldown * 2 ** (st["trips"] - 1))
+                st["open_until"] = time.monotonic() + cool
+
+    def release(self, url: str) -> None:
+        """Forget an in-flight probe without counting it either way."""
+        with self._lock:
+            st = self._get(url)
+            if st is not None:
+                st["probing"] = False
+
+    def reset(self, url: Optional[str] = None) -> None:
+        with self._lock:
+            if url is None:
+                self._hosts.clear()
+            else:
+                self._hosts.pop(urlparse(url).netloc.lower(), None)
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            hosts = {h: dict(st, latencies=sorted(st["latencies"])) for h, st in self._hosts.items()}
+        out = {}
+        for h, st in hosts.items():
+            lat = st["latencies"]
+            out[h] = {
+                "state": "closed" if st["failures"] < self.threshold
+                else ("open" if now < st["open_until"] else "half-open"),
+                "consecutive_failures": st["failures"],
+                "skipped": st["skipped"],
+                "samples": len(lat),
+                "p50": round(lat[len(lat) // 2], 3) if lat else None,
+                "p90": round(lat[min(len(lat) - 1, int(len(lat) * 0.9))], 3) if lat else None,
+            }
+        return out
+
+
+_HOST_HEALTH = HostHealth()
+
+
+def host_health_stats() -> Dict[str, Any]:
+    """Breaker state and latency percentiles per host seen by this process."""
+    return _HOST_HEALTH.stats()
+
+
+def _guarded_get(s: requests.Session, url: str, timeout: float, **kwargs: Any) -> requests.Response:
+    """
+    session.get through the host breaker: raises HostUnavailable while the
+    host is open, uses its adaptive timeout, and records the outcome.
+    """
+    if not _HOST_HEALTH.allow(url):
+        raise HostUnavailable(f"{urlparse(url).netloc}: circuit open after repeated failures")
+    t = _HOST_HEALTH.timeout_for(url, timeout)
+    t0 = time.monotonic()
+    try:
+        r = s.get(url, timeout=(min(CONNECT_TIMEOUT, t), t), **kwargs)
+    except (requests.ConnectionError, requests.Timeout):
+        _HOST_HEALTH.failure(url)
+        raise
+    except BaseException:
+        # Not the host's fault (bad URL, interrupted call): just free a half-open probe
+        _HOST_HEALTH.release(url)
+        raise
+    if r.status_code >= 500:
+        _HOST_HEALTH.failure(url)
+    else:
+        _HOST_HEALTH.success(url, time.monotonic() - t0)
+    return r
+
+
+# ------------------------------
+# HTTP cache (optional, on disk)
+# ------------------------------
+
+_RE_CC_DIRECTIVE = re.compile(r'([a-z\-]+)(?:=("?)([^",]*)\2)?', re.I)
+
+
+def _parse_cache_control(value: str) -> Dict[str, Optional[str]]:
+    return {m.group(1).lower(): m.group(3) for m in _RE_CC_DIRECTIVE.finditer(value or "")}
+
+
+def _http_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return email.utils.parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+class HttpCache:
+    """
+    Small on-disk HTTP cache (SQLite) for GETs.
+
+    - Stores 200 responses with their ETag / Last-Modified.
+    - Honours Cache-Control (no-store, no-cache, max-age, s-maxage) and Expires;
+      without either, uses the usual 10%-of-age heuristic from Last-Modified.
+    - Stale entries are revalidated with If-None-Match / If-Modified-Since and
+      a 304 is served from disk.
+    - Total body size is capped at `max_bytes`; least recently used entries go first.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 256 * 1024 * 1024, max_heuristic_ttl: float = 24 * 3600):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_heuristic_ttl = max_heuristic_ttl
+        self._stats = {"hits": 0, "revalidated": 0, "misses": 0, "stores": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " url TEXT PRIMARY KEY,"
+            " final_url TEXT,"
+            " headers TEXT,"       # JSON
+            " body BLOB,"
+            " etag TEXT,"
+            " last_modified TEXT,"
+            " expires REAL,"
+            " last_access REAL,"
+            " size INTEGER)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_access)")
+        self._db.commit()
+        # Running total of body bytes, so store() doesn't SUM the table each time
+        self._bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    # -- freshness --
+
+    def _expires(self, headers: Any, now: float) -> Optional[float]:
+        """Expiry timestamp for a response, or None if it must not be stored."""
+        cc = _parse_cache_control(headers.get("Cache-Control", ""))
+        if "no-store" in cc:
+            return None
+        vary = headers.get("Vary", "")
+        if vary and any(v.strip().lower() not in ("accept-encoding", "") for v in vary.split(",")):
+            return None
+        if "no-cache" in cc:
+            return now
+        for directive in ("s-maxage", "max-age"):
+            if cc.get(directive) and cc[directive].isdigit():
+                return now + int(cc[directive])
+        exp = _http_date(headers.get("Expires"))
+        if exp is not None:
+            return exp
+        lm = _http_date(headers.get("Last-Modified"))
+        if lm is not None:
+            date = _http_date(headers.get("Date")) or now
+            return now + min(max(0.0, (date - lm) * 0.1), self.max_heuristic_ttl)
+        return now
+
+    # -- storage --
+
+    def lookup(self, url: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT final_url, headers, body, etag, last_modified, expires FROM responses WHERE url = ?",
+                (url,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "final_url": row[0], "headers": json.loads(row[1]), "body": row[2],
+            "etag": row[3], "last_modified": row[4], "expires": row[5],
+        }
+
+    def store(self, url: str, r: requests.Response) -> None:
+        now = time.time()
+        expires = self._expires(r.headers, now)
+        etag, lm = r.headers.get("ETag"), r.headers.get("Last-Modified")
+        # Nothing to gain from an entry that is already stale and can't be revalidated
+        if expires is None or (expires <= now and not (etag or lm)):
+            return
+        body = r.content
+        if len(body) > self.max_bytes // 10:
+            return
+        with self._lock:
+            old = self._db.execute("SELECT size FROM responses WHERE url = ?", (url,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(url, final_url, headers, body, etag, last_modified, expires, last_access, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, r.url, json.dumps(dict(r.headers)), body, etag, lm, expires, now, len(body)),
+            )
+            self._stats["stores"] += 1
+            self._bytes += len(body) - (old[0] if old else 0)
+            if self._bytes > self.max_bytes:
+                self._evict()
+            self._db.commit()
+
+    def refresh(self, url: str, headers: Any) -> None:
+        """Apply a 304's headers: new freshness lifetime, same body."""
+        now = time.time()
+        expires = self._expires(headers, now)
+        with self._lock:
+            self._db.execute(
+                "UPDATE responses SET expires = ?, last_access = ? WHERE url = ?",
+                (expires if expires is not None else now, now, url),
+            )
+            self._db.commit()
+
+    def touch(self, url: str) -> None:
+        with self._lock:
+            self._db.execute("UPDATE responses SET last_access = ? WHERE url = ?", (time.time(), url))
+            self._db.commit()
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until under max_bytes; caller holds the lock."""
+        while self._bytes > self.max_bytes:
+            rows = self._db.execute(
+                "SELECT url, size FROM responses ORDER BY last_access LIMIT 32"
+            ).fetchall()
+            if not rows:
+                self._bytes = 0
+                return
+            for url, size in rows:
+                self._db.execute("DELETE FROM responses WHERE url = ?", (url,))
+                self._stats["evictions"] += 1
+                self._bytes -= size
+                if self._bytes <= self.max_bytes:
+                    return
+
+    def count(self, outcome: str) -> None:
+        with self._lock:
+            self._stats[outcome] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out = dict(self._stats)
+            n = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            size = self._bytes
+        lookups = out["hits"] + out["revalidated"] + out["misses"]
+        out.update({
+            "entries": n,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "hit_ratio": round((out["hits"] + out["revalidated"]) / lookups, 3) if lookups else 0.0,
+        })
+        return out
+
+
+# Module default cache; off unless HTTP_CACHE_DIR is set or enable_http_cache() is called.
+_HTTP_CACHE: Optional[HttpCache] = None
+
+
+def enable_http_cache(path: Optional[str] = None, max_bytes: Optional[int] = None) -> HttpCache:
+    """
+    Turn on the module-wide HTTP cache used by get_html / get_bytes / get_json / fetch_many.
+    """
+    global _HTTP_CACHE
+    directory = path or os.environ.get("HTTP_CACHE_DIR") or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "..", ".cache", "http"
+    )
+    _HTTP_CACHE = HttpCache(
+        os.path.join(directory, "responses.sqlite3"),
+        max_bytes=max_bytes or int(os.environ.get("HTTP_CACHE_MAX_BYTES", str(256 * 1024 * 1024))),
+    )
+    return _HTTP_CACHE
+
+
+def disable_http_cache() -> None:
+    global _HTTP_CACHE
+    _HTTP_CACHE = None
+
+
+def http_cache_stats() -> Dict[str, Any]:
+    """Hit / revalidate / miss counters and size of the module cache ({"enabled": False} if off)."""
+    if _HTTP_CACHE is None:
+        return {"enabled": False}
+    return {"enabled": True, **_HTTP_CACHE.stats()}
+
+
+if os.environ.get("HTTP_CACHE_DIR"):
+    enable_http_cache()
+
+
+def _response_from_cache(url: str, entry: Dict[str, Any]) -> requests.Response:
+    r = requests.Response()
+    r.status_code = 200
+    r.headers = CaseInsensitiveDict(entry["headers"])
+    r._content = entry["body"]
+    r.url = entry["final_url"] or url
+    r.encoding = None
+    return r
+
+
+def _http_get(
+    url: str,
+    timeout: float,
+    session: Optional[requests.Session] = None,
+    allow_redirects: bool = True,
+    params: Optional[Dict[str, Any]] = None,
+    max_bytes: Optional[int] = None,
+    accept_types: Optional[Sequence[str]] = None,
+) -> requests.Response:
+    """
+    GET through the module HTTP cache when it is enabled; plain session.get otherwise.
+    Requests that do go out pass the per-host breaker and adaptive timeout (_guarded_get).
+    The body is streamed and cut off after `max_bytes`; if `accept_types` is
+    given, other Content-Types raise UnsupportedContentType before any body is read.
+    """
+    s = _ensure_session(session)
+    cache = _HTTP_CACHE
+    if cache is None or params:
+        r = _guarded_get(s, url, timeout, params=params, allow_redirects=allow_redirects, stream=True)
+        return _finish_body(r, max_bytes, accept_types)
+
+    entry = cache.lookup(url)
+    if entry and entry["expires"] is not None and entry["expires"] > time.time():
+        cache.count("hits")
+        cache.touch(url)
+        return _check_content_type(_response_from_cache(url, entry), accept_types)
+
+    headers = {}
+    if entry:
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+    r = _guarded_get(s, url, timeout, headers=headers or None, allow_redirects=allow_redirects, stream=True)
+    if r.status_code == 304 and entry:
+        r.close()
+        cache.count("revalidated")
+        cache.refresh(url, r.headers)
+        return _check_content_type(_response_from_cache(url, entry), accept_types)
+
+    cache.count("misses")
+    r = _finish_body(r, max_bytes, accept_types)
+    if r.status_code == 200 and not getattr(r, "truncated", False):
+        cache.store(url, r)
+    return r
+
+
+# ------------------------------
+# Page store (content-addressed, on disk)
+# ------------------------------
+
+class PageStore:
+    """
+    Local store of fetched pages shared by every consumer (get_html, the async
+    fetchers, crawl_once / crawl_site, scrape_events, find_event).
+
+    - Bodies are keyed on the SHA-1 of the raw bytes and zlib-compressed, so
+      mirrors and tracking-param variants of a page are stored once.
+    - Extracted text is kept next to the body once some consumer has parsed
+      it (put_text), so the next reader skips parsing as well as the network.
+    - Canonical URL -> body hash entries are served for `ttl` seconds after
+      the fetch; the compressed total is capped at `max_bytes`, least
+      recently used bodies go first. Expired URL entries and the bodies they
+      orphan are swept every PURGE_EVERY puts.
+    Unlike HttpCache this ignores response freshness headers: it exists to
+    stop one pipeline run from downloading the same page several times.
+    """
+
+    PURGE_EVERY = 256
+
+    def __init__(self, path: str, max_bytes: int = 128 * 1024 * 1024, ttl: float = 6 * 3600):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        self._puts = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS bodies ("
+            " hash TEXT PRIMARY KEY,"
+            " body BLOB,"            # zlib
+            " text BLOB,"            # zlib, NULL until someone parsed the page
+            " title TEXT,"
+            " raw_size INTEGER,"
+            " size INTEGER,"         # compressed body + text
+            " last_access REAL);"
+            "CREATE TABLE IF NOT EXISTS urls ("
+            " url TEXT PRIMARY KEY,"
+            " hash TEXT,"
+            " final_url TEXT,"
+            " content_type TEXT,"
+            " fetched REAL);"
+            "CREATE INDEX IF NOT EXISTS urls_hash ON urls (hash);"
+            "CREATE INDEX IF NOT EXISTS urls_fetched ON urls (fetched);"
+            "CREATE INDEX IF NOT EXISTS bodies_lru ON bodies (last_access);"
+        )
+        self._db.commit()
+        # Running total of stored bytes, so put() doesn't SUM the table each time
+        self._bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM bodies").fetchone()[0]
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Fresh entry for `url` (canonicalized), or None:
+        {url, final_url, content_type, hash, fetched, body, text, title}.
+        `text` is None when nobody has parsed this body yet.
+        """
+        key = canonicalize_url(url)
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT u.hash, u.final_url, u.content_type, u.fetched, b.body, b.text, b.title "
+                "FROM urls u JOIN bodies b ON b.hash = u.hash WHERE u.url = ? AND u.fetched > ?",
+                (key, now - self.ttl),
+            ).fetchone()
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["hits"] += 1
+            self._db.execute("UPDATE bodies SET last_access = ? WHERE hash = ?", (now, row[0]))
+            self._db.commit()
+        return {
+            "url": url, "hash": row[0], "final_url": row[1], "content_type": row[2], "fetched": row[3],
+            "body": zlib.decompress(row[4]),
+            "text": zlib.decompress(row[5]).decode("utf-8") if row[5] is not None else None,
+            "title": row[6] or "",
+        }
+
+    def put(self, url: str, body: bytes, final_url: Optional[str] = None, content_type: str = "") -> str:
+        """Store a fetched body under `url` (canonicalized); returns its content hash."""
+        h = hashlib.sha1(body).hexdigest()
+        now = time.time()
+        with self._lock:
+            exists = self._db.execute("SELECT 1 FROM bodies WHERE hash = ?", (h,)).fetchone()
+        packed = None if exists else zlib.compress(body, 6)
+        with self._lock:
+            inserted = packed is not None and self._db.execute(
+                "INSERT OR IGNORE INTO bodies (hash, body, raw_size, size, last_access) VALUES (?, ?, ?, ?, ?)",
+                (h, packed, len(body), len(packed), now),
+            ).rowcount > 0
+            if inserted:
+                self._bytes += len(packed)
+            else:
+                self._db.execute("UPDATE bodies SET last_access = ? WHERE hash = ?", (now, h))
+            self._db.execute(
+                "INSERT OR REPLACE INTO urls (url, hash, final_url, content_type, fetched) VALUES (?, ?, ?, ?, ?)",
+                (canonicalize_url(url), h, final_url or url, content_type, now),
+            )
+            self._stats["stores"] += 1
+            self._puts += 1
+            if self._puts % self.PURGE_EVERY == 0:
+                self._purge(now)
+            if self._bytes > self.max_bytes:
+                self._evict()
+            self._db.commit()
+        return h
+
+    def put_text(self, h: str, text: str, title: str = "") -> None:
+        """Attach the extracted text (and title) to body `h`; no-op if it is gone."""
+        packed = zlib.compress(text.encode("utf-8"), 6)
+        with self._lock:
+            cur = self._db.execute(
+                "UPDATE bodies SET text = ?, title = ?, size = size + ? WHERE hash = ? AND text IS NULL",
+                (packed, title, len(packed), h),
+            )
+            if cur.rowcount > 0:
+                self._bytes += len(packed)
+                if self._bytes > self.max_bytes:
+                    self._evict()
+            self._db.commit()
+
+    def _drop(self, rows: List[Tuple[str, int]]) -> None:
+        for h, size in rows:
+            self._db.execute("DELETE FROM bodies WHERE hash = ?", (h,))
+            self._db.execute("DELETE FROM urls WHERE hash = ?", (h,))
+            self._stats["evictions"] += 1
+            self._bytes -= size
+
+    def _purge(self, now: float) -> None:
+        """Drop expired URL entries and the bodies nothing points at any more; caller holds the lock."""
+        self._db.execute("DELETE FROM urls WHERE fetched <= ?", (now - self.ttl,))
+        self._drop(self._db.execute(
+            "SELECT hash, size FROM bodies b WHERE NOT EXISTS (SELECT 1 FROM urls u WHERE u.hash = b.hash)"
+        ).fetchall())
+
+    def _evict(self) -> None:
+        """Drop least recently used bodies until under max_bytes; caller holds the lock."""
+        while self._bytes > self.max_bytes:
+            rows = self._db.execute(
+                "SELECT hash, size FROM bodies ORDER BY last_access LIMIT 32"
+            ).fetchall()
+            if not rows:
+                self._bytes = 0
+                return
+            for row in rows:
+                self._drop([row])
+                if self._bytes <= self.max_bytes:
+                    return
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out = dict(self._stats)
+            n, raw = self._db.execute("SELECT COUNT(*), COALESCE(SUM(raw_size), 0) FROM bodies").fetchone()
+            size = self._bytes
+            urls = self._db.execute("SELECT COUNT(*) FROM urls").fetchone()[0]
+        lookups = out["hits"] + out["misses"]
+        out.update({
+            "urls": urls,
+            "bodies": n,
+            "bytes": size,
+            "raw_bytes": raw,
+            "max_bytes": self.max_bytes,
+            "ttl": self.ttl,
+            "hit_ratio": round(out["hits"] / lookups, 3) if lookups else 0.0,
+        })
+        return out
+
+
+# Module default store; on unless PAGE_STORE=0. PAGE_STORE_DIR, PAGE_STORE_MAX_BYTES
+# and PAGE_STORE_TTL override the location, size cap and lifetime.
+_PAGE_STORE: Optional[PageStore] = None
+
+
+def enable_page_store(
+    path: Optional[str] = None,
+    max_bytes: Optional[int] = None,
+    ttl: Optional[float] = None,
+) -> PageStore:
+    """
+    Turn on the module-wide page store read by get_html / afetch / iter_fetch / fetch_many.
+    """
+    global _PAGE_STORE
+    directory = path or os.environ.get("PAGE_STORE_DIR") or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "..", ".cache", "pages"
+    )
+    _PAGE_STORE = PageStore(
+        os.path.join(directory, "pages.sqlite3"),
+        max_bytes=max_bytes or int(os.environ.get("PAGE_STORE_MAX_BYTES", str(128 * 1024 * 1024))),
+        ttl=ttl or float(os.environ.get("PAGE_STORE_TTL", str(6 * 3600))),
+    )
+    return _PAGE_STORE
+
+
+def disable_page_store() -> None:
+    global _PAGE_STORE
+    _PAGE_STORE = None
+
+
+def page_store_stats() -> Dict[str, Any]:
+    """Hit / miss counters and size of the module page store ({"enabled": False} if off)."""
+    if _PAGE_STORE is None:
+        return {"enabled": False}
+    return {"enabled": True, **_PAGE_STORE.stats()}
+
+
+def store_page_text(h: Optional[str], text: str, title: str = "") -> None:
+    """
+    Remember the extracted text of the body with hash `h` (the `body_hash` a
+    fetch result carries), so later readers of that page skip parsing.
+    """
+    if _PAGE_STORE is not None and h:
+        _PAGE_STORE.put_text(h, text, title)
+
+
+if os.environ.get("PAGE_STORE", "1") != "0":
+    enable_page_store()
 
 
 # ------------------------------
 # Fetch
 # ------------------------------
 
+# Bodies larger than this are cut off (multi-MB PDFs served as text/html, etc.).
+FETCH_MAX_BYTES = int(os.environ.get("FETCH_MAX_BYTES", str(3 * 1024 * 1024)))
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml", "text/plain", "application/xml", "text/xml")
+
+# Only sniff this much of the body for <meta charset>, and at most this much
+# for statistical detection when everything else fails.
+_META_SNIFF_BYTES = 4096
+_DETECT_SAMPLE_BYTES = 64 * 1024
+
+_RE_CT_CHARSET = re.compile(r"charset\s*=\s*[\"']?([\w.:-]+)", re.I)
+_RE_META_CHARSET = re.compile(
+    rb"""<meta[^>]+charset\s*=\s*["']?\s*([\w.:-]+)""", re.I
+)
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+
+class UnsupportedContentType(requests.RequestException):
+    """Response Content-Type is not one the caller accepts (e.g. a PDF for get_html)."""
+
+
+def _check_content_type(r: requests.Response, accept_types: Optional[Sequence[str]]) -> requests.Response:
+    if accept_types and r.status_code < 400:
+        ctype = r.headers.get("Content-Type", "").split(";")[0].strip().lower()
+        # Missing Content-Type is common on small sites; let it through
+        if ctype and ctype not in accept_types:
+            r.close()
+            raise UnsupportedContentType(f"Unsupported Content-Type {ctype!r} for {r.url}", response=r)
+    return r
+
+
+def _finish_body(
+    r: requests.Response,
+    max_bytes: Optional[int],
+    accept_types: Optional[Sequence[str]],
+) -> requests.Response:
+    """
+    Gate on Content-Type, then read a streamed body up to `max_bytes`.
+    `truncated` is set only when a byte past the cap was actually read.
+    """
+    _check_content_type(r, accept_types)
+    if max_bytes is None:
+        r.content  # read it all
+        return r
+    chunks, size = [], 0
+    truncated = False
+    for chunk in r.iter_content(chunk_size=64 * 1024):
+        chunks.append(chunk)
+        size += len(chunk)
+        if size > max_bytes:
+            truncated = True
+            break
+    body = b"".join(chunks)
+    if truncated:
+        body = body[:max_bytes]
+        r.close()  # don't drain the rest into the pool
+    r._content = body
+    r._content_consumed = True
+    r.truncated = truncated
+    return r
+
+
+def _valid_codec(name: Optional[str]) -> Optional[str]:
+    if not name:
+        return None
+    try:
+        return codecs.lookup(name.strip().strip("\"'")).name
+    except LookupError:
+        return None
+
+
+def detect_encoding(headers: Any, body: bytes) -> str:
+    """
+    Cheap charset detection: Content-Type charset → BOM → <meta charset> in the
+    first 4 KB → strict UTF-8 → statistical detection on a 64 KB sample.
+    """
+    m = _RE_CT_CHARSET.search(headers.get("Content-Type", "") if headers else "")
+    enc = _valid_codec(m.group(1)) if m else None
+    if enc:
+        return enc
+    for bom, name in _BOMS:
+        if body.startswith(bom):
+            return name
+    m = _RE_META_CHARSET.search(body[:_META_SNIFF_BYTES])
+    enc = _valid_codec(m.group(1).decode("ascii", "ignore")) if m else None
+    if enc:
+        return enc
+    try:
+        body.decode("utf-8")
+        return "utf-8"
+    except UnicodeDecodeError as e:
+        # A multi-byte char cut off by the size cap is still UTF-8
+        if e.start >= len(body) - 3 and e.reason == "unexpected end of data":
+            return "utf-8"
+    from requests.compat import chardet
+    guess = chardet.detect(body[:_DETECT_SAMPLE_BYTES]) if chardet else None
+    return _valid_codec((guess or {}).get("encoding")) or "utf-8"
+
+
+def decode_body(headers: Any, body: bytes) -> str:
+    return body.decode(detect_encoding(headers, body), errors="replace")
+
+
+
+def _store_response(url: str, r: requests.Response) -> Optional[str]:
+    """Put a complete 200 body into the page store; returns its hash (None if not stored)."""
+    if _PAGE_STORE is None or r.status_code != 200 or getattr(r, "truncated", False):
+        return None
+    return _PAGE_STORE.put(url, r.content, r.url, r.headers.get("Content-Type", ""))
+
+
 def get_html(
     url: str,
     timeout: int = 15,
     session: Optional[requests.Session] = None,
     allow_redirects: bool = True,
+    max_bytes: Optional[int] = FETCH_MAX_BYTES,
 ) -> str:
     """
-    Fetch decoded HTML as text. Raises for HTTP errors.
+    Fetch decoded HTML as text. Raises for HTTP errors and for non-HTML
+    Content-Types (UnsupportedContentType). Bodies are cut off at `max_bytes`.
     """
-    s = _ensure_session(session)
-    r = s.get(url, timeout=timeout, allow_redirects=allow_redirects)
+    hit = _PAGE_STORE.get(url) if _PAGE_STORE is not None and allow_redirects else None
+    if hit is not None:
+        return decode_body({"Content-Type": hit["content_type"]}, hit["body"][:max_bytes])
+    r = _http_get(url, timeout, session, allow_redirects, max_bytes=max_bytes, accept_types=HTML_CONTENT_TYPES)
     r.raise_for_status()
-    r.encoding = r.apparent_encoding or "utf-8"
-    return r.text
+    if allow_redirects:
+        _store_response(url, r)
+    return decode_body(r.headers, r.content)
 
 
 def get_bytes(
@@ -83,8 +955,7 @@ def get_bytes(
     """
     Fetch raw bytes. Raises for HTTP errors.
     """
-    s = _ensure_session(session)
-    r = s.get(url, timeout=timeout, allow_redirects=allow_redirects)
+    r = _http_get(url, timeout, session, allow_redirects)
     r.raise_for_status()
     return r.content
 
@@ -123,12 +994,203 @@ def get_json(
     """
     Convenience: GET JSON endpoint and parse.
     """
-    s = _ensure_session(session)
-    r = s.get(url, timeout=timeout)
+    r = _http_get(url, timeout, session)
     r.raise_for_status()
     return r.json()
 
 
+# ------------------------------
+# Async fetch (bounded concurrency)
+# ------------------------------
+
+# urllib3 retries for the async fetchers' default session. Each retry of a dead
+# host costs another connect timeout; the host breaker handles persistent failure.
+FETCH_RETRIES = int(os.environ.get("FETCH_RETRIES", "1"))
+
+# Global cap on concurrent requests across all async callers, and per host.
+FETCH_MAX_IN_FLIGHT = int(os.environ.get("FETCH_MAX_IN_FLIGHT", "16"))
+FETCH_PER_HOST = int(os.environ.get("FETCH_PER_HOST", "2"))
+
+# Blocking requests calls run here, not in the event loop's default executor.
+_FETCH_EXECUTOR: Optional[ThreadPoolExecutor] = None
+
+
+def _fetch_executor() -> ThreadPoolExecutor:
+    global _FETCH_EXECUTOR
+    if _FETCH_EXECUTOR is None:
+        _FETCH_EXECUTOR = ThreadPoolExecutor(
+            max_workers=max(FETCH_MAX_IN_FLIGHT, 4), thread_name_prefix="fetch"
+        )
+    return _FETCH_EXECUTOR
+
+
+class FetchLimiter:
+    """
+    Global + per-host concurrency limits for async fetches.
+    asyncio primitives are loop-bound, so use one limiter per event loop.
+    """
+
+    def __init__(self, max_in_flight: int = FETCH_MAX_IN_FLIGHT, per_host: int = FETCH_PER_HOST):
+        self.max_in_flight = max_in_flight
+        self.per_host = per_host
+        self._global = asyncio.Semaphore(max_in_flight)
+        self._hosts: Dict[str, asyncio.Semaphore] = {}
+
+    def host(self, url: str) -> asyncio.Semaphore:
+        h = urlparse(url).netloc.lower()
+        if h not in self._hosts:
+            self._hosts[h] = asyncio.Semaphore(self.per_host)
+        return self._hosts[h]
+
+
+_LIMITERS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, FetchLimiter]" = weakref.WeakKeyDictionary()
+
+
+def _shared_limiter() -> FetchLimiter:
+    loop = asyncio.get_running_loop()
+    if loop not in _LIMITERS:
+        _LIMITERS[loop] = FetchLimiter()
+    return _LIMITERS[loop]
+
+
+def _stored_result(url: str, raw: bool = False) -> Optional[Dict[str, Any]]:
+    """Fetch result for `url` straight from the page store, or None."""
+    hit = _PAGE_STORE.get(url) if _PAGE_STORE is not None else None
+    if hit is None:
+        return None
+    out: Dict[str, Any] = {
+        "url": url, "ok": True, "status": 200, "final_url": hit["final_url"], "html": "",
+        "body_hash": hit["hash"], "from_store": True, "elapsed": 0.0,
+    }
+    if hit["text"] is not None:
+        out["text"], out["title"] = hit["text"], hit["title"]
+    if raw:
+        out["body"], out["content_type"] = hit["body"], hit["content_type"]
+    else:
+        out["html"] = decode_body({"Content-Type": hit["content_type"]}, hit["body"])
+    return out
+
+
+def _fetch_result(url: str, timeout: float, session: Optional[requests.Session], raw: bool = False) -> Dict[str, Any]:
+    """
+    Blocking single fetch → structured result (never raises).
+    Bodies go into the page store; `body_hash` names them there (None when
+    the body was not stored, e.g. truncated).
+    """
+    t0 = time.monotonic()
+    out: Dict[str, Any] = {"url": url, "ok": False, "status": None, "final_url": url, "html": ""}
+    try:
+        r = _http_get(url, timeout, session or get_shared_session(retries=FETCH_RETRIES),
+                      max_bytes=FETCH_MAX_BYTES, accept_types=HTML_CONTENT_TYPES)
+        out["status"] = r.status_code
+        out["final_url"] = r.url
+        r.raise_for_status()
+        out["body_hash"] = _store_response(url, r)
+        if raw:
+            # Leave decoding to whoever parses the page (e.g. parse_page in a worker process)
+            out["body"] = r.content
+            out["content_type"] = r.headers.get("Content-Type", "")
+        else:
+            out["html"] = decode_body(r.headers, r.content)
+        out["ok"] = True
+    except Exception as e:
+        out["error"] = f"{type(e).__name__}: {e}"
+    out["elapsed"] = round(time.monotonic() - t0, 3)
+    return out
+
+
+async def afetch(
+    url: str,
+    timeout: float = 15,
+    deadline: Optional[float] = None,
+    session: Optional[requests.Session] = None,
+    limiter: Optional[FetchLimiter] = None,
+    raw: bool = False,
+) -> Dict[str, Any]:
+    """
+    Async fetch of one URL under the global and per-host limits.
+    `deadline` is an absolute time.monotonic() value; the request timeout is
+    clipped to what is left of it, and nothing is sent once it has passed.
+    Returns {url, ok, status, final_url, html, body_hash, elapsed, error?}; with
+    raw=True the undecoded `body` bytes and `content_type` come back instead of html.
+    Pages in the page store are returned without touching the limits or the
+    network (`from_store`, plus `text`/`title` if someone parsed them already).
+    """
+    loop = asyncio.get_running_loop()
+    if _PAGE_STORE is not None:
+        stored = await loop.run_in_executor(_fetch_executor(), _stored_result, url, raw)
+        if stored is not None:
+            return stored
+    if _HOST_HEALTH.is_open(url):
+        # Don't let a dead host hold a global or per-host slot
+        return {"url": url, "ok": False, "status": None, "final_url": url, "html": "", "elapsed": 0.0,
+                "error": f"HostUnavailable: {urlparse(url).netloc}: circuit open after repeated failures"}
+    limiter = limiter or _shared_limiter()
+    async with limiter._global:
+        async with limiter.host(url):
+            t = timeout
+            if deadline is not None:
+                t = min(timeout, deadline - time.monotonic())
+                if t <= 0.05:
+                    return {"url": url, "ok": False, "status": None, "final_url": url,
+                            "html": "", "elapsed": 0.0, "error": "DeadlineExceeded: no time left"}
+            fut = loop.run_in_executor(_fetch_executor(), _fetch_result, url, t, session, raw)
+            try:
+                # requests' timeout is per socket op, so also bound the whole call
+                return await asyncio.wait_for(fut, timeout=t + 1.0)
+            except asyncio.TimeoutError:
+                return {"url": url, "ok": False, "status": None, "final_url": url,
+                        "html": "", "elapsed": round(t + 1.0, 3), "error": "TimeoutError: fetch exceeded its budget"}
+
+
+async def iter_fetch(
+    urls: Sequence[str],
+    timeout: float = 15,
+    deadline: Optional[float] = None,
+    max_in_flight: Optional[int] = None,
+    per_host: Optional[int] = None,
+    session: Optional[requests.Session] = None,
+    raw: bool = False,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Fetch `urls` concurrently and yield results as they complete.
+    Without max_in_flight/per_host the process-wide limits are shared with
+    every other caller; with them, this call gets its own limiter.
+    Closing the iterator early cancels fetches that haven't started.
+    """
+    limiter = (
+        FetchLimiter(max_in_flight or FETCH_MAX_IN_FLIGHT, per_host or FETCH_PER_HOST)
+        if (max_in_flight or per_host) else None
+    )
+    tasks = [
+        asyncio.ensure_future(afetch(u, timeout=timeout, deadline=deadline, session=session, limiter=limiter, raw=raw))
+        for u in urls
+    ]
+    try:
+        for fut in asyncio.as_completed(tasks):
+            yield await fut
+    finally:
+        for t in tasks:
+            t.cancel()
+
+
+async def fetch_many(
+    urls: Sequence[str],
+    timeout: float = 15,
+    deadline: Optional[float] = None,
+    max_in_flight: Optional[int] = None,
+    per_host: Optional[int] = None,
+    session: Optional[requests.Session] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Fetch `urls` concurrently; results in input order (see iter_fetch / afetch).
+    """
+    by_url: Dict[str, Dict[str, Any]] = {}
+    async for res in iter_fetch(urls, timeout, deadline, max_in_flight, per_host, session):
+        by_url[res["url"]] = res
+    return [by_url[u] for u in urls]
+
+
 # ------------------------------
 # URL utilities
 # ------------------------------
@@ -177,33 +1239,177 @@ def dedupe_preserve_order(items: Iterable[str]) -> List[str]:
 # Parse (regex-only, no BS4)
 # ------------------------------
 
-_RE_SCRIPT_STYLE = re.compile(r"<(script|style)[^>]*>.*?</\1>", re.I | re.S)
-_RE_TAG = re.compile(r"<[^>]+>")
-_RE_TITLE = re.compile(r"<title[^>]*>(.*?)</title>", re.I | re.S)
-_RE_HREF = re.compile(r'href=["\']([^"\']+)["\']', re.I)
+# One pass over the markup. A single alternation classifies every token and
+# re.sub copies the text between tokens in C, so Python only runs per tag.
+_RE_TOKEN = re.compile(
+    r"<(?:(?i:a|area)\s([^>]*)>"                                                         # 1: link
+    r"|(?!(?i:script|style|template|title)\b)(/?)([A-Za-z][A-Za-z0-9:-]*)([^>]*)>"       # 2-4: tag
+    r"|(!--(?:-?>|[^-]*(?:-(?!->)[^-]*)*(?:-->|(\Z)))"                                 # 5-8: dropped
+    r"|(?i:(script|style|template)\b[^>]*>[^<]*(?:<(?!/\7\s*>)[^<]*)*(?:</\7\s*>|(\Z))))"
+    r"|(?i:title\b[^>]*>([^<]*(?:<(?!/title\s*>)[^<]*)*)(?:</title\s*>|(\Z)))"       # 9-10: title
+    r"|[!?][^>]*>)",                                                                   # doctype, <?xml
+    re.S,
+)
+_RE_ATTR_HREF = re.compile(r"""\bhref\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""", re.I)
+_SKIP_CLOSE = {
+    "--": re.compile(r"-->"),
+    "script": re.compile(r"</script\s*>", re.I),
+    "style": re.compile(r"</style\s*>", re.I),
+    "template": re.compile(r"</template\s*>", re.I),
+}
+# Tags that start a new line in the extracted text; any other tag is a space.
+_BLOCK_TAGS = frozenset(
+    "p div br li ul ol dl dt dd h1 h2 h3 h4 h5 h6 tr table thead tbody tfoot "
+    "section article header footer nav aside main blockquote pre form fieldset "
+    "hr address figure figcaption details summary option".split()
+)
 
+# A tag or <title> still open at the end of a chunk is carried into the next
+# feed; past this size it is processed as-is instead.
+_MAX_PENDING = 64 * 1024
 
-def extract_title(html: str) -> str:
-    m = _RE_TITLE.search(html)
-    return (m.group(1).strip() if m else "")
 
+class HTMLExtractor:
+    """
+    Streaming single-pass HTML extractor: title, visible text and hrefs together.
+
+        ex = HTMLExtractor()
+        for chunk in chunks:
+            ex.feed(chunk)
+        doc = ex.close()   # {"title", "text", "links"}
+
+    Text keeps block-level breaks as newlines (one line per paragraph, list
+    item, heading, ...); script/style/template content and comments are dropped.
+    Only a short unterminated tag is carried between feeds (a long script is
+    skipped by scanning for its closing tag), and `max_text_chars` /
+    `max_links` bound the output on huge pages.
+    """
 
-def html_to_text(html: str) -> str:
+    def __init__(self, max_text_chars: Optional[int] = None, max_links: Optional[int] = None):
+        self.max_text_chars = max_text_chars
+        self.max_links = max_links
+        self._pending = ""
+        self._skip: Optional[re.Pattern] = None     # inside <script>/<style>/comment: closing pattern
+        self._final = False
+        self._title: Optional[str] = None
+        self._text: List[str] = []
+        self._text_len = 0
+        self._links: List[str] = []
+        self._seen_links: set = set()
+        self._tag_out: Dict[str, str] = {}     # tag name -> "\n" or " "
+        self._token = self._make_token()
+
+    def _make_token(self):
+        # re.sub calls this once per token, so the common case (an ordinary
+        # tag already seen on this page) is a single dict lookup.
+        tag_out = self._tag_out
+        get = tag_out.get
+        links = self._links
+        seen_links = self._seen_links
+        max_links = self.max_links
+
+        def token(m: "re.Match") -> str:
+            name = m[3]
+            out = get(name)
+            if out is not None:
+                return out
+            if name is not None:
+                out = tag_out[name] = "\n" if name.lower() in _BLOCK_TAGS else " "
+                return out
+            attrs = m[1]
+            if attrs is not None:
+                h = _RE_ATTR_HREF.search(attrs)
+                if h and (max_links is None or len(links) < max_links):
+                    href = _html.unescape((h[1] or h[2] or h[3] or "").strip())
+                    if href and href not in seen_links:
+                        seen_links.add(href)
+                        links.append(href)
+                return " "
+            if m[5] is not None:
+                if (m[6] is not None or m[8] is not None) and not self._final:
+                    # Comment / script runs past the end of this chunk
+                    self._skip = _SKIP_CLOSE[(m[7] or "--").lower()]
+                    self._pending = m[0][-12:]
+                return " "
+            if m[9] is not None:
+                if m[10] is not None and not self._final and len(m[0]) <= _MAX_PENDING:
+                    # <title> not closed yet: retry with the next chunk
+                    self._pending = m[0]
+                    return ""
+                if self._title is None:
+                    self._title = m[9]
+                return "\n" + m[9] + "\n"
+            return " "
+
+        return token
+
+    def feed(self, data: str) -> None:
+        buf = self._pending + data if self._pending else data
+        self._pending = ""
+        if self._skip is not None:
+            m = self._skip.search(buf)
+            if m is None:
+                # Keep enough to match a closing tag split across chunks
+                self._pending = buf[-12:]
+                return
+            self._skip = None
+            buf = buf[m.end():]
+
+        rest = ""
+        if not self._final:
+            lt = buf.rfind("<")
+            if lt != -1 and len(buf) - lt <= _MAX_PENDING and buf.find(">", lt) == -1:
+                # Possibly a tag cut off at the end of this chunk
+                buf, rest = buf[:lt], buf[lt:]
+
+        out = _RE_TOKEN.sub(self._token, buf)
+        self._pending += rest
+        if self.max_text_chars is not None:
+            out = out[:max(self.max_text_chars - self._text_len, 0)]
+        if out:
+            self._text.append(out)
+            self._text_len += len(out)
+
+    def close(self) -> Dict[str, Any]:
+        if self._pending and self._skip is None:
+            self._final = True
+            pending, self._pending = self._pending, ""
+            self.feed(pending)
+        self._pending = ""
+        text = _html.unescape("".join(self._text))
+        lines = (" ".join(line.split()) for line in text.split("\n"))
+        title = " ".join(_html.unescape(self._title or "").split())
+        return {"title": title, "text": "\n".join(line for line in lines if line), "links": list(self._links)}
+
+
+def parse_html(
+    html: str,
+    max_text_chars: Optional[int] = None,
+    max_links: Optional[int] = None,
+) -> Dict[str, Any]:
     """
-    Remove <script>/<style>, strip tags, unescape entities, collapse whitespace.
+    Single pass over `html` → {"title", "text", "links"} (links are raw hrefs).
     """
-    clean = _RE_SCRIPT_STYLE.sub(" ", html)
-    clean = _RE_TAG.sub(" ", clean)
-    clean = _html.unescape(clean)
-    return re.sub(r"\s+", " ", clean).strip()
+    ex = HTMLExtractor(max_text_chars=max_text_chars, max_links=max_links)
+    ex.feed(html)
+    return ex.close()
 
 
-def extract_links(html: str, base: Optional[str] = None, allow_external: bool = True) -> List[str]:
+def extract_title(html: str) -> str:
+    return parse_html(html, max_text_chars=0, max_links=0)["title"]
+
+
+def html_to_text(html: str) -> str:
     """
-    Extract absolute <a href> links. If base is None, only absolute http(s) links are returned.
+    Visible text: drops <script>/<style>, strips tags, unescapes entities,
+    collapses whitespace and keeps one line per block element.
     """
+    return parse_html(html, max_links=0)["text"]
+
+
+def _resolve_links(hrefs: Iterable[str], base: Optional[str], allow_external: bool) -> List[str]:
     links = []
-    for h in _RE_HREF.findall(html):
+    for h in hrefs:
         if base:
             u = normalize_url(base, h)
         else:
@@ -217,6 +1423,12 @@ def extract_links(html: str, base: Optional[str] = None, allow_external: bool =
     return dedupe_preserve_order(links)
 
 
+def extract_links(html: str, base: Optional[str] = None, allow_external: bool = True) -> List[str]:
+    """
+    Extract absolute <a href> links. If base is None, only absolute http(s) links are returned.
+    """
+    return _resolve_links(parse_html(html, max_text_chars=0)["links"], base, allow_external)
+
 
 def filter_links(
     links: Sequence[str],
@@ -243,20 +1455,144 @@ def filter_links(
 # Search / extraction
 # ------------------------------
 
-def find_terms_in_text(text: str, terms: Sequence[str], context: int = 80) -> List[Dict[str, str]]:
+def _lower_same_length(text: str) -> str:
+    # Offsets into the lowercased text must be valid in the original
+    low = text.lower()
+    if len(low) == len(text):
+        return low
+    return "".join(c.lower() if len(c.lower()) == 1 else c for c in text)
+
+
+def _is_word_char(c: str) -> bool:
+    return c.isalnum() or c == "_"
+
+
+@lru_cache(maxsize=64)
+def _terms_scanner(terms: Tuple[str, ...]) -> Tuple["re.Pattern", Dict[str, List[str]]]:
     """
-    Return [{term, snippet}] for first occurrence of each term.
+    For lowercased `terms`: a regex whose group 1 is the longest term starting
+    at each position (a lookahead, so hits may overlap), and for each term the
+    shorter terms that are its prefixes, i.e. that start at the same position.
+    The terms are compiled into a prefix trie so the regex engine tests each
+    character once instead of trying every term in turn.
     """
-    low = text.lower()
-    hits: List[Dict[str, str]] = []
+    trie: Dict[str, Any] = {}
     for t in terms:
-        q = t.lower()
-        i = low.find(q)
-        if i != -1:
-            s = max(0, i - context)
-            e = min(len(text), i + len(t) + context)
-            hits.append({"term": t, "snippet": text[s:e].strip()})
-    return hits
+        d = trie
+        for ch in t:
+            d = d.setdefault(ch, {})
+        d[""] = True
+
+    def build(d: Dict[str, Any]) -> str:
+        alts = [re.escape(ch) + build(sub) for ch, sub in sorted(d.items()) if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        return "(?:" + body + ")?" if "" in d else body
+
+    by_len = sorted(terms, key=len, reverse=True)
+    prefixes = {t: [p for p in by_len if len(p) < len(t) and t.startswith(p)] for t in terms}
+    return re.compile("(?=(" + build(trie) + "))"), prefixes
+
+
+def find_terms_in_text(
+    text: str,
+    terms: Sequence[str],
+    context: int = 80,
+    all_hits: bool = False,
+    word_boundary: bool = False,
+    merge_overlaps: bool = False,
+    max_hits: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Case-insensitive term search → [{term, snippet}].
+
+    By default only the first occurrence of each term is returned, in `terms`
+    order. all_hits=True returns every occurrence, overlapping ones included
+    (up to `max_hits`), in text order, each with its character `offset`.
+    word_boundary=True only matches whole words ("tent" won't hit "content").
+    merge_overlaps=True joins hits whose snippet windows overlap into one
+    {term, terms, snippet, offset}.
+
+    Cost: first hits are one str.find per term. all_hits without max_hits
+    scans for every term and sorts the hits, so a term-dense page costs
+    several times the first-hit search (bench.py terms); pass max_hits when
+    only the first few are needed and the search stops there.
+    """
+    low = _lower_same_length(text)
+    by_lower: Dict[str, str] = {}
+    for t in terms:
+        if t:
+            by_lower.setdefault(t.lower(), t)
+
+    n = len(low)
+
+    def _bounded(i: int, q: str) -> bool:
+        return not word_boundary or not (
+            (i > 0 and _is_word_char(low[i - 1]))
+            or (i + len(q) < n and _is_word_char(low[i + len(q)]))
+        )
+
+    found: List[Tuple[int, str]] = []          # (offset, lowercased term)
+    if all_hits and max_hits:
+        # One scan for every term in text order (longest term first at each
+        # offset) that stops after max_hits; a page full of hits costs no
+        # more than its first few.
+        scanner, prefixes = _terms_scanner(tuple(by_lower))
+        for m in scanner.finditer(low):
+            i, longest = m.start(), m[1]
+            for q in (longest, *prefixes[longest]):
+                if _bounded(i, q):
+                    found.append((i, q))
+            if len(found) >= max_hits:
+                del found[max_hits:]
+                break
+    else:
+        # str.find runs in C at memory speed. When every hit is wanted, one
+        # find loop per term plus a sort still beats the single regex scan
+        # above, which CPython runs about twice as slowly (see bench.py terms).
+        for q in by_lower:
+            i = low.find(q)
+            while i != -1:
+                if _bounded(i, q):
+                    found.append((i, q))
+                    if not all_hits:
+                        break
+                i = low.find(q, i + 1)
+        if all_hits:
+            found.sort(key=lambda h: (h[0], -len(h[1])))
+
+    def _window(i: int, q: str) -> Tuple[int, int]:
+        return max(0, i - context), min(len(text), i + len(q) + context)
+
+    if not merge_overlaps:
+        hits: List[Dict[str, Any]] = []
+        for i, q in found:
+            s, e = _window(i, q)
+            hit: Dict[str, Any] = {"term": by_lower[q], "snippet": text[s:e].strip()}
+            if all_hits:
+                hit["offset"] = i
+            hits.append(hit)
+        return hits
+
+    merged: List[Dict[str, Any]] = []
+    cur_s = cur_e = -1
+    cur_terms: List[str] = []
+    for i, q in sorted(found):
+        s, e = _window(i, q)
+        if cur_terms and s <= cur_e:
+            cur_e = max(cur_e, e)
+            if by_lower[q] not in cur_terms:
+                cur_terms.append(by_lower[q])
+            continue
+        if cur_terms:
+            merged.append({"term": cur_terms[0], "terms": cur_terms,
+                           "snippet": text[cur_s:cur_e].strip(), "offset": cur_s})
+        cur_s, cur_e, cur_terms = s, e, [by_lower[q]]
+    if cur_terms:
+        merged.append({"term": cur_terms[0], "terms": cur_terms,
+                       "snippet": text[cur_s:cur_e].strip(), "offset": cur_s})
+    return merged
 
 
 def find_terms_in_url(
@@ -266,52 +1602,188 @@ def find_terms_in_url(
     timeout: int = 15,
     session: Optional[requests.Session] = None,
 ) -> Dict[str, Any]:
-    html = get_html(url, timeout=timeout, session=session)
-    text = html_to_text(html)
+    doc = parse_html(get_html(url, timeout=timeout, session=session), max_links=0)
     return {
         "url": url,
-        "title": extract_title(html),
-        "hits": find_terms_in_text(text, terms, context),
+        "title": doc["title"],
+        "hits": find_terms_in_text(doc["text"], terms, context),
     }
 
 
-# Contacts / hours (naive regex; keep tiny)
-
-_RE_EMAIL = re.compile(r"[A-Za-z0-9._%+\-]+@[A-Za-z0-9.\-]+\.[A-Za-z]{2,}")
-_RE_PHONE = re.compile(r"(?:\+1\s*)?(?:\(\d{3}\)|\d{3})[.\-\s]?\d{3}[.\-\s]?\d{4}")
-_RE_HOURS = re.compile(
-    r"(Mon|Tue|Wed|Thu|Fri|Sat|Sun)[^\n]{0,30}"
-    r"(\d{1,2}(:\d{2})?\s?(am|pm|AM|PM)?\s?[-–]\s?\d{1,2}(:\d{2})?\s?(am|pm|AM|PM)?)"
+# Contacts / hours (regex; one scan for emails + phones, one for hours)
+
+_WEEKDAY_CAPS = "MTWFS"      # first letters of Mon Tue Wed Thu Fri Sat Sun
+_TIME = r"\d{1,2}(?::\d{2})?\s?(?:am|pm|AM|PM)?"
+# (?:Mon|Tue|Wed|Thu|Fri|Sat|Sun) preceded by \b, written as the rest of each
+# name after its (consumed) capital, checked with a lookbehind
+_WEEKDAY_REST = "(?:" + "|".join(
+    rf"(?<=\b{day[0]}){day[1:]}" for day in ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+) + ")"
+_RE_CONTACT = re.compile(
+    # Every entity starts with one of these characters. Stating that up front
+    # lets the regex engine skip all other positions without trying the
+    # alternatives, which is most of the text.
+    r"[+(@\d]"
+    r"(?:"
+    # email: match the domain after "@"; the local part is found backwards
+    r"(?<=@)(?P<email>[A-Za-z0-9.\-]+\.[A-Za-z]{2,})"
+    # phone: +1 212 555 0100 / (212) 555-0100 / 212.555.0100
+    r"|(?P<phone>(?:(?<=\+)1\s*(?:\(\d{3}\)|\d{3})|(?<=\()\d{3}\)|(?<=\d)\d\d)[.\-\s]?\d{3}[.\-\s]?\d{4})"
+    r")"
+)
+# Hours get their own scan: the gap may hold dates ("Tuesday, Nov 12: 5-7pm"),
+# and in a shared scan an hours match would swallow a phone number after it.
+# A weekday at a word start, then a time range within 30 characters on the same line.
+_RE_HOURS_SCAN = re.compile(
+    r"[" + _WEEKDAY_CAPS + r"]" + _WEEKDAY_REST + r"[^\n]{0,30}" + _TIME + r"\s?[-–]\s?" + _TIME
 )
+_RE_EMAIL_LOCAL = re.compile(r"(?<![A-Za-z0-9._%+\-])[A-Za-z0-9._%+\-]+$")
+_RE_NON_DIGIT = re.compile(r"\D")
+
+
+def phone_e164(phone: str, default_country: str = "1") -> str:
+    """
+    "(214) 555-0100" / "+1 214.555.0100" -> "+12145550100" (NANP numbers).
+    """
+    digits = _RE_NON_DIGIT.sub("", phone)
+    if len(digits) == 10:
+        digits = default_country + digits
+    return "+" + digits
+
+
+def extract_contacts(text: str) -> Dict[str, List[str]]:
+    """
+    Extract all contact information from text: one scan for emails and
+    phones, one for hours. Returns dict with emails, phones (E.164) and
+    hours, each sorted and deduplicated.
+    """
+    emails, phones = set(), set()
+    for m in _RE_CONTACT.finditer(text):
+        if m.lastgroup == "email":
+            at = m.start()
+            local = _RE_EMAIL_LOCAL.search(text, max(0, at - 64), at)
+            if local:
+                emails.add(local.group(0) + m.group(0))
+        else:
+            phones.add(phone_e164(m.group(0)))
+    hours = {m.group(0).strip() for m in _RE_HOURS_SCAN.finditer(text)}
+    return {"emails": sorted(emails), "phones": sorted(phones), "hours": sorted(hours)}
 
 
 def extract_emails(text: str) -> List[str]:
-    return sorted(set(_RE_EMAIL.findall(text)))
+    return extract_contacts(text)["emails"]
 
 
 def extract_phones(text: str) -> List[str]:
-    return sorted(set(p.strip() for p in _RE_PHONE.findall(text)))
+    return extract_contacts(text)["phones"]
 
 
 def extract_hours(text: str) -> List[str]:
-    return sorted(set(m.group(0).strip() for m in _RE_HOURS.finditer(text)))
+    return extract_contacts(text)["hours"]
 
+# ------------------------------
+# robots.txt (cached per origin)
+# ------------------------------
 
-def extract_contacts(text: str) -> Dict[str, List[str]]:
+ROBOTS_TTL = 3600
+# An unreachable robots.txt is treated as "disallow all" (RFC 9309), but only
+# for a short while so a blip doesn't shut a site out for an hour.
+ROBOTS_ERROR_TTL = 300
+
+_ROBOTS: Dict[str, tuple] = {}          # origin -> (expires, RobotFileParser)
+_ROBOTS_LOCK = threading.Lock()
+
+
+def _robots_for(url: str, timeout: float, session: Optional[requests.Session]) -> RobotFileParser:
+    p = urlparse(url)
+    origin = f"{p.scheme}://{p.netloc.lower()}"
+    hit = _ROBOTS.get(origin)
+    if hit and hit[0] > time.time():
+        return hit[1]
+
+    rp = RobotFileParser(origin + "/robots.txt")
+    ttl = ROBOTS_TTL
+    try:
+        r = _http_get(origin + "/robots.txt", timeout, session, max_bytes=512 * 1024)
+        if r.status_code in (401, 403):
+            rp.disallow_all = True
+        elif 400 <= r.status_code < 500:
+            rp.allow_all = True
+        elif r.status_code >= 500:
+            rp.disallow_all = True
+            ttl = ROBOTS_ERROR_TTL
+        else:
+            rp.parse(decode_body(r.headers, r.content).splitlines())
+    except requests.RequestException:
+        rp.disallow_all = True
+        ttl = ROBOTS_ERROR_TTL
+    rp.modified()
+    with _ROBOTS_LOCK:
+        _ROBOTS[origin] = (time.time() + ttl, rp)
+    return rp
+
+
+def robots_allowed(
+    url: str,
+    user_agent: str = UA,
+    timeout: float = 10,
+    session: Optional[requests.Session] = None,
+) -> bool:
     """
-    Extract all contact information from text.
-    Returns dict with emails, phones, and hours.
+    May `user_agent` fetch `url` according to the site's robots.txt?
+    robots.txt is fetched once per origin and cached for ROBOTS_TTL.
     """
-    return {
-        "emails": extract_emails(text),
-        "phones": extract_phones(text),
-        "hours": extract_hours(text)
-    }
+    return _robots_for(url, timeout, session).can_fetch(user_agent, url)
+
+
+def robots_crawl_delay(
+    url: str,
+    user_agent: str = UA,
+    timeout: float = 10,
+    session: Optional[requests.Session] = None,
+) -> Optional[float]:
+    """Crawl-delay for `user_agent` from the site's robots.txt, if any."""
+    d = _robots_for(url, timeout, session).crawl_delay(user_agent)
+    return float(d) if d is not None else None
+
 
 # ------------------------------
 # Higher-level mini-composites (still tiny)
 # ------------------------------
 
+def parse_page(
+    body: bytes,
+    content_type: str = "",
+    url: str = "",
+    preview_chars: int = 3000,
+    text: Optional[str] = None,
+    title: str = "",
+    include_text: bool = False,
+) -> Dict[str, Any]:
+    """
+    Raw page bytes → compact parse result, CPU only (no I/O).
+    Top-level and picklable so it can run in a worker process: bytes in,
+    {url, title, text_preview, full_text_length, text_hash, contacts} out.
+    `text_hash` is the SHA-1 of the whitespace-normalized text.
+    Pass `text`/`title` (e.g. from the page store) to skip decoding and HTML
+    parsing; include_text=True also returns the full `text` for storing.
+    """
+    if text is None:
+        doc = parse_html(decode_body({"Content-Type": content_type}, body), max_links=0)
+        text, title = doc["text"], doc["title"]
+    out = {
+        "url": url,
+        "title": title,
+        "text_preview": text[:preview_chars] + "..." if len(text) > preview_chars else text,
+        "full_text_length": len(text),
+        "text_hash": hashlib.sha1(" ".join(text.split()).encode("utf-8")).hexdigest(),
+        "contacts": extract_contacts(text),
+    }
+    if include_text:
+        out["text"] = text
+    return out
+
+
 def crawl_once(
     url: str,
     terms: Optional[Sequence[str]] = None,
@@ -326,39 +1798,265 @@ def crawl_once(
     Keeps everything small and returns a compact dict.
     """
 
-    html = get_html(url, timeout=timeout, session=session)
-    title = extract_title(html)
-    text = html_to_text(html)
-    if len(text) > text_max_chars:
-        text = text[:text_max_chars]
+    doc = parse_html(get_html(url, timeout=timeout, session=session), max_text_chars=text_max_chars)
+    text = doc["text"]
 
     out: Dict[str, Any] = {
         "url": url,
-        "title": title,
-        "links": extract_links(html, base=url, allow_external=allow_external_links),
+        "title": doc["title"],
+        "links": _resolve_links(doc["links"], url, allow_external_links),
     }
 
     if terms:
         out["hits"] = find_terms_in_text(text, terms)
 
     if include_contact_and_hours:
-        out["emails"] = extract_emails(text)
-        out["phones"] = extract_phones(text)
-        out["hours"] = extract_hours(text)
+        out.update(extract_contacts(text))
 
     return out
 
 
+# Link text / path words that usually lead to schedules, hours or contact info.
+CRAWL_KEYWORDS = (
+    "service", "meal", "calendar", "event", "schedule", "hours", "food", "pantry",
+    "shelter", "program", "contact", "location", "visit", "help", "about",
+)
+# Never worth fetching while looking for hours and contacts.
+CRAWL_SKIP = (
+    ".pdf", ".jpg", ".jpeg", ".png", ".gif", ".svg", ".webp", ".zip", ".mp3", ".mp4",
+    ".doc", ".docx", ".xls", ".xlsx", ".ppt", ".pptx", ".ics",
+    "/wp-login", "/wp-admin", "/feed", "/cart", "/checkout", "/login", "/tag/", "/author/",
+    "replytocom=", "share=",
+)
+# Upper bound on a robots.txt Crawl-delay we are willing to honour.
+MAX_CRAWL_DELAY = 10.0
+
+
+def score_link(url: str, keywords: Sequence[str] = CRAWL_KEYWORDS) -> float:
+    """
+    Crawl priority of a link: keyword hits in the path/query, minus a little
+    per path segment so shallow pages go first.
+    """
+    p = urlparse(url)
+    path = (p.path + "?" + p.query).lower()
+    hits = sum(1 for k in keywords if k.lower() in path)
+    return hits - 0.1 * len([seg for seg in p.path.split("/") if seg])
+
+
+def crawl_site(
+    url: str,
+    terms: Optional[Sequence[str]] = None,
+    max_pages: int = 15,
+    max_depth: int = 2,
+    keywords: Sequence[str] = CRAWL_KEYWORDS,
+    delay: float = 0.5,
+    concurrency: int = 4,
+    respect_robots: bool = True,
+    time_budget: float = 60,
+    timeout: int = 15,
+    session: Optional[requests.Session] = None,
+    text_max_chars: int = 50000,
+    max_hits_per_term: int = 5,
+) -> Dict[str, Any]:
+    """
+    Crawl one site with crawl_once, best links first, and aggregate the results.
+
+    The frontier is a priority queue scored by score_link(); only links on the
+    start URL's domain are followed, up to `max_depth` clicks away and
+    `max_pages` pages in total, within `time_budget` seconds. Up to
+    `concurrency` pages are fetched at once, but request starts are spaced at
+    least `delay` seconds apart (or the site's robots.txt Crawl-delay, if
+    larger). Pages disallowed by robots.txt are skipped.
+
+    Returns {url, pages:[{url, title, depth, ok, error?}], emails, phones,
+    hours:[{text, url}], hits:[{term, snippet, url}], skipped, frontier_left}.
+    """
+    s = _ensure_session(session)
+    start = canonicalize_url(url)
+    deadline = time.monotonic() + time_budget
+    if respect_robots:
+        delay = max(delay, min(robots_crawl_delay(start, timeout=timeout, session=s) or 0.0, MAX_CRAWL_DELAY))
+
+    order = itertools.count()
+    frontier: List[tuple] = [(float("-inf"), next(order), start, 0)]
+    seen = {start}
+    pages: List[Dict[str, Any]] = []
+    emails, phones = set(), set()
+    hours: Dict[str, str] = {}
+    hits: List[Dict[str, str]] = []
+    per_term: Dict[str, int] = {}
+    skipped = {"robots": 0, "errors": 0}
+
+    def _enqueue(links: Sequence[str], depth: int) -> None:
+        for link in links:
+            if link in seen or not same_domain(start, link):
+                continue
+            low = link.lower()
+            if any(x in low for x in CRAWL_SKIP):
+                continue
+            seen.add(link)
+            heapq.heappush(frontier, (-score_link(link, keywords), next(order), link, depth))
+
+    def _collect(u: str, depth: int, res: Dict[str, Any]) -> None:
+        pages.append({"url": u, "title": res.get("title", ""), "depth": depth, "ok": True})
+        emails.update(res.get("emails", []))
+        phones.update(res.get("phones", []))
+        for h in res.get("hours", []):
+            hours.setdefault(h, u)
+        for h in res.get("hits", []):
+            if per_term.get(h["term"], 0) < max_hits_per_term:
+                per_term[h["term"]] = per_term.get(h["term"], 0) + 1
+                hits.append({"term": h["term"], "snippet": h["snippet"], "url": u})
+        if depth < max_depth:
+            _enqueue(res.get("links", []), depth + 1)
+
+    pool = ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="crawl")
+    in_flight: Dict[Any, tuple] = {}
+    next_start = 0.0
+    try:
+        while time.monotonic() < deadline:
+            # Start as many fetches as concurrency, page budget and politeness allow
+            while frontier and len(in_flight) < concurrency and len(pages) + len(in_flight) < max_pages:
+                now = time.monotonic()
+                if now < next_start:
+                    if in_flight:
+                        break
+                    time.sleep(min(next_start - now, max(deadline - now, 0)))
+                    if time.monotonic() >= deadline:
+                        break
+                _, _, u, depth = heapq.heappop(frontier)
+                if respect_robots and not robots_allowed(u, timeout=timeout, session=s):
+                    skipped["robots"] += 1
+                    continue
+                next_start = time.monotonic() + delay
+                fut = pool.submit(
+                    crawl_once, u, terms=terms, allow_external_links=False, timeout=timeout,
+                    session=s, text_max_chars=text_max_chars,
+                )
+                in_flight[fut] = (u, depth)
+            if not in_flight:
+                break
+
+            now = time.monotonic()
+            wait_for = deadline - now
+            if frontier and len(in_flight) < concurrency:
+                wait_for = min(wait_for, max(next_start - now, 0))
+            done, _ = wait(list(in_flight), timeout=max(wait_for, 0), return_when=FIRST_COMPLETED)
+            for fut in done:
+                u, depth = in_flight.pop(fut)
+                try:
+                    _collect(u, depth, fut.result())
+                except Exception as e:
+                    skipped["errors"] += 1
+                    pages.append({"url": u, "title": "", "depth": depth, "ok": False,
+                                  "error": f"{type(e).__name__}: {e}"})
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    return {
+        "url": start,
+        "pages": pages,
+        "emails": sorted(emails),
+        "phones": sorted(phones),
+        "hours": [{"text": h, "url": u} for h, u in hours.items()],
+        "hits": hits,
+        "skipped": skipped,
+        "frontier_left": len(frontier),
+    }
+
+
 # ------------------------------
-# Example (manual test)
+# WordPress REST search
 # ------------------------------
 
-if __name__ == "__main__":
-    s = make_session()
-    test_url = "https://example.org/"
-    data = crawl_once(test_url, terms=["example", "contact"], session=s)
-    from pprint import pprint
-    pprint(data)
+# Whether an origin serves the WP REST search route. A clear "not WP" on the
+# first page (404/410, or a complete 200 that isn't a result list) is
+# remembered for a day so a site is never probed twice. Anything that may pass
+# (transport errors, 5xx, 401/403/408/429 and other 4xx, bodies cut off at the
+# size cap) only briefly, and never over an origin already known to run WP.
+WP_PROBE_TTL = 24 * 3600
+WP_PROBE_ERROR_TTL = 300
+_WP_ABSENT_STATUSES = (404, 410)
+# Only what callers use; WP skips the rest of each search item.
+WP_SEARCH_FIELDS = "title,url,subtype"
+
+_WP_SITES: Dict[str, tuple] = {}        # origin -> (expires, is_wp, status)
+_WP_SITES_LOCK = threading.Lock()
+
+
+def _origin(url: str) -> str:
+    p = urlparse(url if "://" in url else "https://" + url)
+    return f"{p.scheme}://{p.netloc.lower()}"
+
+
+def wp_site_status(base_url: str) -> Optional[bool]:
+    """Cached WP REST availability for a site: True, False, or None if unknown/expired."""
+    hit = _WP_SITES.get(_origin(base_url))
+    return hit[1] if hit and hit[0] > time.time() else None
+
+
+def _wp_remember(origin: str, is_wp: bool, status: Optional[int], ttl: float = WP_PROBE_TTL) -> None:
+    now = time.time()
+    with _WP_SITES_LOCK:
+        hit = _WP_SITES.get(origin)
+        if not is_wp and hit and hit[1] and hit[0] > now:
+            return      # one failed request doesn't make a WP site non-WP
+        _WP_SITES[origin] = (now + ttl, is_wp, status)
+
+
+def _wp_search_page(
+    origin: str,
+    query: str,
+    page: int,
+    per_page: int,
+    timeout: float,
+    session: Optional[requests.Session],
+) -> Dict[str, Any]:
+    """
+    One page of /wp-json/wp/v2/search → {ok, status, results, total_pages, error?}.
+    Records the site's WP availability as a side effect; only page 1 can mark
+    it non-WP.
+    """
+    params = {"search": query, "subtype": "page", "per_page": per_page, "page": page, "_fields": WP_SEARCH_FIELDS}
+    try:
+        r = _http_get(origin + "/wp-json/wp/v2/search", timeout, session, params=params, max_bytes=2 * 1024 * 1024)
+    except requests.RequestException as e:
+        if page == 1:
+            _wp_remember(origin, False, None, WP_PROBE_ERROR_TTL)
+        return {"ok": False, "status": None, "error": str(e), "results": [], "total_pages": 0}
+    if r.status_code == 400 and page > 1:
+        # Asked past the last page (rest_post_invalid_page_number)
+        return {"ok": True, "status": r.status_code, "results": [], "total_pages": page - 1}
+    if r.status_code >= 400:
+        if page == 1:
+            absent = r.status_code in _WP_ABSENT_STATUSES
+            _wp_remember(origin, False, r.status_code, WP_PROBE_TTL if absent else WP_PROBE_ERROR_TTL)
+        return {"ok": False, "status": r.status_code, "results": [], "total_pages": 0}
+    try:
+        items = r.json()
+        if not isinstance(items, list):
+            raise ValueError("not a search result list")
+    except ValueError:
+        # 200 with HTML (catch-all routing) or something else that isn't WP;
+        # a body cut off at max_bytes proves nothing
+        if page == 1:
+            clean = r.status_code == 200 and not getattr(r, "truncated", False)
+            _wp_remember(origin, False, r.status_code, WP_PROBE_TTL if clean else WP_PROBE_ERROR_TTL)
+        return {"ok": False, "status": r.status_code, "results": [], "total_pages": 0}
+    _wp_remember(origin, True, r.status_code)
+    out = []
+    for item in items:
+        url = item.get("url") if isinstance(item, dict) else None
+        if url:
+            out.append({"title": item.get("title", ""), "url": canonicalize_url(url)})
+    total = r.headers.get("X-WP-TotalPages", "")
+    return {
+        "ok": True,
+        "status": r.status_code,
+        "results": out,
+        "total_pages": int(total) if total.isdigit() else page,
+    }
+
 
 def wp_search_pages(
     base_url: str,
@@ -369,26 +2067,121 @@ def wp_search_pages(
 ) -> Dict[str, Any]:
     """
     Query a WordPress site's REST API for pages matching `query`.
-    Returns {ok, results:[{title,url}], status?}.
+    Returns {ok, results:[{title,url}], status?}. Sites already found not to
+    run WP come back as {ok: False, status, results: [], cached: True} without a request.
+    """
+    origin = _origin(base_url)
+    hit = _WP_SITES.get(origin)
+    if hit and hit[0] > time.time() and not hit[1]:
+        return {"ok": False, "status": hit[2], "results": [], "cached": True}
+    res = _wp_search_page(origin, query, 1, per_page, timeout, session)
+    out: Dict[str, Any] = {"ok": res["ok"], "results": res["results"]}
+    if not res["ok"]:
+        out["status"] = res["status"]
+        if "error" in res:
+            out["error"] = res["error"]
+    return out
+
+
+def wp_search_bulk(
+    base_urls: Sequence[str],
+    queries: Sequence[str],
+    per_page: int = 20,
+    max_pages: int = 3,
+    max_requests: int = 40,
+    concurrency: int = 4,
+    timeout: int = 15,
+    session: Optional[requests.Session] = None,
+) -> Dict[str, Any]:
+    """
+    Run every query against every WordPress site concurrently, following
+    pagination up to `max_pages` per query and `max_requests` in total.
+
+    Each site is probed with its first query alone; the other queries are
+    only sent once it answers like WP, and sites cached as non-WP are skipped.
+    Returns {results:[{title, url, site, queries}], sites:{origin: {wp, status, requests, cached}},
+    requests, truncated}; a URL matched by several queries appears once.
     """
     s = _ensure_session(session)
-    api = urljoin(base_url, "/wp-json/wp/v2/search")
-    params = {"search": query, "subtype": "page", "per_page": per_page}
-    try:
-        r = s.get(api, params=params, timeout=timeout)
-    except requests.RequestException as e:
-        return {"ok": False, "error": str(e), "results": []}
-    if r.status_code >= 400:
-        return {"ok": False, "status": r.status_code, "results": []}
-    out = []
+    queries = dedupe_preserve_order(q.strip() for q in queries if q and q.strip())
+    sites: Dict[str, Dict[str, Any]] = {}
+    for b in base_urls:
+        origin = _origin(b)
+        if origin not in sites:
+            hit = _WP_SITES.get(origin)
+            fresh = bool(hit and hit[0] > time.time())
+            sites[origin] = {"wp": hit[1] if fresh else None, "status": hit[2] if fresh else None,
+                             "requests": 0, "cached": fresh}
+
+    found: Dict[str, Dict[str, Any]] = {}
+    pending: Dict[Any, tuple] = {}
+    sent = 0
+    truncated = False
+    pool = ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="wp")
+
+    def _submit(origin: str, query: str, page: int) -> None:
+        nonlocal sent, truncated
+        if sent >= max_requests:
+            truncated = True
+            return
+        sent += 1
+        sites[origin]["requests"] += 1
+        fut = pool.submit(_wp_search_page, origin, query, page, per_page, timeout, s)
+        pending[fut] = (origin, query, page)
+
     try:
-        for item in r.json():
-            url = item.get("url")
-            if url:
-                out.append({
-                    "title": item.get("title", ""),
-                    "url": canonicalize_url(url),
-                })
-    except ValueError:
-        return {"ok": False, "status": r.status_code, "results": []}
-    return {"ok": True, "results": out}
+        for origin, st in sites.items():
+            if st["wp"] is False or not queries:
+                continue
+            if st["wp"]:
+                for q in queries:
+                    _submit(origin, q, 1)
+            else:
+                _submit(origin, queries[0], 1)      # probe
+
+        while pending:
+            done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+            for fut in done:
+                origin, query, page = pending.pop(fut)
+                res = fut.result()
+                st = sites[origin]
+                if st["status"] is None or res["status"] is not None:
+                    st["status"] = res["status"]
+                if not res["ok"]:
+                    if page == 1 and st["wp"] is None:
+                        st["wp"] = False
+                    continue
+                if st["wp"] is None:
+                    st["wp"] = True
+                    for q in queries[1:]:
+                        _submit(origin, q, 1)
+                for item in res["results"]:
+                    rec = found.get(item["url"])
+                    if rec is None:
+                        rec = found[item["url"]] = {"title": item["title"], "url": item["url"],
+                                                    "site": origin, "queries": []}
+                    if query not in rec["queries"]:
+                        rec["queries"].append(query)
+                if page < min(res["total_pages"], max_pages):
+                    _submit(origin, query, page + 1)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    return {
+        "results": list(found.values()),
+        "sites": sites,
+        "requests": sent,
+        "truncated": truncated,
+    }
+
+
+# ------------------------------
+# Example (manual test)
+# ------------------------------
+
+if __name__ == "__main__":
+    s = make_session()
+    test_url = "https://example.org/"
+    data = crawl_once(test_url, terms=["example", "contact"], session=s)
+    from pprint import pprint
+    pprint(data)
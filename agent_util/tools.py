@@ -2,23 +2,25 @@
 TOOLS = [
   { "type": "function", "function": {
       "name": "get_html",
-      "description": "Fetch raw HTML for a URL (respect robots.txt/timeout in code).",
+      "description": "Fetch a URL and keep the page server-side. Returns {handle, url, title, text_chars, links, preview}; pass the handle (\"doc:...\") as `html` or `text` to the other tools instead of page content.",
       "parameters": {"type":"object","properties":{
         "url":{"type":"string"}
       },"required":["url"]}
   }},
   { "type": "function", "function": {
       "name": "html_to_text",
-      "description": "Convert HTML to readable plain text.",
+      "description": "Readable plain text of a document handle (or HTML), returned in windows of max_chars starting at start.",
       "parameters": {"type":"object","properties":{
-        "html":{"type":"string"}
+        "html":{"type":"string","description":"doc handle from get_html"},
+        "start":{"type":"integer","default":0},
+        "max_chars":{"type":"integer","default":4000}
       },"required":["html"]}
   }},
   { "type": "function", "function": {
       "name": "extract_links",
-      "description": "Extract absolute links from HTML. If base provided, resolve relatives.",
+      "description": "Extract absolute links from a document handle (or HTML). Relative links resolve against the page URL, or base if provided.",
       "parameters": {"type":"object","properties":{
-        "html":{"type":"string"},
+        "html":{"type":"string","description":"doc handle from get_html"},
         "base":{"type":"string","nullable":True},
         "allow_external":{"type":"boolean","default":True}
       },"required":["html"]}
@@ -34,17 +36,21 @@ TOOLS = [
   }},
   { "type": "function", "function": {
       "name": "find_terms_in_text",
-      "description": "Find case-insensitive terms in text; returns snippets around matches.",
+      "description": "Find case-insensitive terms in text or a document handle; returns snippets around matches (first hit per term unless all_hits).",
       "parameters": {"type":"object","properties":{
-        "text":{"type":"string"},
-        "terms":{"type":"array","items":{"type":"string"}}
+        "text":{"type":"string","description":"doc handle from get_html, or plain text"},
+        "terms":{"type":"array","items":{"type":"string"}},
+        "all_hits":{"type":"boolean","default":False},
+        "word_boundary":{"type":"boolean","default":False},
+        "merge_overlaps":{"type":"boolean","default":False},
+        "max_hits":{"type":"integer","nullable":True}
       },"required":["text","terms"]}
   }},
   { "type": "function", "function": {
       "name": "extract_contacts",
-      "description": "Pull phones, emails, and hours from text.",
+      "description": "Pull phones, emails, and hours from text or a document handle.",
       "parameters": {"type":"object","properties":{
-        "text":{"type":"string"}
+        "text":{"type":"string","description":"doc handle from get_html, or plain text"}
       },"required":["text"]}
   }},
   { "type": "function", "function": {
@@ -56,6 +62,16 @@ TOOLS = [
         "allow_external_links":{"type":"boolean","default":False}
       },"required":["url"]}
   }},
+  { "type": "function", "function": {
+      "name": "crawl_site",
+      "description": "Crawl a site (same domain, best-scoring links first, robots.txt respected) and return aggregated phones, emails, hours and term hits with source URLs.",
+      "parameters": {"type":"object","properties":{
+        "url":{"type":"string"},
+        "terms":{"type":"array","items":{"type":"string"},"default":[]},
+        "max_pages":{"type":"integer","default":15},
+        "max_depth":{"type":"integer","default":2}
+      },"required":["url"]}
+  }},
   # Optional WordPress helper (many shelters use WP):
   { "type": "function", "function": {
       "name": "wp_search_pages",
@@ -65,4 +81,13 @@ TOOLS = [
         "query":{"type":"string"}
       },"required":["base_url","query"]}
   }},
+  { "type": "function", "function": {
+      "name": "wp_search_bulk",
+      "description": "Run several search queries against one or more WordPress sites at once (paginated); returns page titles/URLs with the queries that matched. Non-WordPress sites are detected and skipped.",
+      "parameters": {"type":"object","properties":{
+        "base_urls":{"type":"array","items":{"type":"string"}},
+        "queries":{"type":"array","items":{"type":"string"}},
+        "max_pages":{"type":"integer","default":3}
+      },"required":["base_urls","queries"]}
+  }},
 ]
@@ -0,0 +1,102 @@
+"""
+deadline.py — request-scoped time budgets.
+
+find_event promises an answer within TIMEOUT seconds but used to look at the
+clock only between URLs, so one extract_event could sit in a 90 s LLM call
+followed by a 15 s geocode. A Deadline is opened once per request (scope())
+and kept in a context variable. asyncio tasks and asyncio.to_thread workers
+both inherit it, so every stage underneath can ask how much time it has:
+
+- timeout(cap) gives the stage's usual timeout, cut down to what is left. It
+  raises DeadlineExceeded rather than start work that cannot finish;
+- run(awaitable) awaits with the remaining budget and cancels the awaitable
+  when the budget runs out.
+
+Blocking calls running in threads can't be cancelled. They are bounded by
+socket timeouts taken from timeout() instead. When such a socket closes,
+Ollama and vLLM stop generating for the abandoned request.
+
+Nested scopes never extend the outer deadline. Without a scope, timeout(cap)
+is just `cap` and run() just awaits.
+
+Stdlib only.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Iterator, Optional
+
+# Less time than this left: don't start another network call.
+MIN_TIMEOUT = 0.5
+
+
+class DeadlineExceeded(TimeoutError):
+    """The request's time budget is spent."""
+
+
+class Deadline:
+    """An absolute time.monotonic() expiry with helpers for deriving timeouts."""
+
+    __slots__ = ("expires",)
+
+    def __init__(self, seconds: float):
+        self.expires = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def timeout(self, cap: Optional[float] = None, floor: float = MIN_TIMEOUT) -> float:
+        """`cap` (or everything left if None) limited to the remaining budget."""
+        left = self.remaining()
+        if left < floor:
+            raise DeadlineExceeded(f"deadline exceeded ({left:.2f}s left)")
+        return left if cap is None else min(cap, left)
+
+    async def run(self, aw: Awaitable[Any]) -> Any:
+        """Await `aw`, cancelling it and raising DeadlineExceeded when the budget runs out."""
+        try:
+            return await asyncio.wait_for(aw, self.remaining())
+        except (asyncio.TimeoutError, TimeoutError) as e:    # distinct types before 3.11
+            if isinstance(e, DeadlineExceeded) or self.expired():
+                raise DeadlineExceeded("deadline exceeded") from None
+            raise
+
+
+_CURRENT: contextvars.ContextVar[Optional[Deadline]] = contextvars.ContextVar("deadline", default=None)
+
+
+def current() -> Optional[Deadline]:
+    return _CURRENT.get()
+
+
+@contextmanager
+def scope(seconds: float) -> Iterator[Deadline]:
+    """Make a `seconds` budget current for the block (or keep an earlier outer one)."""
+    dl = Deadline(seconds)
+    outer = _CURRENT.get()
+    if outer is not None and outer.expires < dl.expires:
+        dl = outer
+    token = _CURRENT.set(dl)
+    try:
+        yield dl
+    finally:
+        _CURRENT.reset(token)
+
+
+def timeout(cap: float, floor: float = MIN_TIMEOUT) -> float:
+    """`cap` limited by the current deadline, if any."""
+    dl = _CURRENT.get()
+    return cap if dl is None else dl.timeout(cap, floor)
+
+
+async def run(aw: Awaitable[Any]) -> Any:
+    """Await `aw` within the current deadline, if any."""
+    dl = _CURRENT.get()
+    return await aw if dl is None else await dl.run(aw)
@@ -0,0 +1,319 @@
+"""
+event_index.py — cross-source deduplication of extracted events.
+
+The same food distribution shows up on the church site, the city calendar
+and a Facebook mirror. Events are keyed on
+    (normalized name, geocoded location rounded to ~100 m, normalized schedule)
+so the copies merge into one record that remembers every source_url.
+The index also remembers which URL (and which page text, by hash) produced
+which event, so find_event/scrape_events can skip scraping and the LLM for
+pages we have already seen.
+
+Events also carry their parsed recurrence rule (see schedule.py) and
+coordinates in indexed columns, so query() can answer "events within X
+miles happening this week" straight from SQLite.
+
+Stdlib only; persisted in SQLite under CACHE_DIR.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import date
+from math import asin, cos, radians, sin, sqrt
+from typing import Any, Dict, List, Optional
+
+from .schedule import occurrences, parse_schedule
+
+CACHE_DIR = os.environ.get(
+    "CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".cache"),
+)
+
+# 3 decimals of lat/lon ≈ 110 m: same building, different geocoder rounding.
+LOCATION_DECIMALS = 3
+
+# A page hash with no event is only trusted for a day (schedules get posted later).
+NEGATIVE_TTL = 24 * 3600
+
+# A URL that produced an event is trusted for a week; after that find_event
+# fetches and extracts it again (pages change, one-off dates pass).
+SOURCE_TTL = int(os.environ.get("EVENT_SOURCE_TTL", str(7 * 24 * 3600)))
+
+# ------------------------------
+# Normalization
+# ------------------------------
+
+_RE_NON_WORD = re.compile(r"[^a-z0-9\s]")
+_NAME_STOPWORDS = frozenset(
+    "the a an at of for and & in on by free community event events weekly monthly".split()
+)
+_WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+_WEEKDAY_WORDS = {
+    w: day
+    for day, full, extra in (
+        ("mon", "monday", ()), ("tue", "tuesday", ("tues",)), ("wed", "wednesday", ()),
+        ("thu", "thursday", ("thur", "thurs")), ("fri", "friday", ()),
+        ("sat", "saturday", ()), ("sun", "sunday", ()),
+    )
+    for w in (day, full, full + "s", *extra)
+}
+_RE_TIME = re.compile(r"\b(\d{1,2})(?::(\d{2}))?\s*(a\.?m\.?|p\.?m\.?)", re.I)
+
+
+def normalize_name(name: str) -> str:
+    words = _RE_NON_WORD.sub(" ", (name or "").lower()).split()
+    return " ".join(w for w in words if w not in _NAME_STOPWORDS)
+
+
+def normalize_schedule(schedule: str) -> str:
+    """
+    Reduce a free-text schedule to sorted weekday + 24h time tokens.
+    "Every Tuesday & Thursday, 5-7 PM" and "Tue/Thu 5pm" both contain "tue thu 17:00".
+    Falls back to the cleaned text when no weekday or time is recognised.
+    """
+    low = (schedule or "").lower()
+    days = set()
+    for w in _RE_NON_WORD.sub(" ", low).split():
+        if w in _WEEKDAY_WORDS:
+            days.add(_WEEKDAY_WORDS[w])
+    times = set()
+    for m in _RE_TIME.finditer(low):
+        h = int(m.group(1)) % 12 + (12 if m.group(3).startswith("p") else 0)
+        times.add(f"{h:02d}:{m.group(2) or '00'}")
+    tokens = sorted(days, key=_WEEKDAYS.index) + sorted(times)
+    return " ".join(tokens) if tokens else " ".join(_RE_NON_WORD.sub(" ", low).split())
+
+
+def event_key(name: str, latitude: float, longitude: float, schedule: str) -> str:
+    raw = "|".join((
+        normalize_name(name),
+        f"{round(float(latitude), LOCATION_DECIMALS):.{LOCATION_DECIMALS}f}",
+        f"{round(float(longitude), LOCATION_DECIMALS):.{LOCATION_DECIMALS}f}",
+        normalize_schedule(schedule),
+    ))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha1(" ".join((text or "").split()).encode("utf-8")).hexdigest()
+
+
+def _haversine_miles(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    dlat = radians(lat2 - lat1)
+    dlon = radians(lon2 - lon1)
+    a = sin(dlat / 2) ** 2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(dlon / 2) ** 2
+    return 3958.8 * 2 * asin(sqrt(a))
+
+
+# ------------------------------
+# Index
+# ------------------------------
+
+class EventIndex:
+    """
+    Thread-safe SQLite index of deduplicated events.
+    Events are stored in the extract_event shape (Name, Date, summary, address,
+    latitude, longitude) plus `source_urls`.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(CACHE_DIR, "events.sqlite3")
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS events ("
+            " key TEXT PRIMARY KEY,"
+            " event TEXT,"               # JSON
+            " source_urls TEXT,"         # JSON list, first-seen order
+            " first_seen REAL,"
+            " last_seen REAL);"
+            "CREATE TABLE IF NOT EXISTS sources ("
+            " url TEXT PRIMARY KEY,"
+            " key TEXT,"
+            " seen REAL);"               # last time this URL yielded the event
+            "CREATE TABLE IF NOT EXISTS pages ("
+            " hash TEXT PRIMARY KEY,"
+            " key TEXT,"                 # NULL when the page had no event
+            " seen REAL);"
+        )
+        self._migrate()
+        self._db.commit()
+
+    def _migrate(self) -> None:
+        # Indexed coordinates + parsed schedule were added after the first release
+        cols = {r[1] for r in self._db.execute("PRAGMA table_info(events)")}
+        for col, typ in (("latitude", "REAL"), ("longitude", "REAL"), ("schedule", "TEXT")):
+            if col not in cols:
+                self._db.execute(f"ALTER TABLE events ADD COLUMN {col} {typ}")
+        self._db.execute("CREATE INDEX IF NOT EXISTS events_geo ON events (latitude, longitude)")
+        # sources.seen came later still; rows without it count as expired
+        if "seen" not in {r[1] for r in self._db.execute("PRAGMA table_info(sources)")}:
+            self._db.execute("ALTER TABLE sources ADD COLUMN seen REAL")
+        for key, raw in self._db.execute("SELECT key, event FROM events WHERE schedule IS NULL").fetchall():
+            ev = json.loads(raw)
+            self._db.execute(
+                "UPDATE events SET latitude = ?, longitude = ?, schedule = ? WHERE key = ?",
+                (ev.get("latitude"), ev.get("longitude"), json.dumps(parse_schedule(ev.get("Date", ""))), key),
+            )
+
+    # -- reads --
+
+    def _event_row(self, key: str) -> Optional[Dict[str, Any]]:
+        row = self._db.execute(
+            "SELECT event, source_urls FROM events WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        event = json.loads(row[0])
+        event["source_urls"] = json.loads(row[1])
+        return event
+
+    def lookup_url(self, url: str) -> Optional[Dict[str, Any]]:
+        """Known event for a source URL seen within SOURCE_TTL, or None."""
+        with self._lock:
+            row = self._db.execute("SELECT key, seen FROM sources WHERE url = ?", (url,)).fetchone()
+            if row is None or row[1] is None or time.time() - row[1] > SOURCE_TTL:
+                return None
+            return self._event_row(row[0])
+
+    def lookup_content(self, text: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up page text we have already run through extraction.
+        Returns None if unseen, {"event": None} for a recent known-negative page,
+        else {"event": {...}}.
+        """
+        return self.lookup_hash(content_hash(text))
+
+    def lookup_hash(self, h: str) -> Optional[Dict[str, Any]]:
+        """lookup_content() for a precomputed content_hash()."""
+        with self._lock:
+            row = self._db.execute("SELECT key, seen FROM pages WHERE hash = ?", (h,)).fetchone()
+            if row is None:
+                return None
+            if row[0] is None:
+                if time.time() - row[1] > NEGATIVE_TTL:
+                    return None
+                return {"event": None}
+            event = self._event_row(row[0])
+            return {"event": event} if event else None
+
+    def all(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            keys = [r[0] for r in self._db.execute("SELECT key FROM events ORDER BY first_seen")]
+            return [e for e in (self._event_row(k) for k in keys) if e]
+
+    # -- writes --
+
+    def add(self, event: Dict[str, Any], source_url: Optional[str] = None,
+            text: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Insert or merge `event`; returns the merged event with all source_urls.
+        """
+        key = event_key(event.get("Name", ""), event["latitude"], event["longitude"], event.get("Date", ""))
+        now = time.time()
+        fields = {k: v for k, v in event.items() if k not in ("source_url", "source_urls")}
+        with self._lock:
+            row = self._db.execute("SELECT event, source_urls FROM events WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                stored, urls = fields, []
+            else:
+                stored, urls = json.loads(row[0]), json.loads(row[1])
+                # Keep the richest value for each field across sources
+                for k, v in fields.items():
+                    if v and len(str(v)) > len(str(stored.get(k) or "")):
+                        stored[k] = v
+            for u in ([source_url] if source_url else []) + list(event.get("source_urls") or []):
+                if u not in urls:
+                    urls.append(u)
+            self._db.execute(
+                "INSERT INTO events (key, event, source_urls, first_seen, last_seen, latitude, longitude, schedule) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET event = excluded.event, "
+                "source_urls = excluded.source_urls, last_seen = excluded.last_seen, "
+                "latitude = excluded.latitude, longitude = excluded.longitude, schedule = excluded.schedule",
+                (key, json.dumps(stored), json.dumps(urls), now, now,
+                 float(stored["latitude"]), float(stored["longitude"]),
+                 json.dumps(parse_schedule(stored.get("Date", "")))),
+            )
+            # Only the URL this event just came from is refreshed; older sources keep their age
+            for u in urls:
+                self._db.execute(
+                    "INSERT INTO sources (url, key, seen) VALUES (?, ?, ?) "
+                    "ON CONFLICT(url) DO UPDATE SET key = excluded.key"
+                    + (", seen = excluded.seen" if u == source_url else ""),
+                    (u, key, now),
+                )
+            if text:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO pages (hash, key, seen) VALUES (?, ?, ?)",
+                    (content_hash(text), key, now),
+                )
+            self._db.commit()
+        merged = dict(stored)
+        merged["source_urls"] = urls
+        return merged
+
+    def add_negative(self, text: str) -> None:
+        """Remember that this page text produced no event."""
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO pages (hash, key, seen) VALUES (?, NULL, ?)",
+                (content_hash(text), time.time()),
+            )
+            self._db.commit()
+
+    # -- spatio-temporal query --
+
+    def query(
+        self,
+        latitude: float,
+        longitude: float,
+        radius_miles: float,
+        start: date,
+        end: date,
+        limit: int = 50,
+        include_unscheduled: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """
+        Events within `radius_miles` of (latitude, longitude) that occur between
+        `start` and `end` (inclusive), soonest first then nearest.
+        Each event gets `distance` (miles), `schedule` (rule), `occurrences` and
+        `next_occurrence`. Events whose schedule could not be parsed are only
+        returned with include_unscheduled=True.
+        """
+        dlat = radius_miles / 69.0
+        dlon = radius_miles / max(69.0 * cos(radians(latitude)), 1e-6)
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT event, source_urls, latitude, longitude, schedule FROM events "
+                "WHERE latitude BETWEEN ? AND ? AND longitude BETWEEN ? AND ?",
+                (latitude - dlat, latitude + dlat, longitude - dlon, longitude + dlon),
+            ).fetchall()
+
+        out = []
+        for raw, urls, lat, lon, sched in rows:
+            d = _haversine_miles(latitude, longitude, lat, lon)
+            if d > radius_miles:
+                continue
+            rule = json.loads(sched) if sched else {"kind": "unknown"}
+            occ = occurrences(rule, start, end)
+            if not occ and not (include_unscheduled and rule.get("kind") == "unknown"):
+                continue
+            event = json.loads(raw)
+            event["source_urls"] = json.loads(urls)
+            event["distance"] = round(d, 3)
+            event["schedule"] = rule
+            event["occurrences"] = occ
+            event["next_occurrence"] = occ[0] if occ else None
+            out.append(event)
+
+        out.sort(key=lambda e: (e["next_occurrence"] is None, e["next_occurrence"] or "", e["distance"]))
+        return out[:limit]
@@ -0,0 +1,154 @@
+"""
+geocode_cache.py — persistent forward-geocode cache keyed on normalized addresses.
+
+The LLM writes the same church or pantry address a dozen different ways
+("741 South Sherman Street, Richardson, Texas" vs "741 S. Sherman St Richardson TX 75081-1234").
+We normalize the string (case, punctuation, street suffixes, directions,
+state names, ZIP+4) and keep the Nominatim answer on disk in SQLite.
+Misses ("no result") are cached too, with a shorter TTL; transport errors are not.
+
+Stdlib only.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Any, Dict, Optional, Tuple
+
+CACHE_DIR = os.environ.get(
+    "CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".cache"),
+)
+
+DAY = 24 * 3600
+
+# ------------------------------
+# Address normalization
+# ------------------------------
+
+_SUFFIXES = {
+    "street": "st", "str": "st", "avenue": "ave", "av": "ave", "road": "rd",
+    "boulevard": "blvd", "drive": "dr", "lane": "ln", "parkway": "pkwy",
+    "highway": "hwy", "court": "ct", "place": "pl", "circle": "cir",
+    "trail": "trl", "freeway": "fwy", "expressway": "expy", "terrace": "ter",
+    "square": "sq", "plaza": "plz", "center": "ctr", "centre": "ctr",
+    "suite": "ste", "apartment": "apt", "building": "bldg", "floor": "fl",
+    "room": "rm", "mount": "mt", "fort": "ft", "saint": "st",
+}
+_DIRECTIONS = {
+    "north": "n", "south": "s", "east": "e", "west": "w",
+    "northeast": "ne", "northwest": "nw", "southeast": "se", "southwest": "sw",
+}
+_STATES = {
+    "alabama": "al", "alaska": "ak", "arizona": "az", "arkansas": "ar", "california": "ca",
+    "colorado": "co", "connecticut": "ct", "delaware": "de", "florida": "fl", "georgia": "ga",
+    "hawaii": "hi", "idaho": "id", "illinois": "il", "indiana": "in", "iowa": "ia",
+    "kansas": "ks", "kentucky": "ky", "louisiana": "la", "maine": "me", "maryland": "md",
+    "massachusetts": "ma", "michigan": "mi", "minnesota": "mn", "mississippi": "ms",
+    "missouri": "mo", "montana": "mt", "nebraska": "ne", "nevada": "nv",
+    "new hampshire": "nh", "new jersey": "nj", "new mexico": "nm", "new york": "ny",
+    "north carolina": "nc", "north dakota": "nd", "ohio": "oh", "oklahoma": "ok",
+    "oregon": "or", "pennsylvania": "pa", "rhode island": "ri", "south carolina": "sc",
+    "south dakota": "sd", "tennessee": "tn", "texas": "tx", "utah": "ut", "vermont": "vt",
+    "virginia": "va", "washington": "wa", "west virginia": "wv", "wisconsin": "wi",
+    "wyoming": "wy", "district of columbia": "dc",
+}
+_RE_STATES = re.compile(r"\b(" + "|".join(sorted(_STATES, key=len, reverse=True)) + r")\b")
+_RE_ZIP4 = re.compile(r"\b(\d{5})-?\d{4}\b")
+_RE_COUNTRY = re.compile(r"\s*\b(usa|us|united states(?: of america)?)$")
+_RE_PUNCT = re.compile(r"[^\w\s]")
+
+
+def normalize_address(address: str) -> str:
+    """
+    Canonical cache key for a free-text US address.
+    "741 South Sherman Street, Richardson, Texas 75081-1234, USA" -> "741 s sherman st richardson tx 75081"
+    """
+    a = unicodedata.normalize("NFKD", address or "")
+    a = a.encode("ascii", "ignore").decode("ascii").lower()
+    a = _RE_ZIP4.sub(r"\1", a)               # ZIP+4 -> ZIP before punctuation goes
+    a = a.replace("#", " ste ")
+    a = _RE_PUNCT.sub(" ", a)
+    a = " ".join(a.split())
+    a = _RE_COUNTRY.sub("", a)
+    # Multi-word state names go first so "west virginia" doesn't become "w virginia".
+    a = _RE_STATES.sub(lambda m: _STATES[m.group(1)], a)
+    words = [_DIRECTIONS.get(w, _SUFFIXES.get(w, w)) for w in a.split()]
+    return " ".join(words)
+
+
+# ------------------------------
+# Cache
+# ------------------------------
+
+class GeocodeCache:
+    """
+    Thread-safe SQLite cache: normalized address -> geocode result (or None).
+    Positive results live `ttl` seconds, negative ones `negative_ttl`.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl: float = 90 * DAY,
+        negative_ttl: float = 1 * DAY,
+    ):
+        self.path = path or os.path.join(CACHE_DIR, "geocode.sqlite3")
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS geocode ("
+            " key TEXT PRIMARY KEY,"
+            " address TEXT,"
+            " result TEXT,"        # JSON, NULL for a negative entry
+            " expires REAL)"
+        )
+        self._db.commit()
+
+    def get(self, address: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """Return (found, result). `found` is True for cached negatives too."""
+        key = normalize_address(address)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT result, expires FROM geocode WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] < time.time():
+                self.misses += 1
+                return False, None
+            self.hits += 1
+        return True, (json.loads(row[0]) if row[0] is not None else None)
+
+    def put(self, address: str, result: Optional[Dict[str, Any]]) -> None:
+        key = normalize_address(address)
+        ttl = self.ttl if result is not None else self.negative_ttl
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO geocode (key, address, result, expires) VALUES (?, ?, ?, ?)",
+                (key, address, json.dumps(result) if result is not None else None, time.time() + ttl),
+            )
+            self._db.commit()
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            cur = self._db.execute("DELETE FROM geocode WHERE expires < ?", (time.time(),))
+            self._db.commit()
+            return cur.rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 3) if total else 0.0,
+        }
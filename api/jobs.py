@@ -0,0 +1,171 @@
+"""
+jobs.py — background jobs for long-running pipelines (scrape_events).
+
+POST creates a Job and returns its id immediately; the pipeline runs as an
+asyncio task, reports per-stage progress on the Job and emits result items
+as they are produced so clients can stream them (NDJSON) instead of holding
+a connection open for minutes.
+
+At most `max_concurrent` jobs run at once; the rest wait in "queued".
+Finished jobs are kept (newest `keep`) so their status and results can still
+be read.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from . import metrics
+
+
+class Job:
+    """State of one background run: status, per-stage progress and emitted items."""
+
+    def __init__(self, kind: str, params: Dict[str, Any]):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.params = params
+        self.status = "queued"      # queued | running | done | failed
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self.results: List[Any] = []
+        self.summary: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self._waiter: Optional[asyncio.Future] = None
+
+    # -- progress reporting (called from the pipeline, on the event loop) --
+
+    def stage(self, name: str, status: str = "running", total: Optional[int] = None, **extra: Any) -> None:
+        st = self.stages.setdefault(name, {"status": status, "done": 0, "total": None})
+        st["status"] = status
+        if total is not None:
+            st["total"] = total
+        st.update(extra)
+        if status == "running":
+            st.setdefault("started", time.time())
+        elif status in ("done", "failed"):
+            st["elapsed_seconds"] = round(time.time() - st.get("started", time.time()), 2)
+        self._notify()
+
+    def advance(self, name: str, n: int = 1) -> None:
+        self.stages.setdefault(name, {"status": "running", "done": 0, "total": None})["done"] += n
+        self._notify()
+
+    def emit(self, item: Any) -> None:
+        self.results.append(item)
+        self._notify()
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in ("done", "failed")
+
+    def _notify(self) -> None:
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+        self._waiter = None
+
+    async def _changed(self) -> None:
+        if self._waiter is None:
+            self._waiter = asyncio.get_running_loop().create_future()
+        await self._waiter
+
+    # -- reading --
+
+    def to_dict(self) -> Dict[str, Any]:
+        now = self.finished or time.time()
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "params": self.params,
+            "status": self.status,
+            "stages": self.stages,
+            "results_available": len(self.results),
+            "summary": self.summary,
+            "error": self.error,
+            "elapsed_seconds": round(now - (self.started or now), 2),
+        }
+
+    async def stream(self) -> AsyncIterator[Any]:
+        """Yield every emitted item (past and future) until the job finishes."""
+        i = 0
+        while True:
+            while i < len(self.results):
+                yield self.results[i]
+                i += 1
+            if self.is_finished:
+                return
+            await self._changed()
+
+
+class JobManager:
+    """Runs jobs as asyncio tasks with bounded concurrency."""
+
+    def __init__(self, max_concurrent: int = 2, keep: int = 200):
+        self.max_concurrent = max_concurrent
+        self.keep = keep
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def submit(
+        self,
+        kind: str,
+        params: Dict[str, Any],
+        runner: Callable[[Job], Awaitable[Optional[Dict[str, Any]]]],
+    ) -> Job:
+        """
+        Queue `runner(job)`. Its return value becomes `job.summary`.
+        Must be called from the event loop.
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrent)
+        job = Job(kind, params)
+        self._jobs[job.id] = job
+        self._evict()
+        self._tasks[job.id] = asyncio.get_running_loop().create_task(self._run(job, runner))
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def all(self) -> List[Dict[str, Any]]:
+        return [
+            {"job_id": j.id, "kind": j.kind, "status": j.status, "created": j.created}
+            for j in reversed(self._jobs.values())
+        ]
+
+    async def _run(self, job: Job, runner: Callable[[Job], Awaitable[Optional[Dict[str, Any]]]]) -> None:
+        # The task inherited the submitting request's context; that response is already sent
+        metrics.detach()
+        async with self._slots:
+            job.status = "running"
+            job.started = time.time()
+            job._notify()
+            try:
+                job.summary = await runner(job)
+                job.status = "done"
+            except Exception as e:
+                traceback.print_exc()
+                job.error = f"{type(e).__name__}: {e}"
+                job.status = "failed"
+            finally:
+                job.finished = time.time()
+                self._tasks.pop(job.id, None)
+                job._notify()
+
+    def _evict(self) -> None:
+        # Drop the oldest finished jobs beyond `keep`; never drop queued/running ones.
+        excess = len(self._jobs) - self.keep
+        for job_id in list(self._jobs):
+            if excess <= 0:
+                break
+            if self._jobs[job_id].is_finished:
+                del self._jobs[job_id]
+                excess -= 1
@@ -0,0 +1,317 @@
+"""
+llm.py — one completion interface for every LLM call the API makes.
+
+The endpoints used to POST straight to Ollama's /api/generate. This module
+puts a small backend layer in between so the same calls can target either
+
+    ollama  — Ollama /api/generate (system + prompt)          [default]
+    openai  — any OpenAI-compatible /v1/chat/completions server (vLLM, the
+              one agent.py already uses; continuous batching + prefix cache)
+
+Every call is split into `system` (static instructions, identical across
+calls) and `user` (the per-call part). Both servers put the system part
+first, so vLLM's automatic prefix caching and Ollama's KV reuse skip
+re-processing the shared instructions.
+
+Configuration (environment):
+    LLM_BACKEND   ollama | openai
+    LLM_BASE_URL  server root; defaults to OLLAMA_HOST for ollama,
+                  http://localhost:7545 for openai
+    LLM_MODEL     model name (defaults: nemotron:70B / the agent's vLLM model)
+    LLM_API_KEY   bearer token for openai-compatible servers, if needed
+
+Structured output: pass `schema` (a JSON Schema) and the server constrains
+decoding to it — Ollama via `format`, OpenAI-compatible servers via
+`response_format: json_schema` (vLLM guided decoding) — and `max_tokens`
+caps decode length. parse_json() still copes with servers that ignore both.
+
+Per-endpoint counters (calls, tokens, errors, parse failures) are kept for
+/llm_stats; pass `endpoint=` to complete() and call parse_failed() when a
+reply can't be used. max_tokens_for(schema) gives a decode cap that the
+largest schema-valid reply still fits under. Each call is also timed as metrics stage
+"llm_<endpoint>".
+
+Timeouts are capped by the current request deadline (deadline.py), so a
+call never outlives the request that made it.
+
+api/mock_llm.py serves both protocols locally for testing.
+
+Stdlib only.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, Optional
+from urllib import request as urlrequest
+
+from . import deadline
+from . import metrics
+
+DEFAULT_MODELS = {
+    "ollama": "nemotron:70B",
+    "openai": "nvidia/Llama-3_3-Nemotron-Super-49B-v1_5",
+}
+
+
+class LLMResult:
+    """Completion text plus what the server reported about the work done."""
+
+    __slots__ = ("text", "prompt_tokens", "completion_tokens", "elapsed", "backend")
+
+    def __init__(self, text: str, prompt_tokens: int = 0, completion_tokens: int = 0,
+                 elapsed: float = 0.0, backend: str = ""):
+        self.text = text
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+        self.elapsed = elapsed
+        self.backend = backend
+
+    @property
+    def tokens_per_second(self) -> float:
+        return self.completion_tokens / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def _post_json(url: str, payload: Dict[str, Any], timeout: float,
+               headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    req = urlrequest.Request(
+        url,
+        data=json.dumps(payload).encode("utf-8"),
+        headers={"Content-Type": "application/json", **(headers or {})},
+        method="POST",
+    )
+    with urlrequest.urlopen(req, timeout=timeout) as resp:
+        return json.loads(resp.read().decode("utf-8"))
+
+
+class OllamaBackend:
+    name = "ollama"
+
+    def __init__(self, base_url: str, model: str):
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+
+    def complete(self, system: str, user: str, temperature: float = 0.3,
+                 max_tokens: Optional[int] = None, timeout: float = 60,
+                 schema: Optional[Dict[str, Any]] = None) -> LLMResult:
+        options: Dict[str, Any] = {"temperature": temperature}
+        if max_tokens:
+            options["num_predict"] = max_tokens
+        payload = {"model": self.model, "prompt": user, "stream": False, "options": options}
+        if system:
+            payload["system"] = system
+        if schema:
+            payload["format"] = schema
+        t0 = time.time()
+        result = _post_json(f"{self.base_url}/api/generate", payload, timeout)
+        return LLMResult(
+            result.get("response", "").strip(),
+            prompt_tokens=result.get("prompt_eval_count", 0),
+            completion_tokens=result.get("eval_count", 0),
+            elapsed=time.time() - t0,
+            backend=self.name,
+        )
+
+
+class OpenAIBackend:
+    name = "openai"
+
+    def __init__(self, base_url: str, model: str, api_key: Optional[str] = None):
+        self.base_url = base_url.rstrip("/")
+        if self.base_url.endswith("/v1"):
+            self.base_url = self.base_url[:-3]
+        self.model = model
+        self.api_key = api_key
+
+    def complete(self, system: str, user: str, temperature: float = 0.3,
+                 max_tokens: Optional[int] = None, timeout: float = 60,
+                 schema: Optional[Dict[str, Any]] = None) -> LLMResult:
+        messages = ([{"role": "system", "content": system}] if system else []) + [{"role": "user", "content": user}]
+        payload: Dict[str, Any] = {"model": self.model, "messages": messages, "temperature": temperature}
+        if max_tokens:
+            payload["max_tokens"] = max_tokens
+        if schema:
+            payload["response_format"] = {
+                "type": "json_schema",
+                "json_schema": {"name": schema.get("title", "response"), "schema": schema, "strict": True},
+            }
+        headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else None
+        t0 = time.time()
+        result = _post_json(f"{self.base_url}/v1/chat/completions", payload, timeout, headers)
+        usage = result.get("usage") or {}
+        return LLMResult(
+            (result["choices"][0]["message"].get("content") or "").strip(),
+            prompt_tokens=usage.get("prompt_tokens", 0),
+            completion_tokens=usage.get("completion_tokens", 0),
+            elapsed=time.time() - t0,
+            backend=self.name,
+        )
+
+
+def make_backend(kind: Optional[str] = None, base_url: Optional[str] = None, model: Optional[str] = None):
+    kind = (kind or os.environ.get("LLM_BACKEND", "ollama")).lower()
+    if kind not in DEFAULT_MODELS:
+        raise ValueError(f"Unknown LLM_BACKEND: {kind} (expected ollama or openai)")
+    model = model or os.environ.get("LLM_MODEL") or DEFAULT_MODELS[kind]
+    if kind == "ollama":
+        return OllamaBackend(
+            base_url or os.environ.get("LLM_BASE_URL")
+            or os.environ.get("OLLAMA_HOST", "http://host.docker.internal:11434"),
+            model,
+        )
+    return OpenAIBackend(
+        base_url or os.environ.get("LLM_BASE_URL", "http://localhost:7545"),
+        model,
+        os.environ.get("LLM_API_KEY"),
+    )
+
+
+_BACKEND = None
+
+
+def get_backend():
+    """Process-wide backend from the environment (created on first use)."""
+    global _BACKEND
+    if _BACKEND is None:
+        _BACKEND = make_backend()
+    return _BACKEND
+
+
+def set_backend(backend) -> None:
+    global _BACKEND
+    _BACKEND = backend
+
+
+# ------------------------------
+# Per-endpoint counters
+# ------------------------------
+
+_STATS: Dict[str, Dict[str, Any]] = {}
+_STATS_LOCK = threading.Lock()
+
+
+def _endpoint_stats(endpoint: str) -> Dict[str, Any]:
+    st = _STATS.get(endpoint)
+    if st is None:
+        st = _STATS[endpoint] = {
+            "calls": 0, "errors": 0, "parse_failures": 0,
+            "prompt_tokens": 0, "completion_tokens": 0, "seconds": 0.0,
+        }
+    return st
+
+
+def parse_failed(endpoint: str) -> None:
+    """Count a reply from `endpoint` that could not be parsed into the expected shape."""
+    with _STATS_LOCK:
+        _endpoint_stats(endpoint)["parse_failures"] += 1
+
+
+def stats() -> Dict[str, Any]:
+    """Counters per endpoint, with averages and the parse-failure rate."""
+    with _STATS_LOCK:
+        snap = {k: dict(v) for k, v in _STATS.items()}
+    for st in snap.values():
+        ok = st["calls"] - st["errors"]
+        st["parse_failure_rate"] = round(st["parse_failures"] / ok, 3) if ok else 0.0
+        st["avg_completion_tokens"] = round(st["completion_tokens"] / ok, 1) if ok else 0.0
+        st["seconds"] = round(st["seconds"], 3)
+    return snap
+
+
+def complete(system: str, user: str, temperature: float = 0.3,
+             max_tokens: Optional[int] = None, timeout: float = 60,
+             schema: Optional[Dict[str, Any]] = None, endpoint: str = "other") -> LLMResult:
+    """
+    Blocking completion on the configured backend; call via asyncio.to_thread
+    from endpoints. `timeout` is cut to the request's remaining budget (see
+    deadline.py); DeadlineExceeded if it is already spent.
+    """
+    timeout = deadline.timeout(timeout)
+    t0 = time.time()
+    try:
+        with metrics.stage(f"llm_{endpoint}"):
+            result = get_backend().complete(system, user, temperature=temperature, max_tokens=max_tokens,
+                                            timeout=timeout, schema=schema)
+    except Exception:
+        with _STATS_LOCK:
+            st = _endpoint_stats(endpoint)
+            st["calls"] += 1
+            st["errors"] += 1
+            st["seconds"] += time.time() - t0
+        raise
+    with _STATS_LOCK:
+        st = _endpoint_stats(endpoint)
+        st["calls"] += 1
+        st["prompt_tokens"] += result.prompt_tokens
+        st["completion_tokens"] += result.completion_tokens
+        st["seconds"] += result.elapsed
+    return result
+
+
+# Pessimistic characters per token for budgeting structured replies: digits,
+# addresses and punctuation tokenize worse than prose (~4).
+SCHEMA_CHARS_PER_TOKEN = 3
+
+
+def _max_json_chars(schema: Dict[str, Any]) -> int:
+    """Length of the longest JSON text `schema` admits (compact, unescaped)."""
+    if "enum" in schema:
+        return max(len(json.dumps(v)) for v in schema["enum"])
+    kind = schema.get("type")
+    if kind == "boolean":
+        return len("false")
+    if kind == "string":
+        return schema["maxLength"] + 2
+    if kind == "array":
+        return 2 + schema["maxItems"] * (_max_json_chars(schema["items"]) + 2)
+    if kind == "object":
+        return 2 + sum(len(json.dumps(k)) + 2 + _max_json_chars(v) + 2 for k, v in schema["properties"].items())
+    raise ValueError(f"no length bound for schema type {kind!r}")
+
+
+def max_tokens_for(schema: Dict[str, Any]) -> int:
+    """
+    Decode budget that fits the largest reply `schema` allows, so a cap never
+    truncates valid output. Strings need maxLength and arrays maxItems.
+    """
+    return -(-_max_json_chars(schema) // SCHEMA_CHARS_PER_TOKEN) + 16
+
+
+_RE_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+
+def parse_json(text: str) -> Any:
+    """
+    JSON from a model reply: as-is, else without markdown fences, else the
+    outermost {...}. Raises ValueError when none of those parse.
+    """
+    text = (text or "").strip()
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+    stripped = _RE_FENCE.sub("", text).strip()
+    try:
+        return json.loads(stripped)
+    except ValueError:
+        pass
+    i, j = stripped.find("{"), stripped.rfind("}")
+    if 0 <= i < j:
+        return json.loads(stripped[i:j + 1])
+    raise ValueError("no JSON object in reply")
+
+
+def split_template(template: str, marker: str) -> tuple:
+    """
+    Split a prompt template into (static instructions, per-call part) at the
+    start of the line containing `marker`; ("", template) if it is absent.
+    """
+    i = template.find(marker)
+    if i < 0:
+        return "", template
+    i = template.rfind("\n", 0, i) + 1
+    return template[:i].rstrip(), template[i:]
@@ -1,4 +1,6 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from starlette.routing import Match
 import asyncio
 import json
 import sys
@@ -9,9 +11,170 @@ from urllib import request as urlrequest
 from urllib import parse as urlparse
 from urllib.error import URLError, HTTPError
 
+from .text_window import select_event_windows, CHARS_PER_TOKEN
+from .geocode_cache import GeocodeCache
+from .event_index import EventIndex
+from .jobs import JobManager
+from . import llm
+from . import deadline
+from . import metrics
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# Prompt budget for the page-content part of the extract_event prompt.
+EXTRACT_CONTENT_TOKENS = int(os.environ.get("EXTRACT_CONTENT_TOKENS", "600"))
+
+# extract_event instructions. Sent as the system part, identical for every page,
+# so the LLM server's prefix cache reuses them; the page excerpts go after.
+_EXTRACTION_SYSTEM = """You are an event extraction assistant. Analyze the following web page content to determine if it describes a specific, actionable food distribution event, meal service, or homeless aid event.
+
+Requirements for a valid event:
+- Must have a specific date or recurring schedule (e.g., "November 15th", "Every Tuesday at 5pm")
+- Must have a physical location/address where the event occurs
+- Must be related to food distribution, meals, shelter, or direct aid for homeless/needy individuals
+- Must be current or upcoming (late 2024 or 2025)
+
+If valid event found, extract:
+1. Name: Short descriptive name for the event
+2. Date: The date/time or recurring schedule in clear format
+3. Address: Full physical address where event occurs
+4. Summary: 1-2 sentence description of what's offered
+
+Output format:
+If valid event exists, respond with JSON only:
+{"valid": true, "name": "...", "date": "...", "address": "...", "summary": "..."}
+
+If NO valid event (no clear date, no address, just general info, etc.), respond with JSON only:
+{"valid": false, "reason": "brief explanation"}"""
+
+# Per-query DuckDuckGo timeout (the ddgs default), cut to the request deadline.
+SEARCH_TIMEOUT = float(os.environ.get("SEARCH_TIMEOUT", "5"))
+
+# JSON Schema for extract_event's reply; the server constrains decoding to it.
+_EXTRACTION_SCHEMA = {
+    "title": "event_extraction",
+    "type": "object",
+    "properties": {
+        "valid": {"type": "boolean"},
+        "name": {"type": "string", "maxLength": 80},
+        "date": {"type": "string", "maxLength": 80},
+        "address": {"type": "string", "maxLength": 150},
+        "summary": {"type": "string", "maxLength": 240},
+        "reason": {"type": "string", "maxLength": 120},
+    },
+    "required": ["valid"],
+    "additionalProperties": False,
+}
+
+
+def _feature_schema(features: list) -> dict:
+    """JSON Schema for /nearby's feature matcher: a short list drawn from `features`."""
+    return {
+        "title": "feature_match",
+        "type": "object",
+        "properties": {
+            "features": {
+                "type": "array",
+                "items": {"type": "string", "enum": list(features)},
+                "maxItems": 4,
+            },
+        },
+        "required": ["features"],
+        "additionalProperties": False,
+    }
+
+
+# Decode budgets for the schema-constrained LLM calls (see llm.complete): by
+# default just enough for the largest reply each schema allows, so valid output
+# is never cut off while a runaway generation still can't hold the GPU.
+EXTRACT_MAX_TOKENS = int(os.environ.get("EXTRACT_MAX_TOKENS") or llm.max_tokens_for(_EXTRACTION_SCHEMA))
+FEATURE_MATCH_MAX_TOKENS = int(os.environ.get("FEATURE_MATCH_MAX_TOKENS", "0"))    # 0: from the schema
+
+
+# Forward-geocode cache shared by every extract_event call (see geocode_cache.py)
+_GEOCODE_CACHE = GeocodeCache()
+
+# Cross-source event dedup index shared by scrape_events and find_event (see event_index.py)
+_EVENT_INDEX = EventIndex()
+
+# Background jobs (POST /jobs/scrape_events). JOB_WORKERS caps how many pipelines
+# run at once. Fetching is bounded inside scrape_utils (FETCH_MAX_IN_FLIGHT /
+# FETCH_PER_HOST) and page parsing runs in a separate process pool, so several
+# jobs can't starve the event loop's default executor.
+_JOBS = JobManager(max_concurrent=int(os.environ.get("JOB_WORKERS", "2")))
+
+# Page parsing (decode, tokenize, contacts) is pure-Python CPU work that holds
+# the GIL; in threads it serializes on one core and stalls the event loop, so
+# scrape_events ships raw bytes to worker processes, one per core by default.
+PARSE_WORKERS = int(os.environ.get("PARSE_WORKERS", str(os.cpu_count() or 1)))
+_PARSE_POOL = None
+
+
+def _parse_pool() -> ProcessPoolExecutor:
+    global _PARSE_POOL
+    if _PARSE_POOL is None:
+        # spawn: don't fork a process that is running an event loop and threads
+        _PARSE_POOL = ProcessPoolExecutor(
+            max_workers=PARSE_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _PARSE_POOL
+
+
+def _reset_parse_pool() -> None:
+    global _PARSE_POOL
+    if _PARSE_POOL is not None:
+        _PARSE_POOL.shutdown(wait=False, cancel_futures=True)
+        _PARSE_POOL = None
+
 app = FastAPI()
 
 
+def _route_label(request: Request) -> str:
+    """Route template for metrics labels (/jobs/{job_id}, not one label per job)."""
+    for route in request.app.router.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            return getattr(route, "path", request.url.path)
+    return "unmatched"
+
+
+@app.middleware("http")
+async def _instrument(request: Request, call_next):
+    """
+    Label stage metrics with the endpoint and add a Server-Timing header (see
+    metrics.py). The request histogram stops when the body has been sent, so
+    streamed results count in full; Server-Timing's total is time to headers.
+    """
+    with metrics.RequestTimer(_route_label(request)) as timer:
+        response = await call_next(request)
+        timer.status = response.status_code
+        response.headers["Server-Timing"] = timer.server_timing()
+        body = response.body_iterator
+
+        async def _timed_body():
+            try:
+                async for chunk in body:
+                    yield chunk
+            finally:
+                timer.finish()
+
+        response.body_iterator = _timed_body()
+        timer.defer()
+    return response
+
+
+def _observe_fetch(fetched: dict) -> None:
+    """Record a network fetch from iter_fetch (page-store hits are counted by the store)."""
+    if not fetched.get("from_store"):
+        metrics.observe("fetch", fetched.get("elapsed", 0.0))
+
+
+@app.on_event("shutdown")
+async def _shutdown_parse_pool():
+    _reset_parse_pool()
+
+
 @app.get("/")
 async def root():
     return {"message": "You've reached the Kind-To-Homeless API"}
@@ -43,6 +206,59 @@ async def info():
     }
 
 
+@app.get("/cache_stats")
+async def cache_stats():
+    """Return hit/miss counters for the HTTP cache, page store and geocode cache, plus per-host breaker state."""
+    parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if parent_dir not in sys.path:
+        sys.path.insert(0, parent_dir)
+
+    from agent_util.scrape_utils import http_cache_stats, page_store_stats, host_health_stats
+
+    return {
+        "http": http_cache_stats(),
+        "pages": page_store_stats(),
+        "hosts": host_health_stats(),
+        "geocode": _GEOCODE_CACHE.stats()
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    """Prometheus text format: request and per-stage latency histograms, in-flight
+    gauges, cache hit ratios and LLM token / parse-failure counters."""
+    parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if parent_dir not in sys.path:
+        sys.path.insert(0, parent_dir)
+
+    from agent_util.scrape_utils import http_cache_stats, page_store_stats
+
+    caches = {"http": http_cache_stats(), "pages": page_store_stats(), "geocode": _GEOCODE_CACHE.stats()}
+    caches = {name: st for name, st in caches.items() if st.get("enabled", True)}
+    llm_stats = llm.stats()
+    extra = [
+        ("cache_hits_total", "counter", "Cache lookups answered from the cache (HTTP: incl. revalidated).",
+         {(("cache", name),): st["hits"] + st.get("revalidated", 0) for name, st in caches.items()}),
+        ("cache_misses_total", "counter", "Cache lookups that went upstream.",
+         {(("cache", name),): st["misses"] for name, st in caches.items()}),
+        ("cache_hit_ratio", "gauge", "Hits / lookups since start.",
+         {(("cache", name),): st["hit_ratio"] for name, st in caches.items()}),
+        ("llm_completion_tokens_total", "counter", "Tokens generated by the LLM, by call type.",
+         {(("call", name),): st["completion_tokens"] for name, st in llm_stats.items()}),
+        ("llm_prompt_tokens_total", "counter", "Prompt tokens sent to the LLM, by call type.",
+         {(("call", name),): st["prompt_tokens"] for name, st in llm_stats.items()}),
+        ("llm_parse_failures_total", "counter", "LLM replies that could not be parsed, by call type.",
+         {(("call", name),): st["parse_failures"] for name, st in llm_stats.items()}),
+    ]
+    return metrics.render(extra)
+
+
+@app.get("/llm_stats")
+async def llm_stats():
+    """Return per-endpoint LLM counters: calls, errors, tokens generated and parse-failure rate."""
+    return {"backend": llm.get_backend().name, "endpoints": llm.stats()}
+
+
 @app.get("/nearby")
 async def nearby(latitude: float, longitude: float, radius: float = 3.0, feature: str = "all", limit: int = 3, search: str = None):
     """Return nearby facilities within the given radius (miles).
@@ -86,63 +302,51 @@ async def nearby(latitude: float, longitude: float, radius: float = 3.0, feature
         def _query_ollama(search_string: str, features: list) -> list:
             """Query Ollama to match search string to feature names."""
             ollama_start = time.time()
-            ollama_host = os.environ.get("OLLAMA_HOST", "http://host.docker.internal:11434")
-            ollama_url = f"{ollama_host}/api/generate"
 
             # Format features list clearly
             features_list = '\n'.join([f"- {f}" for f in features])
 
-            prompt = f"""Match "{search_string}" to features from this list. Return ONLY exact feature names.
+            # Static instructions first (shared by every search, so the server's
+            # prefix cache can reuse them); only the search string varies.
+            system_prompt = f"""Match the search to features from this list. Return ONLY exact feature names.
 
 Available features:
 {features_list}
 
 Rules:
 - Return exact names only (with underscores like food_bank)
-- Multiple matches: separate with comma
-- No quotes, no extra words, no punctuation at end
+- Multiple matches: list each one
+- Respond with JSON only: {{"features": ["..."]}}
 
 Examples:
-Search: bathroom → toilets
-Search: wash → shower
-Search: food → food_bank, soup_kitchen
-Search: sleep → shelter
-
-Match for "{search_string}":"""
-
-            payload = {
-                "model": "nemotron:70B",
-                "prompt": prompt,
-                "stream": False,
-                "options": {
-                    "temperature": 0.1
-                }
-            }
+Search: bathroom → {{"features": ["toilets"]}}
+Search: wash → {{"features": ["shower"]}}
+Search: food → {{"features": ["food_bank", "soup_kitchen"]}}
+Search: sleep → {{"features": ["shelter"]}}"""
 
             try:
-                req = urlrequest.Request(
-                    ollama_url,
-                    data=json.dumps(payload).encode('utf-8'),
-                    headers={"Content-Type": "application/json"},
-                    method="POST"
+                print(f"Calling LLM ({llm.get_backend().name}) for feature matching...")
+                schema = _feature_schema(features)
+                result = llm.complete(
+                    system_prompt, f'Match for "{search_string}":', temperature=0.1, timeout=60,
+                    schema=schema, max_tokens=FEATURE_MATCH_MAX_TOKENS or llm.max_tokens_for(schema), endpoint="nearby",
                 )
-                print(f"Calling Ollama at {ollama_url}...")
-                with urlrequest.urlopen(req, timeout=60) as resp:
-                    body = resp.read().decode('utf-8')
-                    result = json.loads(body)
-                    response_text = result.get("response", "").strip()
-
-                    ollama_elapsed = time.time() - ollama_start
-
-                    # Extract performance metrics from Ollama response
-                    eval_count = result.get("eval_count", 0)
-                    eval_duration = result.get("eval_duration", 0) / 1e9  # Convert nanoseconds to seconds
-                    tokens_per_sec = eval_count / eval_duration if eval_duration > 0 else 0
-
-                    print(f"Ollama inference time: {ollama_elapsed:.3f}s")
-                    print(f"Ollama tokens generated: {eval_count}, speed: {tokens_per_sec:.1f} tokens/s")
-                    print(f"Ollama raw response: {response_text}")
-
+                response_text = result.text
+
+                ollama_elapsed = time.time() - ollama_start
+
+                print(f"LLM inference time: {ollama_elapsed:.3f}s")
+                print(f"LLM tokens generated: {result.completion_tokens}, speed: {result.tokens_per_second:.1f} tokens/s")
+                print(f"LLM raw response: {response_text}")
+
+                try:
+                    parsed = llm.parse_json(response_text)
+                    if not isinstance(parsed, dict) or not isinstance(parsed.get("features"), list):
+                        raise ValueError("reply has no features list")
+                    matched_features = [f.strip() for f in parsed["features"] if isinstance(f, str) and f.strip()]
+                except ValueError:
+                    # Server ignored the schema: fall back to the old comma-list reading
+                    llm.parse_failed("nearby")
                     # Clean up response - remove quotes, periods, and extra whitespace
                     response_text = response_text.replace('"', '').replace("'", "")
                     # Take only the first line if multiple lines
@@ -153,29 +357,28 @@ Match for "{search_string}":"""
                     # Parse comma-separated feature names
                     matched_features = [f.strip() for f in response_text.split(',') if f.strip()]
 
-                    # Filter to only valid features - handle plurals and close matches
-                    valid_matches = []
-                    for matched in matched_features:
-                        # Exact match first
-                        if matched in features:
-                            valid_matches.append(matched)
-                        # Try removing 's' for plural
-                        elif matched.endswith('s') and matched[:-1] in features:
-                            valid_matches.append(matched[:-1])
-                        # Try adding underscore variations
-                        elif matched.replace(' ', '_') in features:
-                            valid_matches.append(matched.replace(' ', '_'))
-
-                    # Remove duplicates while preserving order
-                    valid_matches = list(dict.fromkeys(valid_matches))
-
-                    print(f"Cleaned response: {response_text}")
-                    print(f"Matched features after filtering: {valid_matches}")
-
-                    return valid_matches
+                # Filter to only valid features - handle plurals and close matches
+                valid_matches = []
+                for matched in matched_features:
+                    # Exact match first
+                    if matched in features:
+                        valid_matches.append(matched)
+                    # Try removing 's' for plural
+                    elif matched.endswith('s') and matched[:-1] in features:
+                        valid_matches.append(matched[:-1])
+                    # Try adding underscore variations
+                    elif matched.replace(' ', '_') in features:
+                        valid_matches.append(matched.replace(' ', '_'))
+
+                # Remove duplicates while preserving order
+                valid_matches = list(dict.fromkeys(valid_matches))
+
+                print(f"Matched features after filtering: {valid_matches}")
+
+                return valid_matches
             except Exception as e:
                 # Return empty list on error
-                print(f"Ollama error: {type(e).__name__}: {e}")
+                print(f"LLM error: {type(e).__name__}: {e}")
                 import traceback
                 traceback.print_exc()
                 return []
@@ -283,7 +486,7 @@ out center tags;"""
         nominatim_url = f"http://nominatim:8080/reverse?format=json&lat={lat}&lon={lon}"
         try:
             req = urlrequest.Request(nominatim_url, method="GET")
-            with urlrequest.urlopen(req, timeout=10) as resp:
+            with metrics.stage("nominatim_reverse"), urlrequest.urlopen(req, timeout=10) as resp:
                 body = resp.read().decode("utf-8")
                 if not body:
                     return ""
@@ -318,7 +521,8 @@ out center tags;"""
 
     try:
         fetch_start = time.time()
-        data = await asyncio.to_thread(_fetch)
+        with metrics.stage("overpass"):
+            data = await asyncio.to_thread(_fetch)
         fetch_elapsed = time.time() - fetch_start
         print(f"Overpass API fetch time: {fetch_elapsed:.3f}s")
     except (URLError, HTTPError, TimeoutError, ValueError) as e:
@@ -445,20 +649,22 @@ async def search(query: str, max_results: int = 5):
         from ddgs import DDGS
 
         def _search():
-            with DDGS() as ddgs:
+            with metrics.stage("ddgs"), DDGS(timeout=deadline.timeout(SEARCH_TIMEOUT)) as ddgs:
                 results = list(ddgs.text(query, max_results=max_results))
                 return [{"url": r["href"], "title": r["title"]} for r in results]
 
         search_results = await asyncio.to_thread(_search)
         return {"results": search_results}
 
+    except deadline.DeadlineExceeded:
+        raise
     except Exception as e:
         return {"error": str(e), "type": type(e).__name__}
 
 
 @app.get("/prompt_search")
 async def prompt_search(latitude: float = 32.9859, longitude: float = -96.7503):
-    """Use Ollama to generate search queries from prompt-search.txt, then search and return URLs.
+    """Use the LLM backend to generate search queries from prompt-search.txt, then search and return URLs.
 
     Args:
         latitude: Latitude for city identification. Default is Richardson, Texas.
@@ -466,7 +672,7 @@ async def prompt_search(latitude: float = 32.9859, longitude: float = -96.7503):
 
     Returns:
         JSON object with:
-        - search_queries: List of search query strings generated by Ollama
+        - search_queries: List of search query strings generated by the LLM
         - urls: List of all search result URLs from those queries
     """
     try:
@@ -476,7 +682,7 @@ async def prompt_search(latitude: float = 32.9859, longitude: float = -96.7503):
             nominatim_url = f"http://nominatim:8080/reverse?format=json&lat={lat}&lon={lon}"
             try:
                 req = urlrequest.Request(nominatim_url, method="GET")
-                with urlrequest.urlopen(req, timeout=10) as resp:
+                with metrics.stage("nominatim_reverse"), urlrequest.urlopen(req, timeout=deadline.timeout(10)) as resp:
                     body = resp.read().decode("utf-8")
                     if not body:
                         return "Richardson, Texas"  # fallback
@@ -495,7 +701,7 @@ async def prompt_search(latitude: float = 32.9859, longitude: float = -96.7503):
                 return "Richardson, Texas"  # fallback on error
 
         # Get city name
-        city_name = await asyncio.to_thread(_get_city_name, latitude, longitude)
+        city_name = await deadline.run(asyncio.to_thread(_get_city_name, latitude, longitude))
 
         # Load the prompt from file
         # In Docker, WORKDIR is /app, so we can use absolute path
@@ -507,36 +713,19 @@ async def prompt_search(latitude: float = 32.9859, longitude: float = -96.7503):
         with open(prompt_path, 'r') as f:
             prompt = f.read()
 
-        # Replace [CITY] placeholder with actual city name
-        prompt = prompt.replace('[CITY]', city_name)
-
-        # Call Ollama to generate search queries
-        ollama_host = os.environ.get("OLLAMA_HOST", "http://host.docker.internal:11434")
-        ollama_url = f"{ollama_host}/api/generate"
-
-        payload = {
-            "model": "nemotron:70B",
-            "prompt": prompt,
-            "stream": False,
-            "options": {
-                "temperature": 0.7
-            }
-        }
-
-        def _query_ollama():
-            req = urlrequest.Request(
-                ollama_url,
-                data=json.dumps(payload).encode('utf-8'),
-                headers={"Content-Type": "application/json"},
-                method="POST"
-            )
-            with urlrequest.urlopen(req, timeout=60) as resp:
-                body = resp.read().decode('utf-8')
-                result = json.loads(body)
-                return result.get("response", "").strip()
+        # Keep the template (with its [CITY] placeholder) as the static system
+        # prompt so the prefix cache is shared across cities; the city goes last.
+        def _generate_queries():
+            return llm.complete(
+                prompt,
+                f"[CITY] is {city_name}. Write the 10 queries for {city_name} now.",
+                temperature=0.7,
+                timeout=60,
+                endpoint="prompt_search_queries",
+            ).text
 
-        # Get generated queries from Ollama
-        response_text = await asyncio.to_thread(_query_ollama)
+        # Get generated queries from the LLM
+        response_text = await deadline.run(asyncio.to_thread(_generate_queries))
 
         # Parse queries - split on both newlines and commas
         # First replace newlines with commas, then split on commas
@@ -547,7 +736,7 @@ async def prompt_search(latitude: float = 32.9859, longitude: float = -96.7503):
         for query in queries:
             # Append " November 2025" to each search query
             search_query = f"{query} November 2025"
-            search_results = await search(search_query, max_results=50)
+            search_results = await deadline.run(search(search_query, max_results=50))
             if "results" in search_results:
                 all_results_by_query[query] = search_results["results"]
 
@@ -558,10 +747,12 @@ async def prompt_search(latitude: float = 32.9859, longitude: float = -96.7503):
 
         with open(selector_prompt_path, 'r') as f:
             selector_prompt_template = f.read()
+        # Criteria first (identical for every query), then the query and its URLs
+        selector_system, selector_user_template = llm.split_template(selector_prompt_template, '{query}')
 
-        # For each query, filter URLs using Ollama
+        # For each query, filter URLs with the LLM
         def _filter_urls(query_text: str, results: list) -> list:
-            """Use Ollama to filter URLs for relevance."""
+            """Use the LLM to filter URLs for relevance."""
             if not results:
                 return []
 
@@ -569,52 +760,35 @@ async def prompt_search(latitude: float = 32.9859, longitude: float = -96.7503):
             urls_text = '\n'.join([f"{r['title']}\n{r['url']}" for r in results])
 
             # Build the filtering prompt
-            filter_prompt = selector_prompt_template.replace('{query}', query_text)
+            filter_prompt = selector_user_template.replace('{query}', query_text)
             filter_prompt = filter_prompt.replace('{urls}', urls_text)
 
-            payload = {
-                "model": "nemotron:70B",
-                "prompt": filter_prompt,
-                "stream": False,
-                "options": {
-                    "temperature": 0.3  # Lower temperature for more focused filtering
-                }
-            }
-
-            req = urlrequest.Request(
-                ollama_url,
-                data=json.dumps(payload).encode('utf-8'),
-                headers={"Content-Type": "application/json"},
-                method="POST"
-            )
-            with urlrequest.urlopen(req, timeout=60) as resp:
-                body = resp.read().decode('utf-8')
-                result = json.loads(body)
-                response = result.get("response", "").strip()
-
-                # If response is "NONE", return empty list
-                if response.upper() == "NONE":
-                    return []
+            # Lower temperature for more focused filtering
+            response = llm.complete(selector_system, filter_prompt, temperature=0.3, timeout=60,
+                                    endpoint="prompt_search_filter").text
+            # If response is "NONE", return empty list
+            if response.upper() == "NONE":
+                return []
 
-                # Parse URLs from response (one per line)
-                filtered_urls = [line.strip() for line in response.split('\n') if line.strip() and line.strip().startswith('http')]
+            # Parse URLs from response (one per line)
+            filtered_urls = [line.strip() for line in response.split('\n') if line.strip() and line.strip().startswith('http')]
 
-                # Match filtered URLs back to original results to keep titles
-                filtered_results = []
-                for url in filtered_urls:
-                    for r in results:
-                        if r['url'] == url:
-                            filtered_results.append(r)
-                            break
+            # Match filtered URLs back to original results to keep titles
+            filtered_results = []
+            for url in filtered_urls:
+                for r in results:
+                    if r['url'] == url:
+                        filtered_results.append(r)
+                        break
 
-                return filtered_results
+            return filtered_results
 
         # Filter URLs for each query in parallel
         filter_tasks = [
             asyncio.to_thread(_filter_urls, query, results)
             for query, results in all_results_by_query.items()
         ]
-        filtered_results_list = await asyncio.gather(*filter_tasks)
+        filtered_results_list = await deadline.run(asyncio.gather(*filter_tasks))
 
         # Combine all filtered results
         final_urls = []
@@ -632,6 +806,8 @@ async def prompt_search(latitude: float = 32.9859, longitude: float = -96.7503):
 
         return {"search_queries": queries, "urls": final_urls, "total_filtered": len(final_urls)}
 
+    except deadline.DeadlineExceeded:
+        raise
     except Exception as e:
         return {"error": str(e), "type": type(e).__name__}
 
@@ -659,9 +835,16 @@ async def scrape_events(latitude: float = 32.9859, longitude: float = -96.7503):
             - query: Original search query that found this URL
             - text_content: Cleaned plaintext of the page (first 3000 chars)
             - contacts: Extracted emails, phones, and hours
+            - known_event: Previously extracted event for this URL/page, if any
+            - duplicate_of: URL of an identical page earlier in the list, if any
             - success: Whether scraping succeeded
             - error: Error message if scraping failed
     """
+    return await _scrape_events(latitude, longitude)
+
+
+async def _scrape_events(latitude: float, longitude: float, job=None) -> dict:
+    """scrape_events pipeline. When `job` is given, reports stage progress and emits pages on it."""
     import time
 
     try:
@@ -669,13 +852,19 @@ async def scrape_events(latitude: float = 32.9859, longitude: float = -96.7503):
 
         # Step 1: Call prompt_search to get relevant URLs
         print(f"Calling prompt_search with lat={latitude}, lon={longitude}")
+        if job:
+            job.stage("search")
         search_results = await prompt_search(latitude, longitude)
 
         if "error" in search_results:
+            if job:
+                job.stage("search", "failed")
             return {"error": "Failed to get search results", "detail": search_results}
 
         urls_to_scrape = search_results.get("urls", [])
         search_queries = search_results.get("search_queries", [])
+        if job:
+            job.stage("search", "done", urls=len(urls_to_scrape), queries=len(search_queries))
 
         if not urls_to_scrape:
             return {
@@ -693,50 +882,104 @@ async def scrape_events(latitude: float = 32.9859, longitude: float = -96.7503):
         if parent_dir not in sys.path:
             sys.path.insert(0, parent_dir)
 
-        from agent_util.scrape_utils import get_html, html_to_text, extract_title, extract_contacts
+        from agent_util.scrape_utils import iter_fetch, parse_page, canonicalize_url, store_page_text
 
-        # Step 3: Scrape each URL
-        def _scrape_url(url_info: dict) -> dict:
-            """Scrape a single URL and extract content."""
+        def _page_stub(url_info: dict, **extra) -> dict:
+            page = {
+                "url": url_info['url'],
+                "title": url_info.get('title', ''),
+                "query": url_info.get('query', ''),
+                "text_content": "",
+                "full_text_length": 0,
+                "contacts": {"emails": [], "phones": [], "hours": []},
+            }
+            page.update(extra)
+            return page
+
+        loop = asyncio.get_running_loop()
+        pages_by_url = {}
+        first_url_by_hash = {}
+
+        def _finish(page: dict) -> None:
+            # Mark mirrors: identical page text already returned under another URL
+            h = page.get("content_hash")
+            if h:
+                if h in first_url_by_hash:
+                    page["duplicate_of"] = first_url_by_hash[h]
+                else:
+                    first_url_by_hash[h] = page["url"]
+            pages_by_url[page["url"]] = page
+            if job:
+                job.advance("scrape")
+                job.emit(page)
+
+        if job:
+            job.stage("scrape", total=len(urls_to_scrape))
+
+        # Short-circuit URLs that already produced a known event
+        info_by_url = {}
+        for url_info in urls_to_scrape:
+            known_event = _EVENT_INDEX.lookup_url(canonicalize_url(url_info['url']))
+            if known_event:
+                print(f"Known event for {url_info['url']}, skipping scrape")
+                _finish(_page_stub(url_info, known_event=known_event, success=True))
+            else:
+                info_by_url[url_info['url']] = url_info
+
+        # Step 3: Parse each fetched page in the process pool (bytes in, compact dict out)
+        async def _parse_one(fetched: dict) -> None:
+            url_info = info_by_url[fetched["url"]]
             url = url_info['url']
+            if not fetched["ok"]:
+                print(f"Error scraping {url}: {fetched.get('error')}")
+                _finish(_page_stub(url_info, success=False, error=fetched.get("error", "fetch failed")))
+                return
             try:
-                print(f"Scraping: {url}")
-                html = get_html(url, timeout=20)
-                title = extract_title(html)
-                text = html_to_text(html)
-
-                # Extract contact information
-                contacts = extract_contacts(text)
-
-                # Truncate text to first 3000 characters for readability
-                text_preview = text[:3000] + "..." if len(text) > 3000 else text
-
-                return {
-                    "url": url,
-                    "title": title,
-                    "query": url_info.get('query', ''),
-                    "text_content": text_preview,
-                    "full_text_length": len(text),
-                    "contacts": contacts,
-                    "success": True
-                }
+                # Text from the page store skips decoding and HTML parsing in the worker;
+                # otherwise ask for the full text back so the store can keep it
+                stored_text = fetched.get("text")
+                with metrics.stage("parse"):
+                    parsed = await loop.run_in_executor(
+                        _parse_pool(), parse_page,
+                        fetched["body"] if stored_text is None else b"", fetched["content_type"], url, 3000,
+                        stored_text, fetched.get("title", ""),
+                        stored_text is None and bool(fetched.get("body_hash")),
+                    )
+                if "text" in parsed:
+                    await asyncio.to_thread(store_page_text, fetched["body_hash"], parsed.pop("text"), parsed["title"])
             except Exception as e:
+                if isinstance(e, BrokenProcessPool):
+                    # A worker died (OOM, segfault); start a fresh pool for later pages
+                    _reset_parse_pool()
                 print(f"Error scraping {url}: {type(e).__name__}: {e}")
-                return {
-                    "url": url,
-                    "title": url_info.get('title', ''),
-                    "query": url_info.get('query', ''),
-                    "text_content": "",
-                    "full_text_length": 0,
-                    "contacts": {"emails": [], "phones": [], "hours": []},
-                    "success": False,
-                    "error": f"{type(e).__name__}: {str(e)}"
-                }
-
-        # Scrape all URLs in parallel
-        print("Starting parallel scraping...")
-        scrape_tasks = [asyncio.to_thread(_scrape_url, url_info) for url_info in urls_to_scrape]
-        scraped_pages = await asyncio.gather(*scrape_tasks)
+                _finish(_page_stub(url_info, success=False, error=f"{type(e).__name__}: {str(e)}"))
+                return
+
+            page = {
+                "url": url,
+                "title": parsed["title"],
+                "query": url_info.get('query', ''),
+                "text_content": parsed["text_preview"],
+                "full_text_length": parsed["full_text_length"],
+                "contacts": parsed["contacts"],
+                "content_hash": parsed["text_hash"],
+                "success": True
+            }
+            seen = _EVENT_INDEX.lookup_hash(parsed["text_hash"])
+            if seen and seen["event"]:
+                # Mirror of a page we already extracted an event from
+                page["known_event"] = _EVENT_INDEX.add(seen["event"], source_url=canonicalize_url(url))
+            _finish(page)
+
+        # Fetch concurrently under the global/per-host limits; parse each page as it lands
+        print(f"Starting parallel scraping of {len(info_by_url)} URLs...")
+        parse_tasks = []
+        async for fetched in iter_fetch(list(info_by_url), timeout=20, raw=True):
+            _observe_fetch(fetched)
+            parse_tasks.append(asyncio.create_task(_parse_one(fetched)))
+        await asyncio.gather(*parse_tasks)
+
+        scraped_pages = [pages_by_url[u['url']] for u in urls_to_scrape if u['url'] in pages_by_url]
 
         # Count successful scrapes
         successful = sum(1 for page in scraped_pages if page.get("success"))
@@ -744,6 +987,8 @@ async def scrape_events(latitude: float = 32.9859, longitude: float = -96.7503):
 
         elapsed = time.time() - start_time
         print(f"Scraping complete: {successful} successful, {failed} failed in {elapsed:.2f}s")
+        if job:
+            job.stage("scrape", "done", successful=successful, failed=failed)
 
         return {
             "search_queries": search_queries,
@@ -760,12 +1005,72 @@ async def scrape_events(latitude: float = 32.9859, longitude: float = -96.7503):
         return {"error": str(e), "type": type(e).__name__}
 
 
+@app.post("/jobs/scrape_events")
+async def submit_scrape_events(latitude: float = 32.9859, longitude: float = -96.7503):
+    """Start a scrape_events run in the background and return its job id immediately.
+
+    Poll GET /jobs/{job_id} for per-stage progress and read pages as they are
+    scraped from GET /jobs/{job_id}/results.
+
+    Returns:
+        JSON object with job_id, status, and the status/results URLs.
+    """
+    async def _runner(job):
+        result = await _scrape_events(latitude, longitude, job=job)
+        if "error" in result:
+            raise RuntimeError(f"{result['error']}: {result.get('detail', '')}")
+        # Pages were already emitted one by one; keep only the totals in the summary
+        return {k: v for k, v in result.items() if k != "scraped_pages"}
+
+    job = _JOBS.submit("scrape_events", {"latitude": latitude, "longitude": longitude}, _runner)
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"/jobs/{job.id}",
+        "results_url": f"/jobs/{job.id}/results",
+    }
+
+
+@app.get("/jobs")
+async def list_jobs():
+    """List known jobs, newest first."""
+    return {"jobs": _JOBS.all()}
+
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    """Return status, per-stage progress (done/total) and summary for a job."""
+    job = _JOBS.get(job_id)
+    if job is None:
+        return {"error": f"Unknown job: {job_id}"}
+    return job.to_dict()
+
+
+@app.get("/jobs/{job_id}/results")
+async def job_results(job_id: str):
+    """Stream a job's results as newline-delimited JSON while it runs.
+
+    Each line is one scraped page (same shape as scrape_events' scraped_pages
+    items). The final line is {"done": true, "status": ..., "summary": ...}.
+    """
+    job = _JOBS.get(job_id)
+    if job is None:
+        return {"error": f"Unknown job: {job_id}"}
+
+    async def _ndjson():
+        async for item in job.stream():
+            yield json.dumps(item) + "\n"
+        yield json.dumps({"done": True, "status": job.status, "summary": job.summary, "error": job.error}) + "\n"
+
+    return StreamingResponse(_ndjson(), media_type="application/x-ndjson")
+
+
 @app.post("/extract_event")
 async def extract_event(content: str):
-    """Extract event information from scraped web page content using Ollama.
+    """Extract event information from scraped web page content using the LLM backend (see llm.py).
 
     This endpoint:
-    1. Uses Ollama to analyze the content and determine if it describes a valid event
+    1. Uses the LLM (Ollama or an OpenAI-compatible server such as vLLM) to analyze the content and determine if it describes a valid event
     2. If valid, extracts event details (name, date, address, summary)
     3. Geocodes the address using Nominatim to get GPS coordinates
     4. Returns structured event JSON or null if no valid event found
@@ -784,75 +1089,34 @@ async def extract_event(content: str):
     try:
         start_time = time.time()
 
-        # Build prompt for Ollama to extract event information
-        extraction_prompt = f"""You are an event extraction assistant. Analyze the following web page content to determine if it describes a specific, actionable food distribution event, meal service, or homeless aid event.
+        # Keep only the date/time/address-dense parts of the page instead of its first
+        # 4000 chars, which on most sites is navigation and cookie banners.
+        windowed = select_event_windows(content, max_tokens=EXTRACT_CONTENT_TOKENS)
+        print(f"Event windows: {len(content)} -> {len(windowed)} chars "
+              f"(~{len(windowed) // CHARS_PER_TOKEN} tokens)")
 
-Requirements for a valid event:
-- Must have a specific date or recurring schedule (e.g., "November 15th", "Every Tuesday at 5pm")
-- Must have a physical location/address where the event occurs
-- Must be related to food distribution, meals, shelter, or direct aid for homeless/needy individuals
-- Must be current or upcoming (late 2024 or 2025)
+        extraction_user = f"""Content to analyze (most relevant excerpts, separated by "..."):
+{windowed}"""
 
-If valid event found, extract:
-1. Name: Short descriptive name for the event
-2. Date: The date/time or recurring schedule in clear format
-3. Address: Full physical address where event occurs
-4. Summary: 1-2 sentence description of what's offered
+        def _extract():
+            return llm.complete(
+                _EXTRACTION_SYSTEM, extraction_user, temperature=0.3, timeout=90,
+                schema=_EXTRACTION_SCHEMA, max_tokens=EXTRACT_MAX_TOKENS, endpoint="extract_event",
+            ).text
 
-Output format:
-If valid event exists, respond with JSON only:
-{{"valid": true, "name": "...", "date": "...", "address": "...", "summary": "..."}}
-
-If NO valid event (no clear date, no address, just general info, etc.), respond with JSON only:
-{{"valid": false, "reason": "brief explanation"}}
-
-Content to analyze:
-{content[:4000]}"""
-
-        # Call Ollama
-        ollama_host = os.environ.get("OLLAMA_HOST", "http://host.docker.internal:11434")
-        ollama_url = f"{ollama_host}/api/generate"
-
-        payload = {
-            "model": "nemotron:70B",
-            "prompt": extraction_prompt,
-            "stream": False,
-            "options": {
-                "temperature": 0.3
-            }
-        }
-
-        def _query_ollama():
-            req = urlrequest.Request(
-                ollama_url,
-                data=json.dumps(payload).encode('utf-8'),
-                headers={"Content-Type": "application/json"},
-                method="POST"
-            )
-            with urlrequest.urlopen(req, timeout=90) as resp:
-                body = resp.read().decode('utf-8')
-                result = json.loads(body)
-                return result.get("response", "").strip()
-
-        print("Calling Ollama to extract event information...")
-        response_text = await asyncio.to_thread(_query_ollama)
-        print(f"Ollama response: {response_text[:200]}...")
-
-        # Parse JSON response from Ollama
-        # Clean up response - sometimes LLMs add markdown code blocks
-        response_text = response_text.strip()
-        if response_text.startswith("```json"):
-            response_text = response_text[7:]
-        if response_text.startswith("```"):
-            response_text = response_text[3:]
-        if response_text.endswith("```"):
-            response_text = response_text[:-3]
-        response_text = response_text.strip()
+        print(f"Calling LLM ({llm.get_backend().name}) to extract event information...")
+        response_text = await deadline.run(asyncio.to_thread(_extract))
+        print(f"LLM response: {response_text[:200]}...")
 
+        # Parse JSON response from the LLM. Decoding is schema-constrained, but a
+        # server without structured output may still wrap it in markdown fences.
         try:
-            event_data = json.loads(response_text)
-        except json.JSONDecodeError as e:
-            print(f"Failed to parse Ollama JSON response: {e}")
+            event_data = llm.parse_json(response_text)
+            if not isinstance(event_data, dict):
+                raise ValueError("reply is not a JSON object")
+        except ValueError as e:
+            llm.parse_failed("extract_event")
+            print(f"Failed to parse LLM JSON response: {e}")
             return {
                 "event": None,
                 "reasoning": "Failed to parse event extraction response",
@@ -878,31 +1142,43 @@ Content to analyze:
                 "reasoning": "Event found but no address provided"
             }
 
-        # Geocode the address using Nominatim
+        # Geocode the address using Nominatim (through the on-disk cache)
         def _geocode_address(address: str) -> dict:
             """Query Nominatim to get coordinates for an address."""
+            found, cached = _GEOCODE_CACHE.get(address)
+            if found:
+                print(f"Geocode cache hit: {address}")
+                return cached
+
             nominatim_url = f"http://nominatim:8080/search?format=json&q={urlparse.quote(address)}&limit=1"
+            geocode_timeout = deadline.timeout(15)
             try:
                 req = urlrequest.Request(nominatim_url, method="GET")
-                with urlrequest.urlopen(req, timeout=15) as resp:
+                with metrics.stage("nominatim_search"), urlrequest.urlopen(req, timeout=geocode_timeout) as resp:
                     body = resp.read().decode("utf-8")
-                    if not body:
-                        return None
-                    results = json.loads(body)
-                    if results and len(results) > 0:
-                        result = results[0]
-                        return {
-                            "latitude": float(result["lat"]),
-                            "longitude": float(result["lon"]),
-                            "display_name": result.get("display_name", address)
-                        }
-                    return None
             except Exception as e:
+                # Transport errors are not cached; Nominatim may just be restarting
                 print(f"Geocoding error: {e}")
                 return None
 
+            result = None
+            try:
+                results = json.loads(body) if body else []
+                if results:
+                    result = {
+                        "latitude": float(results[0]["lat"]),
+                        "longitude": float(results[0]["lon"]),
+                        "display_name": results[0].get("display_name", address)
+                    }
+            except (ValueError, KeyError, TypeError) as e:
+                print(f"Geocoding error: {e}")
+                return None
+
+            _GEOCODE_CACHE.put(address, result)
+            return result
+
         print(f"Geocoding address: {event_address}")
-        geocode_result = await asyncio.to_thread(_geocode_address, event_address)
+        geocode_result = await deadline.run(asyncio.to_thread(_geocode_address, event_address))
 
         if not geocode_result:
             return {
@@ -928,6 +1204,8 @@ Content to analyze:
             "reasoning": "Valid event found and geocoded successfully"
         }
 
+    except deadline.DeadlineExceeded:
+        raise
     except Exception as e:
         import traceback
         traceback.print_exc()
@@ -940,7 +1218,7 @@ async def find_event(latitude: float = 32.9859, longitude: float = -96.7503):
 
     This endpoint:
     1. Calls /prompt_search to get relevant URLs
-    2. Processes URLs one at a time, scraping and extracting event data
+    2. Fetches URLs concurrently and extracts event data from each page as it arrives
     3. Returns as soon as a valid event is found
     4. If no event found after 40 seconds, falls back to Local Good Pantry data
 
@@ -958,6 +1236,7 @@ async def find_event(latitude: float = 32.9859, longitude: float = -96.7503):
             - latitude: GPS latitude
             - longitude: GPS longitude
             - source_url: URL where event was found
+            - source_urls: Every URL this (deduplicated) event has been seen on
         - processing_time: Time taken to find the event
         - urls_processed: Number of URLs processed before finding event
     """
@@ -980,85 +1259,166 @@ async def find_event(latitude: float = 32.9859, longitude: float = -96.7503):
         start_time = time.time()
         TIMEOUT = 40  # seconds
 
-        # Step 1: Get search URLs
-        print(f"Starting find_event with lat={latitude}, lon={longitude}")
-        search_results = await prompt_search(latitude, longitude)
+        def _fallback(processed: int) -> dict:
+            fallback_result = FALLBACK_EVENT.copy()
+            fallback_result["processing_time"] = round(time.time() - start_time, 2)
+            fallback_result["urls_processed"] = processed
+            return fallback_result
 
-        if "error" in search_results:
-            print("Error in prompt_search, using fallback")
-            return FALLBACK_EVENT
+        # One budget for the whole request: search, fetches, LLM calls and
+        # geocoding all take their timeouts from it (see deadline.py)
+        processed = 0
+        with deadline.scope(TIMEOUT) as dl:
+            # Step 1: Get search URLs
+            print(f"Starting find_event with lat={latitude}, lon={longitude}")
+            search_results = await dl.run(prompt_search(latitude, longitude))
 
-        urls_to_process = search_results.get("urls", [])
+            if "error" in search_results:
+                print("Error in prompt_search, using fallback")
+                return FALLBACK_EVENT
 
-        if not urls_to_process:
-            print("No URLs found, using fallback")
-            return FALLBACK_EVENT
+            urls_to_process = search_results.get("urls", [])
 
-        print(f"Found {len(urls_to_process)} URLs to process")
+            if not urls_to_process:
+                print("No URLs found, using fallback")
+                return FALLBACK_EVENT
 
-        # Import scraping utilities
-        parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        if parent_dir not in sys.path:
-            sys.path.insert(0, parent_dir)
+            print(f"Found {len(urls_to_process)} URLs to process")
 
-        from agent_util.scrape_utils import get_html, html_to_text, extract_title
+            # Import scraping utilities
+            parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            if parent_dir not in sys.path:
+                sys.path.insert(0, parent_dir)
 
-        # Step 2: Process URLs one at a time
-        for i, url_info in enumerate(urls_to_process):
-            # Check timeout
-            elapsed = time.time() - start_time
-            if elapsed >= TIMEOUT:
-                print(f"Timeout reached after {elapsed:.2f}s, using fallback")
-                fallback_result = FALLBACK_EVENT.copy()
-                fallback_result["processing_time"] = round(elapsed, 2)
-                fallback_result["urls_processed"] = i
-                return fallback_result
+            from agent_util.scrape_utils import iter_fetch, html_to_text, canonicalize_url, store_page_text
 
-            url = url_info['url']
-            print(f"Processing URL {i+1}/{len(urls_to_process)}: {url}")
+            def _found(event: dict, url: str, processed: int) -> dict:
+                event = dict(event)
+                event["source_url"] = url
+                elapsed = time.time() - start_time
+                print(f"Found valid event in {elapsed:.2f}s after processing {processed} URLs")
+                return {
+                    "events": [event],
+                    "processing_time": round(elapsed, 2),
+                    "urls_processed": processed
+                }
 
+            # Already extracted from one of these URLs before: no scrape, no LLM
+            for i, url_info in enumerate(urls_to_process):
+                known_event = _EVENT_INDEX.lookup_url(canonicalize_url(url_info['url']))
+                if known_event:
+                    print(f"Known event for {url_info['url']}, skipping extraction")
+                    return _found(known_event, url_info['url'], i + 1)
+
+            # Step 2: Fetch URLs concurrently (global/per-host limits, bounded by the
+            # remaining time) and extract events from pages in the order they arrive
+            fetches = iter_fetch([u['url'] for u in urls_to_process], timeout=15, deadline=dl.expires)
             try:
-                # Scrape the URL
-                def _scrape():
-                    html = get_html(url, timeout=15)
-                    return html_to_text(html)
+                async for fetched in fetches:
+                    _observe_fetch(fetched)
+                    # Check timeout
+                    if dl.expired():
+                        print(f"Timeout reached after {time.time() - start_time:.2f}s, using fallback")
+                        return _fallback(processed)
+
+                    processed += 1
+                    url = fetched['url']
+                    canonical_url = canonicalize_url(url)
+                    print(f"Processing URL {processed}/{len(urls_to_process)}: {url}")
+
+                    if not fetched["ok"]:
+                        print(f"Error processing {url}: {fetched.get('error')}")
+                        continue
+
+                    try:
+                        content = fetched.get("text")
+                        if content is None:
+                            with metrics.stage("parse"):
+                                content = await dl.run(asyncio.to_thread(html_to_text, fetched["html"]))
+                            await asyncio.to_thread(store_page_text, fetched.get("body_hash"), content)
+                        print(f"Scraped {len(content)} characters from {url}")
+
+                        # Same page text seen under another URL (mirrors, tracking params)
+                        seen = _EVENT_INDEX.lookup_content(content)
+                        if seen is not None:
+                            if seen["event"]:
+                                print("Page content matches a known event, skipping extraction")
+                                return _found(_EVENT_INDEX.add(seen["event"], source_url=canonical_url), url, processed)
+                            print(f"Page content already checked with no event, skipping {url}")
+                            continue
+
+                        # Extract event from content; cancelled when the budget runs out
+                        extraction_result = await dl.run(extract_event(content))
+
+                        # Check if valid event was found
+                        if extraction_result.get("event"):
+                            # Merge with copies of the same event from other sources
+                            event = _EVENT_INDEX.add(extraction_result["event"], source_url=canonical_url, text=content)
+                            return _found(event, url, processed)
+                        else:
+                            print(f"No valid event in {url}: {extraction_result.get('reasoning')}")
+                            # Only remember real "no event" verdicts, not LLM/parse failures
+                            if "error" not in extraction_result and "raw_response" not in extraction_result:
+                                _EVENT_INDEX.add_negative(content)
+
+                    except deadline.DeadlineExceeded:
+                        raise
+                    except Exception as e:
+                        print(f"Error processing {url}: {type(e).__name__}: {e}")
+                        continue
+            finally:
+                # Stop fetches we no longer need
+                await fetches.aclose()
+
+            # If we've processed all URLs without finding an event
+            print(f"Processed all {len(urls_to_process)} URLs without finding event, using fallback")
+            return _fallback(len(urls_to_process))
+
+    except deadline.DeadlineExceeded:
+        print(f"Deadline reached after {time.time() - start_time:.2f}s, using fallback")
+        return _fallback(processed)
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        print(f"Exception in find_event: {type(e).__name__}: {e}, using fallback")
+        return FALLBACK_EVENT
 
-                content = await asyncio.to_thread(_scrape)
-                print(f"Scraped {len(content)} characters from {url}")
 
-                # Extract event from content
-                extraction_result = await extract_event(content)
+@app.get("/events")
+async def events(latitude: float, longitude: float, radius: float = 3.0, start: str = None, days: int = 7, limit: int = 50):
+    """Return known events within `radius` miles that happen in a date window.
 
-                # Check if valid event was found
-                if extraction_result.get("event"):
-                    event = extraction_result["event"]
-                    event["source_url"] = url
+    Events come from the dedup index filled by find_event. Their free-text
+    schedules are parsed into recurrence rules, so "Every Tuesday" shows up
+    for every Tuesday in the window.
 
-                    elapsed = time.time() - start_time
-                    print(f"Found valid event in {elapsed:.2f}s after processing {i+1} URLs")
+    Args:
+        latitude: Latitude of the center point.
+        longitude: Longitude of the center point.
+        radius: Search radius in miles. Default is 3 miles.
+        start: First day of the window (YYYY-MM-DD). Default is today.
+        days: Length of the window in days. Default is 7 (this week).
+        limit: Maximum number of events to return. Default is 50.
 
-                    return {
-                        "events": [event],
-                        "processing_time": round(elapsed, 2),
-                        "urls_processed": i + 1
-                    }
-                else:
-                    print(f"No valid event in {url}: {extraction_result.get('reasoning')}")
+    Returns:
+        JSON with results (events with distance, schedule, occurrences, next_occurrence),
+        sorted by next occurrence then distance, and the query time in ms.
+    """
+    import time
+    from datetime import date, timedelta
 
-            except Exception as e:
-                print(f"Error processing {url}: {type(e).__name__}: {e}")
-                continue
+    try:
+        window_start = date.fromisoformat(start) if start else date.today()
+    except ValueError:
+        return {"error": f"Invalid start date: {start}", "hint": "Use YYYY-MM-DD"}
+    window_end = window_start + timedelta(days=max(days, 1) - 1)
 
-        # If we've processed all URLs without finding an event
-        elapsed = time.time() - start_time
-        print(f"Processed all {len(urls_to_process)} URLs without finding event, using fallback")
-        fallback_result = FALLBACK_EVENT.copy()
-        fallback_result["processing_time"] = round(elapsed, 2)
-        fallback_result["urls_processed"] = len(urls_to_process)
-        return fallback_result
+    query_start = time.perf_counter()
+    results = _EVENT_INDEX.query(latitude, longitude, radius, window_start, window_end, limit=limit)
+    query_ms = (time.perf_counter() - query_start) * 1000
 
-    except Exception as e:
-        import traceback
-        traceback.print_exc()
-        print(f"Exception in find_event: {type(e).__name__}: {e}, using fallback")
-        return FALLBACK_EVENT
+    return {
+        "results": results,
+        "window": {"start": window_start.isoformat(), "end": window_end.isoformat()},
+        "query_ms": round(query_ms, 2)
+    }
@@ -0,0 +1,250 @@
+"""
+metrics.py — per-stage latency histograms, in-flight gauges and Server-Timing.
+
+Timing used to be ad-hoc print lines ("Overpass API fetch time", "LLM
+inference time"), which nothing could aggregate. Here every upstream call and
+pipeline stage is timed with
+
+    with metrics.stage("overpass"):
+        ...
+
+or, for durations measured elsewhere, metrics.observe("fetch", seconds). Each
+sample is labelled with the HTTP endpoint it ran under. The label and the
+request's timing list live in context variables set by RequestTimer (the
+middleware in main.py), and asyncio tasks and asyncio.to_thread workers
+inherit both (background jobs call detach() so they stop writing to a
+request that has already been answered). render() writes everything in Prometheus text format for
+/metrics. RequestTimer.server_timing() sums the request's own stages into a
+Server-Timing header value.
+
+Stdlib only.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+PREFIX = "api"
+
+# Histogram bucket bounds in seconds: cache hits (ms) up to LLM calls (minutes)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+_ENDPOINT: contextvars.ContextVar[str] = contextvars.ContextVar("metrics_endpoint", default="none")
+_TIMINGS: contextvars.ContextVar[Optional[List[Tuple[str, float]]]] = contextvars.ContextVar("metrics_timings", default=None)
+
+
+class Histogram:
+    """Counts per bucket (non-cumulative), plus sum and count."""
+
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+_LOCK = threading.Lock()
+_STAGE_SECONDS: Dict[Tuple[str, str], Histogram] = {}      # (stage, endpoint)
+_STAGE_IN_FLIGHT: Dict[Tuple[str, str], int] = {}
+_STAGE_ERRORS: Dict[Tuple[str, str], int] = {}
+_REQUEST_SECONDS: Dict[str, Histogram] = {}                 # endpoint
+_REQUESTS: Dict[Tuple[str, int], int] = {}                  # (endpoint, status)
+_REQUEST_IN_FLIGHT: Dict[str, int] = {}
+
+
+def observe(stage: str, seconds: float) -> None:
+    """Record one `stage` duration under the current endpoint and request."""
+    key = (stage, _ENDPOINT.get())
+    with _LOCK:
+        hist = _STAGE_SECONDS.get(key)
+        if hist is None:
+            hist = _STAGE_SECONDS[key] = Histogram()
+        hist.observe(seconds)
+    timings = _TIMINGS.get()
+    if timings is not None:
+        timings.append((stage, seconds))
+
+
+def detach() -> None:
+    """
+    Stop adding stage timings to the current request's Server-Timing list.
+    For background tasks that outlive the request that started them; the
+    endpoint label is kept.
+    """
+    _TIMINGS.set(None)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time the block as stage `name`; counts it in flight while it runs and as an error if it raises."""
+    key = (name, _ENDPOINT.get())
+    with _LOCK:
+        _STAGE_IN_FLIGHT[key] = _STAGE_IN_FLIGHT.get(key, 0) + 1
+    t0 = time.monotonic()
+    try:
+        yield
+    except BaseException:
+        with _LOCK:
+            _STAGE_ERRORS[key] = _STAGE_ERRORS.get(key, 0) + 1
+        raise
+    finally:
+        with _LOCK:
+            _STAGE_IN_FLIGHT[key] -= 1
+        observe(name, time.monotonic() - t0)
+
+
+class RequestTimer:
+    """
+    Context manager around one HTTP request: makes `endpoint` the label for
+    stages recorded inside it and collects their timings for Server-Timing.
+    Set `status` before leaving to count the response code. A request whose
+    body is still streaming when the block ends calls defer() inside it and
+    finish() once the body is done, so the histogram covers the whole body.
+    """
+
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+        self.status = 500
+        self.timings: List[Tuple[str, float]] = []
+        self._t0 = 0.0
+        self._tokens: tuple = ()
+        self._deferred = False
+        self._finished = False
+
+    def __enter__(self) -> "RequestTimer":
+        self._tokens = (_ENDPOINT.set(self.endpoint), _TIMINGS.set(self.timings))
+        with _LOCK:
+            _REQUEST_IN_FLIGHT[self.endpoint] = _REQUEST_IN_FLIGHT.get(self.endpoint, 0) + 1
+        self._t0 = time.monotonic()
+        return self
+
+    def __exit__(self, exc_type, *exc) -> None:
+        _ENDPOINT.reset(self._tokens[0])
+        _TIMINGS.reset(self._tokens[1])
+        if exc_type is not None or not self._deferred:
+            self.finish()
+
+    def defer(self) -> None:
+        """Leave the request counted in flight after the block; finish() ends it."""
+        self._deferred = True
+
+    def finish(self) -> None:
+        """Record the request's latency and status (once)."""
+        if self._finished:
+            return
+        self._finished = True
+        elapsed = self.elapsed()
+        with _LOCK:
+            _REQUEST_IN_FLIGHT[self.endpoint] -= 1
+            hist = _REQUEST_SECONDS.get(self.endpoint)
+            if hist is None:
+                hist = _REQUEST_SECONDS[self.endpoint] = Histogram()
+            hist.observe(elapsed)
+            key = (self.endpoint, self.status)
+            _REQUESTS[key] = _REQUESTS.get(key, 0) + 1
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self._t0
+
+    def server_timing(self) -> str:
+        """
+        Server-Timing value: total time per stage so far (ms), then the time
+        so far as "total". Headers go out before the body, so for a streamed
+        body "total" is the time to headers.
+        """
+        totals: Dict[str, List[float]] = {}
+        for name, seconds in list(self.timings):
+            t = totals.setdefault(name, [0.0, 0])
+            t[0] += seconds
+            t[1] += 1
+        parts = [
+            f'{name};dur={t[0] * 1000:.1f}' + (f';desc="{t[1]} calls"' if t[1] > 1 else "")
+            for name, t in totals.items()
+        ]
+        parts.append(f"total;dur={self.elapsed() * 1000:.1f}")
+        return ", ".join(parts)
+
+
+# ------------------------------
+# Prometheus text format
+# ------------------------------
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: Any) -> str:
+    body = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+    return "{" + body + "}" if body else ""
+
+
+def _histogram_lines(name: str, samples: Dict[Any, Histogram], label_names: Tuple[str, ...]) -> List[str]:
+    lines = []
+    for key, hist in sorted(samples.items()):
+        labels = dict(zip(label_names, key if isinstance(key, tuple) else (key,)))
+        cumulative = 0
+        for bound, n in zip(BUCKETS + (float("inf"),), hist.counts):
+            cumulative += n
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f"{name}_bucket{_labels(**labels, le=le)} {cumulative}")
+        lines.append(f"{name}_sum{_labels(**labels)} {hist.sum:.6f}")
+        lines.append(f"{name}_count{_labels(**labels)} {hist.count}")
+    return lines
+
+
+def _family(name: str, kind: str, help_text: str, lines: List[str]) -> List[str]:
+    return [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"] + lines
+
+
+def render(extra: Iterable[Tuple[str, str, str, Dict[Tuple[Tuple[str, Any], ...], float]]] = ()) -> str:
+    """
+    All metrics in Prometheus text exposition format. `extra` adds families
+    collected elsewhere: (name, type, help, {((label, value), ...): sample}).
+    """
+    with _LOCK:
+        stage_seconds = {k: _copy(h) for k, h in _STAGE_SECONDS.items()}
+        stage_in_flight = dict(_STAGE_IN_FLIGHT)
+        stage_errors = dict(_STAGE_ERRORS)
+        request_seconds = {k: _copy(h) for k, h in _REQUEST_SECONDS.items()}
+        requests_total = dict(_REQUESTS)
+        request_in_flight = dict(_REQUEST_IN_FLIGHT)
+
+    out: List[str] = []
+    out += _family(f"{PREFIX}_request_seconds", "histogram", "HTTP request latency by endpoint.",
+                   _histogram_lines(f"{PREFIX}_request_seconds", request_seconds, ("endpoint",)))
+    out += _family(f"{PREFIX}_requests_total", "counter", "HTTP responses by endpoint and status.",
+                   [f"{PREFIX}_requests_total{_labels(endpoint=e, status=s)} {n}"
+                    for (e, s), n in sorted(requests_total.items())])
+    out += _family(f"{PREFIX}_requests_in_flight", "gauge", "HTTP requests being handled, by endpoint.",
+                   [f"{PREFIX}_requests_in_flight{_labels(endpoint=e)} {n}"
+                    for e, n in sorted(request_in_flight.items())])
+    out += _family(f"{PREFIX}_stage_seconds", "histogram", "Latency of upstream calls and pipeline stages.",
+                   _histogram_lines(f"{PREFIX}_stage_seconds", stage_seconds, ("stage", "endpoint")))
+    out += _family(f"{PREFIX}_stage_in_flight", "gauge", "Stage executions currently running.",
+                   [f"{PREFIX}_stage_in_flight{_labels(stage=s, endpoint=e)} {n}"
+                    for (s, e), n in sorted(stage_in_flight.items())])
+    out += _family(f"{PREFIX}_stage_errors_total", "counter", "Stage executions that raised.",
+                   [f"{PREFIX}_stage_errors_total{_labels(stage=s, endpoint=e)} {n}"
+                    for (s, e), n in sorted(stage_errors.items())])
+    for name, kind, help_text, samples in extra:
+        out += _family(f"{PREFIX}_{name}", kind, help_text,
+                       [f"{PREFIX}_{name}{_labels(**dict(labels))} {value}"
+                        for labels, value in samples.items()])
+    return "\n".join(out) + "\n"
+
+
+def _copy(hist: Histogram) -> Histogram:
+    h = Histogram()
+    h.counts, h.sum, h.count = list(hist.counts), hist.sum, hist.count
+    return h
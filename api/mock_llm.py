@@ -0,0 +1,186 @@
+"""
+mock_llm.py — local stand-in for the LLM servers, for tests and benchmarks.
+
+Serves both protocols llm.py speaks:
+    POST /api/generate          (Ollama: system + prompt)
+    POST /v1/chat/completions   (OpenAI-compatible: messages)
+and answers the API's four prompt kinds deterministically from the prompt
+text (feature matching, search queries, URL selection, event extraction),
+so endpoints can run end to end without a GPU. A request carrying a JSON
+schema (Ollama `format`, OpenAI `response_format`) gets a JSON reply, the
+way constrained decoding would produce one. --latency adds a fixed delay
+per request and --prefix-latency an extra one the first time a system
+prompt is seen, mimicking a prefix cache.
+
+Usage:
+    python -m api.mock_llm --port 7545
+    LLM_BACKEND=openai LLM_BASE_URL=http://localhost:7545 uvicorn api.main:app
+
+Stdlib only.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+
+_RE_URL = re.compile(r"^https?://\S+$", re.M)
+_RE_TIME = re.compile(r"\b\d{1,2}(?::\d{2})?\s?(?:am|pm)\b", re.I)
+_RE_ADDRESS = re.compile(
+    r"\b\d{2,6}\s+(?:[NSEW]\.?\s+)?(?:[A-Z][\w.'-]*\s+){1,4}(?:St|Street|Ave|Avenue|Rd|Road|Blvd|Dr|Drive|Ln|Pkwy)\b\.?"
+    r"(?:,?\s+[A-Z][a-z]+)?(?:,?\s+[A-Z]{2})?(?:\s+\d{5})?"
+)
+_RE_SCHEDULE = re.compile(
+    r"\b(?:every\s+)?(?:mon|tues|wednes|thurs|fri|satur|sun)days?\b[^.\n]{0,60}", re.I
+)
+_FEATURE_WORDS = {
+    "bathroom": "toilets", "toilet": "toilets", "restroom": "toilets",
+    "wash": "shower", "shower": "shower", "water": "drinking_water",
+    "food": "food_bank, soup_kitchen", "meal": "soup_kitchen", "eat": "soup_kitchen",
+    "sleep": "shelter", "shelter": "shelter", "bed": "shelter",
+    "clothes": "clothing_bank", "laundry": "laundry", "church": "place_of_worship",
+}
+_GOOD_URL_WORDS = ("pantry", "food", "meal", "shelter", "outreach", "mutual", "aid", "kitchen", "church", "calendar", "event")
+
+
+def answer(system: str, user: str, structured: bool = False) -> str:
+    """Deterministic reply for one of the API's prompt kinds; `structured` when a schema was sent."""
+    prompt = system + "\n" + user
+    if "query generator" in prompt:
+        m = re.search(r"\[CITY\] is ([^.\n]+)", user)
+        city = (m.group(1) if m else "richardson texas").lower().replace(",", "")
+        kinds = ("free community meal today", "church free lunch", "mutual aid food distribution",
+                 "food pantry open saturday", "homeless outreach", "soup kitchen", "free groceries",
+                 "emergency shelter", "community fridge", "free dinner tonight")
+        return "\n".join(f"{k} {city}" for k in kinds)
+    if "URL relevance filter" in prompt:
+        urls = _RE_URL.findall(user)
+        keep = [u for u in urls if any(w in u.lower() for w in _GOOD_URL_WORDS)]
+        return "\n".join(keep) if keep else "NONE"
+    if "event extraction assistant" in prompt:
+        address = _RE_ADDRESS.search(user)
+        when = _RE_SCHEDULE.search(user) or _RE_TIME.search(user)
+        if not (address and when):
+            return json.dumps({"valid": False, "reason": "no clear date and address"})
+        name = next((ln.strip() for ln in user.splitlines()[1:] if ln.strip()), "Community event")[:60]
+        return json.dumps({
+            "valid": True, "name": name, "date": when.group(0).strip(), "address": address.group(0).strip(),
+            "summary": f"{name} at {address.group(0).strip()}.",
+        })
+    if "Available features" in prompt:
+        m = re.search(r'Match for "([^"]*)"', user)
+        words = (m.group(1) if m else user).lower().split()
+        hits = [f for w in words if w in _FEATURE_WORDS for f in _FEATURE_WORDS[w].split(", ")]
+        hits = list(dict.fromkeys(hits)) or ["social_facility"]
+        return json.dumps({"features": hits}) if structured else ", ".join(hits)
+    return user[:200]
+
+
+class MockLLM:
+    """Answer generator plus latency model and request counters."""
+
+    def __init__(self, latency: float = 0.0, prefix_latency: float = 0.0):
+        self.latency = latency
+        self.prefix_latency = prefix_latency
+        self.requests = 0
+        self.prefix_hits = 0
+        self._seen_prefixes: set = set()
+        self._lock = threading.Lock()
+
+    def reply(self, system: str, user: str, structured: bool = False) -> Tuple[str, Dict[str, int]]:
+        with self._lock:
+            self.requests += 1
+            cached = system in self._seen_prefixes
+            self._seen_prefixes.add(system)
+            if cached:
+                self.prefix_hits += 1
+        time.sleep(self.latency + (0 if cached or not system else self.prefix_latency))
+        text = answer(system, user, structured)
+        # ~4 chars per token, like text_window.CHARS_PER_TOKEN
+        usage = {"prompt_tokens": (len(system) + len(user)) // 4, "completion_tokens": max(1, len(text) // 4)}
+        return text, usage
+
+
+def make_handler(mock: MockLLM):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send(self, status: int, obj: Any) -> None:
+            body = json.dumps(obj).encode("utf-8")
+            try:
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                pass    # client gave up (its deadline passed)
+
+        def do_POST(self):
+            try:
+                req = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            except ValueError:
+                return self._send(400, {"error": "invalid JSON"})
+            if self.path == "/api/generate":
+                text, usage = mock.reply(req.get("system", ""), req.get("prompt", ""), bool(req.get("format")))
+                return self._send(200, {
+                    "model": req.get("model"), "response": text, "done": True,
+                    "prompt_eval_count": usage["prompt_tokens"], "eval_count": usage["completion_tokens"],
+                    "eval_duration": int(max(mock.latency, 1e-3) * 1e9),
+                })
+            if self.path == "/v1/chat/completions":
+                msgs = req.get("messages") or []
+                system = "\n".join(m.get("content") or "" for m in msgs if m.get("role") == "system")
+                user = "\n".join(m.get("content") or "" for m in msgs if m.get("role") != "system")
+                text, usage = mock.reply(system, user, bool(req.get("response_format")))
+                return self._send(200, {
+                    "object": "chat.completion", "model": req.get("model"),
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": text}}],
+                    "usage": dict(usage, total_tokens=usage["prompt_tokens"] + usage["completion_tokens"]),
+                })
+            self._send(404, {"error": f"no route {self.path}"})
+
+        def do_GET(self):
+            if self.path in ("/health", "/v1/models"):
+                return self._send(200, {"requests": mock.requests, "prefix_hits": mock.prefix_hits,
+                                        "data": [{"id": "mock"}]})
+            self._send(404, {"error": f"no route {self.path}"})
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def serve(port: int = 7545, host: str = "127.0.0.1", latency: float = 0.0,
+          prefix_latency: float = 0.0, background: bool = False) -> Optional[ThreadingHTTPServer]:
+    """Run the mock; with background=True return the server after starting it in a thread."""
+    mock = MockLLM(latency, prefix_latency)
+    srv = ThreadingHTTPServer((host, port), make_handler(mock))
+    srv.mock = mock
+    if background:
+        threading.Thread(target=srv.serve_forever, daemon=True).start()
+        return srv
+    print(f"mock LLM on http://{host}:{port} (latency {latency}s, prefix miss +{prefix_latency}s)")
+    srv.serve_forever()
+    return None
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--port", type=int, default=7545)
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--latency", type=float, default=0.0)
+    ap.add_argument("--prefix-latency", type=float, default=0.0)
+    args = ap.parse_args()
+    serve(args.port, args.host, args.latency, args.prefix_latency)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+"""
+schedule.py — turn free-text event schedules into structured recurrence rules.
+
+extract_event returns `Date` as prose ("Every Tuesday, Thursday, and Saturday",
+"First and third Saturday of the month, 9am-noon", "November 15th, 10 AM").
+parse_schedule() maps that onto a small rule dict (with an RFC 5545 RRULE
+string where one applies) and occurrences() expands a rule over a date window,
+which is what the spatio-temporal event query needs.
+
+Rule shapes:
+    {"kind": "weekly",  "days": [1, 3, 5], "rrule": "FREQ=WEEKLY;BYDAY=TU,TH,SA", ...}
+    {"kind": "monthly", "nth": [1, 3], "days": [5], "rrule": "FREQ=MONTHLY;BYDAY=1SA,3SA", ...}
+    {"kind": "daily",   "days": [0..6], "rrule": "FREQ=DAILY", ...}
+    {"kind": "dates",   "dates": ["2025-11-15"], ...}
+    {"kind": "unknown"}
+Weekdays are 0=Monday … 6=Sunday. Every rule may carry "start"/"end" ("HH:MM")
+and weekly/monthly/daily rules an optional "from" date ("YYYY-MM-DD").
+
+Stdlib only.
+"""
+
+from __future__ import annotations
+
+import re
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+
+_DAY_CODES = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+_DAY_WORDS = {
+    "mon": 0, "monday": 0, "mondays": 0,
+    "tue": 1, "tues": 1, "tuesday": 1, "tuesdays": 1,
+    "wed": 2, "wednesday": 2, "wednesdays": 2,
+    "thu": 3, "thur": 3, "thurs": 3, "thursday": 3, "thursdays": 3,
+    "fri": 4, "friday": 4, "fridays": 4,
+    "sat": 5, "saturday": 5, "saturdays": 5,
+    "sun": 6, "sunday": 6, "sundays": 6,
+}
+_MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+_ORDINALS = {
+    "first": 1, "1st": 1, "second": 2, "2nd": 2, "third": 3, "3rd": 3,
+    "fourth": 4, "4th": 4, "fifth": 5, "5th": 5, "last": -1,
+}
+
+_DAY_ALT = "|".join(sorted(_DAY_WORDS, key=len, reverse=True))
+_ORD_ALT = "|".join(sorted(_ORDINALS, key=len, reverse=True))
+
+_RE_DAY = re.compile(rf"\b({_DAY_ALT})\b")
+_RE_DAY_RANGE = re.compile(rf"\b({_DAY_ALT})\s*(?:-|–|to|through|thru)\s*({_DAY_ALT})\b")
+_RE_NTH = re.compile(
+    rf"\b((?:(?:{_ORD_ALT})(?:\s*(?:,|and|&)\s*)?)+)\s+({_DAY_ALT})\b"
+)
+_RE_ORD = re.compile(rf"\b({_ORD_ALT})\b")
+_RE_DAILY = re.compile(r"\b(daily|every\s*day|7 days a week|seven days a week)\b")
+_RE_WEEKDAYS = re.compile(r"\bweekdays\b")
+_RE_WEEKENDS = re.compile(r"\bweekends?\b")
+_RE_RECURRING = re.compile(r"\b(every|each|weekly)\b|\b(?:mon|tues|wednes|thurs|fri|satur|sun)days\b")
+
+_RE_MONTH_DAY = re.compile(
+    r"\b(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s+(\d{1,2})(?:st|nd|rd|th)?"
+    r"(?:,?\s+(\d{4}))?\b"
+)
+_RE_NUMERIC_DATE = re.compile(r"\b(\d{1,2})/(\d{1,2})(?:/(\d{2,4}))?\b")
+_RE_ISO_DATE = re.compile(r"\b(\d{4})-(\d{2})-(\d{2})\b")
+
+_TIME = r"(\d{1,2})(?::(\d{2}))?\s*(a\.?m\.?|p\.?m\.?)?|(noon|midnight)"
+_RE_TIME_RANGE = re.compile(rf"\b(?:{_TIME})\s*(?:-|–|to|until|till)\s*(?:{_TIME})")
+_RE_TIME = re.compile(r"\b(\d{1,2})(?::(\d{2}))?\s*(a\.?m\.?|p\.?m\.?)|\b(noon|midnight)\b")
+
+
+def _to_hhmm(hour: Optional[str], minute: Optional[str], meridiem: Optional[str], word: Optional[str]) -> Optional[str]:
+    if word:
+        return "12:00" if word == "noon" else "00:00"
+    if hour is None:
+        return None
+    h, m = int(hour), int(minute or 0)
+    if meridiem:
+        h = h % 12 + (12 if meridiem.startswith("p") else 0)
+    if h > 23 or m > 59:
+        return None
+    return f"{h:02d}:{m:02d}"
+
+
+def _parse_times(text: str) -> Dict[str, str]:
+    m = _RE_TIME_RANGE.search(text)
+    if m:
+        h1, m1, ap1, w1, h2, m2, ap2, w2 = m.groups()
+        if not (ap1 or w1 or ap2 or w2):
+            # "5-7" with no am/pm anywhere is as likely a date range as a time
+            m = None
+        else:
+            if ap1 is None and w1 is None and ap2:
+                # "5-7pm": the first time shares the second meridiem, unless that
+                # puts it after the end ("11-1pm" is 11am-1pm)
+                ap1 = ap2
+                s1, s2 = _to_hhmm(h1, m1, ap1, None), _to_hhmm(h2, m2, ap2, None)
+                if s1 and s2 and s1 > s2:
+                    ap1 = "am"
+            start, end = _to_hhmm(h1, m1, ap1, w1), _to_hhmm(h2, m2, ap2, w2)
+            out = {}
+            if start:
+                out["start"] = start
+            if end:
+                out["end"] = end
+            if out:
+                return out
+    m = _RE_TIME.search(text)
+    if m:
+        start = _to_hhmm(*m.groups())
+        if start:
+            return {"start": start}
+    return {}
+
+
+def _resolve_year(month: int, day: int, year: Optional[str], today: date) -> Optional[date]:
+    try:
+        if year:
+            y = int(year)
+            return date(y + 2000 if y < 100 else y, month, day)
+        d = date(today.year, month, day)
+        # A year-less date more than ~6 months back means next year's
+        if (today - d).days > 180:
+            d = date(today.year + 1, month, day)
+        return d
+    except ValueError:
+        return None
+
+
+def _parse_dates(text: str, today: date) -> List[date]:
+    found: List[date] = []
+    for m in _RE_ISO_DATE.finditer(text):
+        try:
+            found.append(date(int(m.group(1)), int(m.group(2)), int(m.group(3))))
+        except ValueError:
+            pass
+    for m in _RE_MONTH_DAY.finditer(text):
+        d = _resolve_year(_MONTHS[m.group(1)], int(m.group(2)), m.group(3), today)
+        if d:
+            found.append(d)
+    for m in _RE_NUMERIC_DATE.finditer(text):
+        d = _resolve_year(int(m.group(1)), int(m.group(2)), m.group(3), today)
+        if d:
+            found.append(d)
+    return sorted(set(found))
+
+
+def _parse_days(text: str) -> List[int]:
+    days = set()
+    for m in _RE_DAY_RANGE.finditer(text):
+        a, b = _DAY_WORDS[m.group(1)], _DAY_WORDS[m.group(2)]
+        d = a
+        while True:
+            days.add(d)
+            if d == b:
+                break
+            d = (d + 1) % 7
+    for m in _RE_DAY.finditer(text):
+        days.add(_DAY_WORDS[m.group(1)])
+    if _RE_WEEKDAYS.search(text):
+        days.update(range(5))
+    if _RE_WEEKENDS.search(text):
+        days.update((5, 6))
+    return sorted(days)
+
+
+def parse_schedule(text: str, today: Optional[date] = None) -> Dict[str, Any]:
+    """
+    Parse a free-text schedule into a recurrence rule (see module docstring).
+    `today` anchors year-less dates; defaults to date.today().
+    """
+    today = today or date.today()
+    low = " ".join((text or "").lower().split())
+    times = _parse_times(low)
+    dates = _parse_dates(low, today)
+
+    # "first and third Saturday (of the month)"
+    m = _RE_NTH.search(low)
+    if m:
+        nth = sorted({_ORDINALS[o] for o in _RE_ORD.findall(m.group(1))}, key=lambda n: (n < 0, n))
+        day = _DAY_WORDS[m.group(2)]
+        rule: Dict[str, Any] = {
+            "kind": "monthly",
+            "nth": nth,
+            "days": [day],
+            "rrule": "FREQ=MONTHLY;BYDAY=" + ",".join(f"{n}{_DAY_CODES[day]}" for n in nth),
+        }
+        rule.update(times)
+        return rule
+
+    days = _parse_days(low)
+    recurring = bool(_RE_RECURRING.search(low))
+
+    if _RE_DAILY.search(low):
+        rule = {"kind": "daily", "days": list(range(7)), "rrule": "FREQ=DAILY"}
+    elif days and (recurring or not dates):
+        rule = {
+            "kind": "weekly",
+            "days": days,
+            "rrule": "FREQ=WEEKLY;BYDAY=" + ",".join(_DAY_CODES[d] for d in days),
+        }
+    elif dates:
+        rule = {"kind": "dates", "dates": [d.isoformat() for d in dates]}
+        rule.update(times)
+        return rule
+    else:
+        return {"kind": "unknown"}
+
+    if dates:
+        # "Every Saturday starting November 15"
+        rule["from"] = dates[0].isoformat()
+    rule.update(times)
+    return rule
+
+
+def _nth_weekday_of_month(year: int, month: int, weekday: int, n: int) -> Optional[date]:
+    if n > 0:
+        first = date(year, month, 1)
+        d = first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+        return d if d.month == month else None
+    nxt = date(year + (month == 12), month % 12 + 1, 1)
+    last = nxt - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def occurrences(rule: Dict[str, Any], start: date, end: date, limit: int = 100) -> List[str]:
+    """
+    Dates (or "YYYY-MM-DDTHH:MM" when the rule has a start time) on which the
+    rule fires within [start, end], inclusive, in order.
+    """
+    kind = rule.get("kind")
+    if kind == "unknown" or end < start:
+        return []
+    if rule.get("from"):
+        start = max(start, date.fromisoformat(rule["from"]))
+
+    out: List[date] = []
+    if kind == "dates":
+        out = [d for d in map(date.fromisoformat, rule.get("dates", [])) if start <= d <= end]
+    elif kind in ("weekly", "daily"):
+        days = set(rule.get("days", []))
+        d = start
+        while d <= end and len(out) < limit:
+            if d.weekday() in days:
+                out.append(d)
+            d += timedelta(days=1)
+    elif kind == "monthly":
+        y, mth = start.year, start.month
+        while date(y, mth, 1) <= end and len(out) < limit:
+            for wd in rule.get("days", []):
+                for n in rule.get("nth", []):
+                    d = _nth_weekday_of_month(y, mth, wd, n)
+                    if d and start <= d <= end:
+                        out.append(d)
+            y, mth = (y + 1, 1) if mth == 12 else (y, mth + 1)
+        out.sort()
+
+    t = rule.get("start")
+    return [f"{d.isoformat()}T{t}" if t else d.isoformat() for d in out[:limit]]
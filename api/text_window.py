@@ -0,0 +1,168 @@
+"""
+text_window.py — pick the event-dense parts of scraped page text for LLM prompts.
+
+Scraped pages open with navigation menus, cookie banners and footers, so the
+first N characters rarely contain the schedule we care about. This module
+slides a window over the text, scores each window by how many dates, times,
+street addresses and aid keywords it contains, and stitches the best
+non-overlapping windows back together (in document order) under a token budget.
+
+Stdlib only.
+"""
+
+from __future__ import annotations
+
+import re
+from bisect import bisect_left
+from typing import List, Sequence, Tuple
+
+# Rough chars-per-token ratio for English prose on Llama-family tokenizers.
+CHARS_PER_TOKEN = 4
+
+_MONTHS = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?"
+_WEEKDAYS = (
+    r"(?:monday|tuesday|wednesday|thursday|friday|saturday|sunday"
+    r"|mon|tues?|wed|thu(?:rs?)?|fri|sat|sun)s?"
+)
+
+_RE_DATE = re.compile(
+    r"\b(?:"
+    rf"{_MONTHS}\s+\d{{1,2}}(?:st|nd|rd|th)?"         # November 15th
+    rf"|\d{{1,2}}(?:st|nd|rd|th)?\s+(?:of\s+)?{_MONTHS}"  # 15 November
+    r"|\d{1,2}/\d{1,2}(?:/\d{2,4})?"                  # 11/15, 11/15/2025
+    rf"|{_WEEKDAYS}"                                  # Tuesday, Sats
+    r"|every\s+(?:day|week|month|other)"
+    r"|daily|weekly|monthly"
+    r")\b",
+    re.I,
+)
+_RE_TIME = re.compile(
+    r"\b\d{1,2}(?::\d{2})?\s?(?:a\.?m\.?|p\.?m\.?)"
+    r"|\b\d{1,2}:\d{2}\b"
+    r"|\b(?:noon|midnight)\b",
+    re.I,
+)
+_RE_ADDRESS = re.compile(
+    r"\b\d{1,6}\s+(?:[NSEW]\.?\s+)?(?:[A-Z0-9][\w.'-]*\s+){0,4}"
+    r"(?:st|street|ave|avenue|rd|road|blvd|boulevard|dr|drive|ln|lane|pkwy|parkway"
+    r"|hwy|highway|ct|court|pl|place|way|cir|circle|trl|trail|fwy|freeway)\b\.?"
+    r"|\b[A-Z]{2}\s+\d{5}(?:-\d{4})?\b",               # TX 75081
+    re.I,
+)
+_RE_AID = re.compile(
+    r"\b(?:food|pantry|pantries|meal|meals|lunch|dinner|breakfast|soup|kitchen"
+    r"|groceries|grocery|distribution|shelter|homeless|unhoused|outreach"
+    r"|clothing|hygiene|shower|laundry|mutual aid|free|volunteer|donation)s?\b",
+    re.I,
+)
+
+# (pattern, weight). Dates/times/addresses are the fields extract_event needs;
+# aid keywords mostly tell us we're in the right part of the page.
+_SIGNALS: Sequence[Tuple[re.Pattern, float]] = (
+    (_RE_DATE, 2.0),
+    (_RE_TIME, 2.0),
+    (_RE_ADDRESS, 3.0),
+    (_RE_AID, 1.0),
+)
+
+_RE_SPACES = re.compile(r"[^\S\n]+")
+_RE_BREAKS = re.compile(r"\s*\n\s*")
+
+
+def _signal_positions(text: str) -> List[Tuple[List[int], float]]:
+    """Start offsets of every signal match, one sorted list per signal."""
+    return [([m.start() for m in pat.finditer(text)], w) for pat, w in _SIGNALS]
+
+
+def _count_in(positions: List[int], start: int, end: int) -> int:
+    return bisect_left(positions, end) - bisect_left(positions, start)
+
+
+def _snap(text: str, start: int, end: int) -> Tuple[int, int]:
+    """Move window edges outwards/inwards to the nearest whitespace so we don't cut words."""
+    if start > 0:
+        sp = text.rfind(" ", max(0, start - 40), start)
+        start = sp + 1 if sp != -1 else start
+    if end < len(text):
+        sp = text.find(" ", end, min(len(text), end + 40))
+        end = sp if sp != -1 else end
+    return start, end
+
+
+def score_windows(text: str, window_chars: int = 500, stride: int = 250) -> List[Tuple[float, int, int]]:
+    """
+    Score sliding windows over `text`.
+    Returns [(score, start, end)] in document order.
+    """
+    signals = _signal_positions(text)
+    out: List[Tuple[float, int, int]] = []
+    last_start = max(0, len(text) - window_chars)
+    starts = list(range(0, last_start + 1, stride))
+    if starts[-1] != last_start:
+        starts.append(last_start)
+    for s in starts:
+        e = min(len(text), s + window_chars)
+        score = 0.0
+        kinds = 0
+        for positions, weight in signals:
+            n = _count_in(positions, s, e)
+            if n:
+                kinds += 1
+                score += weight * min(n, 6)  # cap so a list of 40 weekdays can't dominate
+        # Windows that mix several kinds of evidence (date + place + aid) are what we want.
+        score *= 1 + 0.5 * max(0, kinds - 1)
+        out.append((score, s, e))
+    return out
+
+
+def select_event_windows(
+    text: str,
+    max_tokens: int = 600,
+    window_chars: int = 500,
+    stride: int = 250,
+    separator: str = "\n...\n",
+) -> str:
+    """
+    Return the highest-scoring, non-overlapping windows of `text` joined in
+    document order, capped at roughly `max_tokens` tokens.
+    Text that already fits the budget is returned unchanged (whitespace collapsed).
+    Falls back to the head of the text when no window carries any signal.
+    """
+    text = _RE_BREAKS.sub("\n", _RE_SPACES.sub(" ", text)).strip()
+    budget = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= budget:
+        return text
+
+    window_chars = min(window_chars, budget // 2)
+    stride = min(stride, max(1, window_chars // 2))
+    windows = score_windows(text, window_chars=window_chars, stride=stride)
+    ranked = sorted((w for w in windows if w[0] > 0), key=lambda w: (-w[0], w[1]))
+    if not ranked:
+        return text[:budget]
+
+    chosen: List[Tuple[int, int]] = []
+    used = 0
+    for _, s, e in ranked:
+        if any(s < ce and cs < e for cs, ce in chosen):
+            continue
+        s, e = _snap(text, s, e)
+        cost = (e - s) + len(separator)
+        if used + cost > budget:
+            continue
+        chosen.append((s, e))
+        used += cost
+        if budget - used < window_chars // 2:
+            break
+
+    if not chosen:
+        return text[:budget]
+
+    chosen.sort()
+    # Merge windows that touch after snapping so we don't emit a separator mid-sentence.
+    merged: List[Tuple[int, int]] = []
+    for s, e in chosen:
+        if merged and s <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(e, merged[-1][1]))
+        else:
+            merged.append((s, e))
+    return separator.join(text[s:e].strip() for s, e in merged)